@@ -3,4 +3,5 @@
 __version__ = '0.6.4'
 
 from .connection_field import AdvancedDjangoFilterConnectionField
+from .connections import CountableConnection
 from .filterset import AdvancedFilterSet
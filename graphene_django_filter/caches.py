@@ -0,0 +1,70 @@
+"""Caches used by the library."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple
+
+
+class CacheInfo(NamedTuple):
+    """Cache statistics."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:
+    """Thread-safe cache with bounded LRU eviction and hit/miss counters."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of cached values."""
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Determine whether a key is cached without affecting the LRU order."""
+        return key in self._data
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return a cached value or create it with a factory and cache it.
+
+        The factory is called outside the lock,
+        so concurrent misses for the same key may create a value several times.
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = factory()
+        self.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache a value evicting the least recently used ones if the cache is full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        """Return cache statistics."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def clear(self) -> None:
+        """Clear the cache and reset statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
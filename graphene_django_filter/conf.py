@@ -1,6 +1,6 @@
 """Library settings."""
 
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional
 
 from django.conf import settings as django_settings
 from django.db import connection
@@ -27,6 +27,31 @@ DEFAULT_SETTINGS = {
     'AND_KEY': 'and',
     'OR_KEY': 'or',
     'NOT_KEY': 'not',
+    'FILTER_PLAN_CACHE_SIZE': 256,
+    'FORM_FREE_VALIDATION': False,
+    'ANNOTATE_SEARCH_VALUES': False,
+    'EXISTS_SUBQUERIES': False,
+    'MAX_FILTER_DEPTH': None,
+    'MAX_FILTER_BRANCHES': None,
+    'MAX_FILTER_LEAVES': None,
+    'MAX_FILTER_LIST_SIZE': None,
+    'MAX_FILTER_COST': None,
+    'MAX_FILTER_PLAN_DEPTH': 100,
+    'FILTER_COST_WEIGHTS': {},
+    'MAX_QUERY_COST': None,
+    'MAX_QUERY_ROWS': None,
+    'QUERY_COST_CACHE_SIZE': 256,
+    'APPROXIMATE_COUNT_THRESHOLD': 10000,
+    'RESULT_CACHE': None,
+    'RESULT_CACHE_TIMEOUT': 60,
+    'RESULT_CACHE_MAX_ROWS': 1000,
+    'COUNT_CACHE': None,
+    'COUNT_CACHE_TIMEOUT': 60,
+    'COUNT_CACHE_STALE_TIMEOUT': 3600,
+    'COUNT_CACHE_WORKERS': 2,
+    'SINGLE_FLIGHT_QUERIES': False,
+    'SHARED_FILTER_INPUT_TYPES': False,
+    'FILTER_ARGUMENTS_ARTIFACT': None,
 }
 DJANGO_SETTINGS_KEY = 'GRAPHENE_DJANGO_FILTER'
 
@@ -48,7 +73,7 @@ class Settings:
             self._user_settings = getattr(django_settings, DJANGO_SETTINGS_KEY, {})
         return self._user_settings
 
-    def __getattr__(self, name: str) -> Union[str, bool]:
+    def __getattr__(self, name: str) -> Any:
         """Return a setting value."""
         if name not in FIXED_SETTINGS and name not in DEFAULT_SETTINGS:
             raise AttributeError(f'Invalid Graphene setting: `{name}`')
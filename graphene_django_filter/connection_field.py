@@ -4,20 +4,40 @@ Use the `AdvancedDjangoFilterConnectionField` class from this
 module instead of the `DjangoFilterConnectionField` from graphene-django.
 """
 
+import inspect
 import warnings
-from typing import Any, Callable, Dict, Iterable, Optional, Type, Union
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Sequence, Tuple, Type, Union
 
 import graphene
+from asgiref.sync import sync_to_async
 from django.core.exceptions import ValidationError
 from django.db import models
+from graphene.relay.connection import connection_adapter, page_info_adapter
 from graphene_django import DjangoObjectType
 from graphene_django.filter import DjangoFilterConnectionField
+from graphene_django.utils import maybe_queryset
+from graphql_relay import connection_from_array_slice, cursor_to_offset, offset_to_cursor
+from promise import Promise
 
 from .conf import settings
+from .count_cache import get_cached_count
 from .filter_arguments_factory import FilterArgumentsFactory
+from .filter_costs import validate_filter_cost
 from .filterset import AdvancedFilterSet
 from .filterset_factories import get_filterset_class
 from .input_data_factories import tree_input_type_to_data
+from .pagination import (
+    count_queryset_approximately,
+    encode_keyset_cursor,
+    get_keyset_fields,
+    get_keyset_page,
+    get_offset_slice,
+    is_count_selected,
+)
+from .query_costs import validate_query_cost
+from .request_memo import get_request_memo, get_request_memo_key
+from .single_flight import get_single_flight_key, query_single_flight
 
 
 class AdvancedDjangoFilterConnectionField(DjangoFilterConnectionField):
@@ -32,6 +52,9 @@ class AdvancedDjangoFilterConnectionField(DjangoFilterConnectionField):
         filterset_class: Optional[Type[AdvancedFilterSet]] = None,
         filter_input_type_prefix: Optional[str] = None,
         *args,
+        keyset_ordering: Optional[Sequence[str]] = None,
+        window_count: bool = False,
+        approximate_count: bool = False,
         **kwargs
     ) -> None:
         super().__init__(
@@ -47,6 +70,9 @@ class AdvancedDjangoFilterConnectionField(DjangoFilterConnectionField):
             self.provided_filterset_class, AdvancedFilterSet,
         ), 'Use the `AdvancedFilterSet` class with the `AdvancedDjangoFilterConnectionField`'
         self._filter_input_type_prefix = filter_input_type_prefix
+        self.keyset_ordering = tuple(keyset_ordering) if keyset_ordering else None
+        self.window_count = window_count
+        self.approximate_count = approximate_count
         if self._filter_input_type_prefix is None and self._provided_filterset_class:
             warnings.warn(
                 'The `filterset_class` argument without `filter_input_type_prefix` '
@@ -106,16 +132,294 @@ class AdvancedDjangoFilterConnectionField(DjangoFilterConnectionField):
         filtering_args: Dict[str, graphene.InputField],
         filterset_class: Type[AdvancedFilterSet],
     ) -> models.QuerySet:
-        """Return a filtered QuerySet."""
+        """Return a filtered QuerySet.
+
+        Validated filtersets are memoized in the context of a request,
+        so the same filter of the same queryset is validated once in a query.
+        """
         qs = super(DjangoFilterConnectionField, cls).resolve_queryset(
             connection, iterable, info, args,
         )
         filter_arg = args.get(settings.FILTER_KEY, {})
+        memo = get_request_memo(info)
+        memo_key = None
+        if memo is not None:
+            memo_key = get_request_memo_key(filterset_class, filter_arg, qs)
+            if memo_key in memo:
+                return memo[memo_key].qs
+        validate_filter_cost(filterset_class, filter_arg)
         filterset = filterset_class(
             data=tree_input_type_to_data(filterset_class, filter_arg),
             queryset=qs,
             request=info.context,
         )
-        if filterset.form.is_valid():
-            return filterset.qs
-        raise ValidationError(filterset.form.errors.as_json())
+        if filterset.is_valid():
+            qs = filterset.qs
+            validate_query_cost(filterset, qs)
+            if memo is not None and memo_key is not None:
+                memo[memo_key] = filterset
+            return qs
+        raise ValidationError(filterset.errors.as_json())
+
+    def wrap_resolve(self, parent_resolver: Callable) -> Callable:
+        """Return a connection resolver."""
+        return partial(
+            self.advanced_connection_resolver,
+            self.keyset_ordering,
+            self.window_count,
+            self.approximate_count,
+            self.resolver or parent_resolver,
+            self.connection_type,
+            self.get_manager(),
+            self.get_queryset_resolver(),
+            self.max_limit,
+            self.enforce_first_or_last,
+        )
+
+    @classmethod
+    def advanced_connection_resolver(
+        cls,
+        keyset_ordering: Optional[Sequence[str]],
+        window_count: bool,
+        approximate_count: bool,
+        resolver: Callable,
+        connection: Type[graphene.relay.Connection],
+        default_manager: models.Manager,
+        queryset_resolver: Callable,
+        max_limit: Optional[int],
+        enforce_first_or_last: bool,
+        root: Any,
+        info: graphene.ResolveInfo,
+        **args
+    ) -> Union[graphene.relay.Connection, Promise]:
+        """Resolve a connection.
+
+        It is a copy of the `connection_resolver` method from graphene-django,
+        where the keyset pagination is used if the `keyset_ordering` argument is provided,
+        and the queryset is counted only if the connection fields require it.
+        With the `window_count` argument, the count is fetched with the page
+        of the offset pagination in one query. With the `approximate_count` argument,
+        the count of large querysets is estimated by the database planner.
+        Concurrent identical queries are coalesced if the `SINGLE_FLIGHT_QUERIES` setting is set.
+        """
+        first = args.get('first')
+        last = args.get('last')
+        if enforce_first_or_last:
+            assert first or last, (
+                'You must provide a `first` or `last` value '
+                f'to properly paginate the `{info.field_name}` connection.'
+            )
+        if max_limit:
+            for name, value in (('first', first), ('last', last)):
+                assert not value or value <= max_limit, (
+                    f'Requesting {value} records on the `{info.field_name}` connection '
+                    f'exceeds the `{name}` limit of {max_limit} records.'
+                )
+        if keyset_ordering:
+            assert args.get('offset') is None, (
+                'Use cursors instead of the `offset` value '
+                f'to paginate the `{info.field_name}` connection with the keyset pagination.'
+            )
+        elif args.get('offset') is not None:
+            assert args.get('before') is None, (
+                "You can't provide a `before` value at the same time as an `offset` value "
+                f'to properly paginate the `{info.field_name}` connection.'
+            )
+        is_count_needed = is_count_selected(info)
+        if keyset_ordering:
+            on_resolve = partial(
+                cls.resolve_keyset_connection,
+                connection,
+                args,
+                keyset_ordering,
+                is_count_needed,
+                approximate_count=approximate_count,
+                max_limit=max_limit,
+            )
+        else:
+            on_resolve = partial(
+                cls.resolve_offset_connection,
+                connection,
+                args,
+                is_count_needed,
+                window_count=window_count,
+                approximate_count=approximate_count,
+                max_limit=max_limit,
+            )
+        single_flight_extra = (
+            connection,
+            keyset_ordering,
+            window_count,
+            approximate_count,
+            is_count_needed,
+        )
+        iterable = resolver(root, info, **args)
+        if inspect.isawaitable(iterable) and not isinstance(iterable, Promise):
+            return cls.resolve_awaitable_connection(
+                connection,
+                default_manager,
+                queryset_resolver,
+                info,
+                args,
+                on_resolve,
+                single_flight_extra,
+                iterable,
+            )
+        if iterable is None:
+            iterable = default_manager
+        iterable = queryset_resolver(connection, iterable, info, args)
+        if Promise.is_thenable(iterable):
+            return Promise.resolve(iterable).then(on_resolve)
+        single_flight_key = None
+        if settings.SINGLE_FLIGHT_QUERIES:
+            single_flight_key = get_single_flight_key(iterable, args, *single_flight_extra)
+        if single_flight_key is not None:
+            return query_single_flight.do(single_flight_key, partial(on_resolve, iterable))
+        return on_resolve(iterable)
+
+    @classmethod
+    async def resolve_awaitable_connection(
+        cls,
+        connection: Type[graphene.relay.Connection],
+        default_manager: models.Manager,
+        queryset_resolver: Callable,
+        info: graphene.ResolveInfo,
+        args: Dict[str, Any],
+        on_resolve: Callable,
+        single_flight_extra: Tuple[Any, ...],
+        iterable: Awaitable,
+    ) -> graphene.relay.Connection:
+        """Resolve a connection of an asynchronous resolver.
+
+        Queries are run in a thread with `sync_to_async`, and concurrent identical
+        queries of an event loop are coalesced if the `SINGLE_FLIGHT_QUERIES` setting is set.
+        """
+        iterable = await iterable
+        if iterable is None:
+            iterable = default_manager
+        iterable = await sync_to_async(queryset_resolver)(connection, iterable, info, args)
+        single_flight_key = None
+        if settings.SINGLE_FLIGHT_QUERIES:
+            single_flight_key = get_single_flight_key(iterable, args, *single_flight_extra)
+        if single_flight_key is not None:
+            return await query_single_flight.do_async(
+                single_flight_key,
+                partial(sync_to_async(on_resolve), iterable),
+            )
+        return await sync_to_async(on_resolve)(iterable)
+
+    @classmethod
+    def resolve_offset_connection(
+        cls,
+        connection: Type[graphene.relay.Connection],
+        args: Dict[str, Any],
+        is_count_needed: bool,
+        iterable: Union[models.QuerySet, Iterable],
+        window_count: bool = False,
+        approximate_count: bool = False,
+        max_limit: Optional[int] = None,
+    ) -> graphene.relay.Connection:
+        """Return a connection with a page selected by offset cursors.
+
+        It is a copy of the `resolve_connection` method from graphene-django,
+        where the queryset is not counted if the count is not needed,
+        and the next page is detected by fetching an extra row.
+        If the count cache is enabled, the count is read from it.
+        """
+        queryset = maybe_queryset(iterable)
+        if not isinstance(queryset, models.QuerySet):
+            return cls.resolve_connection(connection, args, iterable, max_limit=max_limit)
+        offset = args.pop('offset', None)
+        after = args.get('after')
+        if offset:
+            if after:
+                offset += cursor_to_offset(after) + 1
+            args['after'] = offset_to_cursor(offset - 1)
+        if max_limit is not None and args.get('first') is None and args.get('last') is None:
+            args['first'] = max_limit
+        offset_slice = get_offset_slice(
+            queryset,
+            after=args.get('after'),
+            before=args.get('before'),
+            first=args.get('first'),
+            last=args.get('last'),
+            is_count_needed=all((
+                is_count_needed,
+                not approximate_count,
+                settings.COUNT_CACHE is None,
+            )),
+            is_window_count=window_count,
+        )
+        resolved_connection = connection_from_array_slice(
+            offset_slice.nodes,
+            args,
+            slice_start=offset_slice.slice_start,
+            array_length=offset_slice.array_length,
+            array_slice_length=offset_slice.array_length - offset_slice.slice_start,
+            connection_type=partial(connection_adapter, connection),
+            edge_type=connection.Edge,
+            page_info_type=page_info_adapter,
+        )
+        length, is_length_exact = offset_slice.length, True
+        if is_count_needed and length is None and approximate_count:
+            length, is_length_exact = count_queryset_approximately(queryset)
+        elif is_count_needed and length is None:
+            length = get_cached_count(queryset)
+        resolved_connection.iterable = queryset
+        resolved_connection.length = length
+        resolved_connection.is_length_exact = is_length_exact if length is not None else None
+        return resolved_connection
+
+    @classmethod
+    def resolve_keyset_connection(
+        cls,
+        connection: Type[graphene.relay.Connection],
+        args: Dict[str, Any],
+        keyset_ordering: Sequence[str],
+        is_count_needed: bool,
+        iterable: models.QuerySet,
+        approximate_count: bool = False,
+        max_limit: Optional[int] = None,
+    ) -> graphene.relay.Connection:
+        """Return a connection with a page selected by cursors of the keyset pagination."""
+        queryset = maybe_queryset(iterable)
+        assert isinstance(queryset, models.QuerySet), (
+            'Return a QuerySet from the resolver to paginate a connection '
+            f'with the keyset pagination, not `{type(queryset).__name__}`.'
+        )
+        keyset_fields = get_keyset_fields(queryset.model, keyset_ordering)
+        first = args.get('first')
+        last = args.get('last')
+        if max_limit is not None and first is None and last is None:
+            first = max_limit
+        page = get_keyset_page(
+            queryset,
+            keyset_fields,
+            after=args.get('after'),
+            before=args.get('before'),
+            first=first,
+            last=last,
+        )
+        edges = [
+            connection.Edge(node=node, cursor=encode_keyset_cursor(keyset_fields, node))
+            for node in page.nodes
+        ]
+        resolved_connection = connection(
+            edges=edges,
+            page_info=graphene.relay.PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=page.has_previous_page,
+                has_next_page=page.has_next_page,
+            ),
+        )
+        length: Optional[int] = None
+        is_length_exact: Optional[bool] = None
+        if is_count_needed and approximate_count:
+            length, is_length_exact = count_queryset_approximately(queryset)
+        elif is_count_needed:
+            length, is_length_exact = get_cached_count(queryset), True
+        resolved_connection.iterable = queryset
+        resolved_connection.length = length
+        resolved_connection.is_length_exact = is_length_exact
+        return resolved_connection
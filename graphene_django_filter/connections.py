@@ -0,0 +1,33 @@
+"""Connection classes for the `connection_class` field of DjangoObjectType Meta classes."""
+
+from typing import Optional
+
+import graphene
+
+
+class CountableConnection(graphene.relay.Connection):
+    """Connection with the total count of objects."""
+
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int(description='Total count of objects')
+    is_total_count_exact = graphene.Boolean(
+        description='Whether the total count is exact and not estimated by the database',
+    )
+
+    @staticmethod
+    def resolve_total_count(
+        root: graphene.relay.Connection,
+        info: graphene.ResolveInfo,
+    ) -> Optional[int]:
+        """Resolve the total count of objects."""
+        return root.length
+
+    @staticmethod
+    def resolve_is_total_count_exact(
+        root: graphene.relay.Connection,
+        info: graphene.ResolveInfo,
+    ) -> bool:
+        """Resolve whether the total count is exact."""
+        return getattr(root, 'is_length_exact', True) is not False
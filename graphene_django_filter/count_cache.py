@@ -0,0 +1,129 @@
+"""Cache of counts of filtered querysets.
+
+Counts are stored in a Django cache selected by the `COUNT_CACHE` setting.
+A count older than the `COUNT_CACHE_TIMEOUT` setting is stale:
+it is still returned, but it is refreshed in a background thread pool,
+so the latency of counting is bounded for frequently used filters
+while counts stay eventually correct.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, NamedTuple, Optional
+
+from django.core.cache import BaseCache, caches
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, models
+
+from .conf import settings
+from .normalization import get_hash
+from .pagination import count_queryset
+
+COUNT_CACHE_KEY_PREFIX = 'graphene_django_filter:count'
+
+refresh_futures: Dict[str, Future] = {}
+refresh_lock = threading.Lock()
+count_executor: Optional[ThreadPoolExecutor] = None
+
+
+class CountEntry(NamedTuple):
+    """Count of a queryset and the time when it was counted."""
+
+    count: int
+    counted_at: float
+
+
+def get_count_cache() -> Optional[BaseCache]:
+    """Return the Django cache of counts or None if the count cache is disabled."""
+    if settings.COUNT_CACHE is None:
+        return None
+    return caches[settings.COUNT_CACHE]
+
+
+def get_count_executor() -> ThreadPoolExecutor:
+    """Return the thread pool refreshing stale counts."""
+    global count_executor
+    with refresh_lock:
+        if count_executor is None:
+            count_executor = ThreadPoolExecutor(
+                max_workers=settings.COUNT_CACHE_WORKERS,
+                thread_name_prefix='graphene_django_filter_count',
+            )
+        return count_executor
+
+
+def get_count_key(queryset: models.QuerySet) -> str:
+    """Return a cache key of a count of a queryset.
+
+    The key contains the model of the queryset and a hash of its SQL without ordering,
+    which is canonical for the normalized filter and its values.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    return f'{COUNT_CACHE_KEY_PREFIX}:{queryset.model._meta.label_lower}:' + get_hash(
+        f'{queryset.db}:{sql}:{params!r}',
+    )
+
+
+def get_cached_count(queryset: models.QuerySet) -> int:
+    """Return the count of a queryset from the count cache.
+
+    Missing counts are counted in place, and stale counts are returned
+    and scheduled to be refreshed. The queryset is counted without the cache
+    if the count cache is disabled.
+    """
+    cache = get_count_cache()
+    if cache is None:
+        return count_queryset(queryset)
+    try:
+        key = get_count_key(queryset)
+    except EmptyResultSet:
+        return 0
+    entry = cache.get(key)
+    if entry is None:
+        return refresh_count(cache, key, queryset)
+    if time.time() - entry.counted_at >= settings.COUNT_CACHE_TIMEOUT:
+        schedule_count_refresh(key, queryset)
+    return entry.count
+
+
+def refresh_count(cache: BaseCache, key: str, queryset: models.QuerySet) -> int:
+    """Count a queryset and store the count.
+
+    Counts are kept for `COUNT_CACHE_TIMEOUT` seconds as fresh
+    and for `COUNT_CACHE_STALE_TIMEOUT` more seconds as stale.
+    """
+    count = count_queryset(queryset)
+    cache.set(
+        key,
+        CountEntry(count, time.time()),
+        timeout=settings.COUNT_CACHE_TIMEOUT + settings.COUNT_CACHE_STALE_TIMEOUT,
+    )
+    return count
+
+
+def schedule_count_refresh(key: str, queryset: models.QuerySet) -> None:
+    """Refresh a count in the background unless it is already being refreshed."""
+    executor = get_count_executor()
+    with refresh_lock:
+        if key in refresh_futures:
+            return
+        future = executor.submit(refresh_count_in_background, key, queryset)
+        refresh_futures[key] = future
+    future.add_done_callback(lambda _: discard_refresh_future(key))
+
+
+def discard_refresh_future(key: str) -> None:
+    """Forget a finished refresh of a count."""
+    with refresh_lock:
+        refresh_futures.pop(key, None)
+
+
+def refresh_count_in_background(key: str, queryset: models.QuerySet) -> None:
+    """Refresh a count in a thread of the pool and close its database connections."""
+    try:
+        cache = get_count_cache()
+        if cache is not None:
+            refresh_count(cache, key, queryset)
+    finally:
+        connections.close_all()
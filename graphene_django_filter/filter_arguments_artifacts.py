@@ -0,0 +1,220 @@
+"""Artifacts of filter arguments for a fast cold start.
+
+Creating lookup fields of filter input types converts model fields to form fields
+and form fields to Graphene types for every filter. An artifact built
+by the `build_filter_arguments` management command stores the types
+and descriptions of lookup fields of all filtersets of a schema,
+so processes create lookup fields from the artifact instead.
+Filtersets are keyed by a hash of their definitions, so a filterset
+changed after the artifact was built is not found in it and is converted as usual.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+import graphene
+import graphene_django
+from django.db import models
+from graphene_django.filter.utils import get_model_field
+
+from . import __version__
+from .conf import settings
+from .filterset import AdvancedFilterSet
+from .normalization import get_hash
+
+ARTIFACT_FORMAT = 1
+SCALARS = {
+    scalar._meta.name: scalar
+    for scalar in (
+        graphene.Base64,
+        graphene.BigInt,
+        graphene.Boolean,
+        graphene.Date,
+        graphene.DateTime,
+        graphene.Decimal,
+        graphene.Float,
+        graphene.ID,
+        graphene.Int,
+        graphene.JSONString,
+        graphene.String,
+        graphene.Time,
+        graphene.UUID,
+    )
+}
+TYPE_REFERENCE_PATTERN = re.compile(
+    r'^(?P<list>\[)?(?P<name>\w+)(?P<non_null>!)?(?(list)\])(?P<list_non_null>!)?$',
+)
+
+FieldSpec = Tuple[str, Optional[str]]
+
+loaded_artifacts: Dict[str, Tuple[float, Optional[Dict[str, Dict[str, FieldSpec]]]]] = {}
+loaded_artifacts_lock = threading.Lock()
+
+
+def get_artifact_header() -> Dict[str, Any]:
+    """Return versions that artifacts must be built with to be loaded."""
+    return {
+        'format': ARTIFACT_FORMAT,
+        'graphene_django_filter': __version__,
+        'graphene': graphene.__version__,
+        'graphene_django': graphene_django.__version__,
+    }
+
+
+def get_filterset_definition_hash(filterset_class: Type[AdvancedFilterSet]) -> str:
+    """Return a hash of the definition of a filterset class.
+
+    The hash covers the model, names, classes, paths, lookup expressions,
+    labels and required flags of filters, form fields of declared filters
+    and model fields of other filters, i.e. everything lookup fields are created from.
+    """
+    if filterset_class.meta_index.definition_hash is not None:
+        return filterset_class.meta_index.definition_hash
+    model = filterset_class._meta.model
+    definition: List[Any] = [model._meta.label_lower if model else None]
+    declared_filters = getattr(filterset_class, 'declared_filters')
+    for name, filter_field in filterset_class.base_filters.items():
+        filter_definition = [
+            name,
+            get_class_path(type(filter_field)),
+            filter_field.field_name,
+            filter_field.lookup_expr,
+            str(filter_field.label) if filter_field.label else None,
+            filter_field.extra.get('required', False),
+        ]
+        if name in declared_filters:
+            filter_definition.append(get_class_path(filter_field.field_class))
+        else:
+            filter_definition.append(
+                get_model_field_definition(get_model_field(model, filter_field.field_name)),
+            )
+        definition.append(filter_definition)
+    filterset_class.meta_index.definition_hash = get_hash(json.dumps(definition, default=repr))
+    return filterset_class.meta_index.definition_hash
+
+
+def get_model_field_definition(model_field: Optional[models.Field]) -> Optional[List[Any]]:
+    """Return the attributes of a model field that its form field depends on."""
+    if model_field is None:
+        return None
+    related_model = getattr(model_field, 'related_model', None)
+    return [
+        get_class_path(type(model_field)),
+        getattr(model_field, 'null', None),
+        getattr(model_field, 'blank', None),
+        getattr(model_field, 'max_length', None),
+        repr(getattr(model_field, 'choices', None)),
+        str(getattr(model_field, 'help_text', '')),
+        related_model._meta.label_lower if isinstance(related_model, type) else None,
+    ]
+
+
+def get_class_path(cls: type) -> str:
+    """Return the import path of a class."""
+    return f'{cls.__module__}.{cls.__qualname__}'
+
+
+def get_field_spec(
+    input_field: graphene.InputField,
+    default_description: str,
+) -> Optional[FieldSpec]:
+    """Return the spec of a lookup field or None if its type can not be stored.
+
+    The spec consists of the type reference, e.g. `[ID!]`, and the description,
+    which is omitted if it is the default description of the lookup.
+    Only types of built-in scalars and lists of them can be stored.
+    """
+    type_reference = str(input_field.type)
+    match = TYPE_REFERENCE_PATTERN.match(type_reference)
+    if match is None or match.group('name') not in SCALARS:
+        return None
+    description = input_field.description
+    if description == default_description:
+        description = None
+    return type_reference, description
+
+
+def create_input_field(spec: FieldSpec, default_description: str) -> graphene.InputField:
+    """Create a lookup field from its spec."""
+    type_reference, description = spec
+    match = TYPE_REFERENCE_PATTERN.match(type_reference)
+    field_type: Any = SCALARS[match.group('name')]
+    if match.group('non_null'):
+        field_type = graphene.NonNull(field_type)
+    if match.group('list'):
+        field_type = graphene.List(field_type)
+    if match.group('list_non_null'):
+        field_type = graphene.NonNull(field_type)
+    return graphene.InputField(
+        field_type,
+        description=description or default_description,
+    )
+
+
+def create_artifact(
+    filterset_specs: Iterable[Tuple[Type[AdvancedFilterSet], Dict[str, FieldSpec]]],
+) -> Dict[str, Any]:
+    """Create an artifact from specs of lookup fields of filterset classes."""
+    return {
+        **get_artifact_header(),
+        'filtersets': {
+            get_filterset_definition_hash(filterset_class): specs
+            for filterset_class, specs in filterset_specs
+        },
+    }
+
+
+def write_artifact(path: str, artifact: Dict[str, Any]) -> None:
+    """Write an artifact atomically, so processes never load a partially written one."""
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as artifact_file:
+        json.dump(artifact, artifact_file, separators=(',', ':'))
+    os.replace(temporary_path, path)
+
+
+def load_artifact(path: str) -> Optional[Dict[str, Dict[str, FieldSpec]]]:
+    """Load specs of filtersets from an artifact.
+
+    Artifacts are loaded once and loaded again when their files are modified.
+    Return None if the artifact does not exist, can not be read
+    or was built with other versions of libraries.
+    """
+    try:
+        modified_at = os.stat(path).st_mtime
+    except OSError:
+        return None
+    with loaded_artifacts_lock:
+        if path in loaded_artifacts and loaded_artifacts[path][0] == modified_at:
+            return loaded_artifacts[path][1]
+        try:
+            with open(path, encoding='utf-8') as artifact_file:
+                artifact = json.load(artifact_file)
+        except (OSError, ValueError):
+            artifact = None
+        filterset_specs = None
+        if isinstance(artifact, dict) and all(
+            artifact.get(key, None) == value for key, value in get_artifact_header().items()
+        ):
+            filterset_specs = {
+                definition_hash: {name: tuple(spec) for name, spec in specs.items()}
+                for definition_hash, specs in artifact['filtersets'].items()
+            }
+        loaded_artifacts[path] = (modified_at, filterset_specs)
+        return filterset_specs
+
+
+def get_filterset_specs(filterset_class: Type[AdvancedFilterSet]) -> Optional[Dict[str, FieldSpec]]:
+    """Return specs of lookup fields of a filterset class from the artifact of the settings.
+
+    Return None if the artifact is disabled, missing or stale, or if it does not have
+    the current definition of the filterset class.
+    """
+    if settings.FILTER_ARGUMENTS_ARTIFACT is None:
+        return None
+    filterset_specs = load_artifact(settings.FILTER_ARGUMENTS_ARTIFACT)
+    if filterset_specs is None:
+        return None
+    return filterset_specs.get(get_filterset_definition_hash(filterset_class), None)
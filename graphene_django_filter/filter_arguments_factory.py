@@ -1,25 +1,52 @@
 """Module for converting a AdvancedFilterSet class to filter arguments."""
 
-from typing import Any, Dict, List, Optional, Sequence, Type, cast
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type, cast
 
 import graphene
-from anytree import Node
 from django.db import models
 from django.db.models.constants import LOOKUP_SEP
 from django_filters import Filter
-from django_filters.conf import settings as django_settings
 from graphene_django.filter.utils import get_model_field
 from graphene_django.forms.converter import convert_form_field
 from stringcase import pascalcase
 
 from .conf import settings
+from .filter_arguments_artifacts import create_input_field, get_filterset_specs
+from .filter_plans import QUANTIFIERS
 from .filters import SearchQueryFilter, SearchRankFilter, TrigramFilter
 from .filterset import AdvancedFilterSet
+from .input_data_factories import DATA_FACTORIES, FilterInputPath
+from .input_type_registry import get_input_type_registry
 from .input_types import (
     SearchQueryFilterInputType,
     SearchRankFilterInputType,
     TrigramFilterInputType,
 )
+from .normalization import get_hash
+
+
+class FilterTrieNode(NamedTuple):
+    """Node of a trie of field names and lookup expressions of filters.
+
+    The node keeps its path from the root, so walks over the trie
+    do not compute paths and heights of nodes again.
+    """
+
+    name: str
+    path: Tuple[str, ...]
+    children: Dict[str, 'FilterTrieNode']
+
+    @property
+    def is_leaf(self) -> bool:
+        """Return whether the node is a lookup expression."""
+        return not self.children
+
+
+@lru_cache(maxsize=None)
+def to_pascal_case(name: str) -> str:
+    """Convert a name to PascalCase once for all input types."""
+    return pascalcase(name)
 
 
 class FilterArgumentsFactory:
@@ -41,12 +68,13 @@ class FilterArgumentsFactory:
         ),
     }
 
-    input_object_types: Dict[str, Type[graphene.InputObjectType]] = {}
-
     def __init__(self, filterset_class: Type[AdvancedFilterSet], input_type_prefix: str) -> None:
         self.filterset_class = filterset_class
         self.input_type_prefix = input_type_prefix
         self.filter_input_type_name = f'{self.input_type_prefix}FilterInputType'
+        self.shared_input_types = settings.SHARED_FILTER_INPUT_TYPES
+        self.input_object_types = get_input_type_registry()
+        self.field_specs = get_filterset_specs(filterset_class)
 
     @property
     def arguments(self) -> Dict[str, graphene.Argument]:
@@ -54,11 +82,14 @@ class FilterArgumentsFactory:
 
         These arguments will be available to filter against in the GraphQL.
         """
-        input_object_type = self.input_object_types.get(
+        roots = self.filterset_to_trees(self.filterset_class)
+        input_object_type = self.input_object_types.get_or_create(
             self.filter_input_type_name,
-            self.create_filter_input_type(
-                self.filterset_to_trees(self.filterset_class),
-            ),
+            lambda: self.create_filter_input_type(roots),
+        )
+        self.filterset_class.meta_index.input_paths = self.create_input_paths(
+            self.filterset_class,
+            roots,
         )
         return {
             settings.FILTER_KEY: graphene.Argument(
@@ -67,84 +98,177 @@ class FilterArgumentsFactory:
             ),
         }
 
-    def create_filter_input_type(self, roots: List[Node]) -> Type[graphene.InputObjectType]:
+    def create_filter_input_type(
+        self,
+        roots: List[FilterTrieNode],
+    ) -> Type[graphene.InputObjectType]:
         """Create a filter input type from filter set trees."""
-        self.input_object_types[self.filter_input_type_name] = cast(
-            Type[graphene.InputObjectType],
-            type(
-                self.filter_input_type_name,
-                (graphene.InputObjectType,),
-                {
-                    **{
-                        root.name: self.create_filter_input_subfield(
-                            root,
-                            self.input_type_prefix,
-                            f'`{pascalcase(root.name)}` field',
-                        )
-                        for root in roots
-                    },
-                    settings.AND_KEY: graphene.InputField(
-                        graphene.List(lambda: self.input_object_types[self.filter_input_type_name]),
-                        description='`And` field',
-                    ),
-                    settings.OR_KEY: graphene.InputField(
-                        graphene.List(lambda: self.input_object_types[self.filter_input_type_name]),
-                        description='`Or` field',
-                    ),
-                    settings.NOT_KEY: graphene.InputField(
-                        lambda: self.input_object_types[self.filter_input_type_name],
-                        description='`Not` field',
-                    ),
+        return self.create_input_object_type(
+            self.filter_input_type_name,
+            {
+                **{
+                    root.name: self.create_filter_input_subfield(
+                        root,
+                        self.input_type_prefix,
+                        f'`{to_pascal_case(root.name)}` field',
+                    )
+                    for root in roots
                 },
-            ),
+                settings.AND_KEY: graphene.InputField(
+                    graphene.List(lambda: self.input_object_types[self.filter_input_type_name]),
+                    description='`And` field',
+                ),
+                settings.OR_KEY: graphene.InputField(
+                    graphene.List(lambda: self.input_object_types[self.filter_input_type_name]),
+                    description='`Or` field',
+                ),
+                settings.NOT_KEY: graphene.InputField(
+                    lambda: self.input_object_types[self.filter_input_type_name],
+                    description='`Not` field',
+                ),
+            },
         )
-        return self.input_object_types[self.filter_input_type_name]
 
     def create_filter_input_subfield(
         self,
-        root: Node,
+        root: FilterTrieNode,
         prefix: str,
         description: str,
     ) -> graphene.InputField:
         """Create a filter input subfield from a filter set subtree."""
-        fields: Dict[str, graphene.InputField] = {}
         if root.name in self.SPECIAL_FILTER_INPUT_TYPES_FACTORIES:
             return self.SPECIAL_FILTER_INPUT_TYPES_FACTORIES[root.name]()
-        else:
-            for child in root.children:
-                if child.height == 0:
-                    filter_name = f'{LOOKUP_SEP}'.join(
-                        node.name for node in child.path
-                        if node.name != django_settings.DEFAULT_LOOKUP_EXPR
-                    )
-                    fields[child.name] = self.get_field(
-                        filter_name,
-                        self.filterset_class.base_filters[filter_name],
-                    )
-                else:
-                    fields[child.name] = self.create_filter_input_subfield(
-                        child,
-                        prefix + pascalcase(root.name),
-                        f'`{pascalcase(child.name)}` subfield',
-                    )
         return graphene.InputField(
-            self.create_input_object_type(
-                f'{prefix}{pascalcase(root.name)}FilterInputType',
-                fields,
-            ),
+            self.create_filter_input_subtype(root, prefix),
             description=description,
         )
 
-    @classmethod
+    def create_filter_input_subtype(
+        self,
+        root: FilterTrieNode,
+        prefix: str,
+    ) -> Type[graphene.InputObjectType]:
+        """Return the filter input type of a filter set subtree, creating it once."""
+        if self.shared_input_types:
+            return self.create_shared_filter_input_subtype(root)
+        prefix = prefix + to_pascal_case(root.name)
+        input_object_type_name = f'{prefix}FilterInputType'
+
+        def create_input_object_type() -> Type[graphene.InputObjectType]:
+            fields = self.create_filter_input_subtype_fields(root, prefix)
+            if self.is_quantified(root):
+                fields.update(self.create_quantifier_subfields(input_object_type_name, fields))
+            return self.create_input_object_type(input_object_type_name, fields)
+
+        return self.input_object_types.get_or_create(
+            input_object_type_name,
+            create_input_object_type,
+        )
+
+    def create_shared_filter_input_subtype(
+        self,
+        root: FilterTrieNode,
+    ) -> Type[graphene.InputObjectType]:
+        """Return the shared filter input type with the fields of a filter set subtree.
+
+        Input types are hash-consed: subtrees with the same names, types and descriptions
+        of fields share one input type. Types with only lookups are named
+        by the type of their values and their lookups, e.g. `StringExactContainsFilterInputType`,
+        and other types by a hash of their fields.
+        """
+        fields = dict(sorted(self.create_filter_input_subtype_fields(root, '').items()))
+        is_quantified = self.is_quantified(root)
+        signature = (
+            tuple((name, str(field.type), field.description) for name, field in fields.items()),
+            is_quantified,
+        )
+        signature_hash = get_hash(repr(signature))[:12]
+        if all(child.is_leaf for child in root.children.values()):
+            value_type = next(iter(fields.values())).type
+            while hasattr(value_type, 'of_type'):
+                value_type = value_type.of_type
+            prefix = str(value_type) + ''.join(to_pascal_case(name) for name in fields)
+            input_object_type_name = f'{prefix}FilterInputType'
+            if not self.input_object_types.reserve_name(input_object_type_name, signature):
+                input_object_type_name = f'{prefix}{signature_hash}FilterInputType'
+        else:
+            input_object_type_name = f'Shared{signature_hash}FilterInputType'
+
+        def create_input_object_type() -> Type[graphene.InputObjectType]:
+            if is_quantified:
+                fields.update(self.create_quantifier_subfields(input_object_type_name, fields))
+            return self.create_input_object_type(input_object_type_name, fields)
+
+        return self.input_object_types.get_or_create(
+            input_object_type_name,
+            create_input_object_type,
+        )
+
+    def create_filter_input_subtype_fields(
+        self,
+        root: FilterTrieNode,
+        prefix: str,
+    ) -> Dict[str, graphene.InputField]:
+        """Create lookup and subtree fields of the filter input type of a filter set subtree."""
+        fields: Dict[str, graphene.InputField] = {}
+        for child in root.children.values():
+            if child.is_leaf:
+                filter_name = self.get_filter_name(self.filterset_class, child.path)
+                fields[child.name] = self.get_field(
+                    filter_name,
+                    self.filterset_class.base_filters[filter_name],
+                )
+            else:
+                fields[child.name] = self.create_filter_input_subfield(
+                    child,
+                    prefix,
+                    f'`{to_pascal_case(child.name)}` subfield',
+                )
+        return fields
+
+    def is_quantified(self, root: FilterTrieNode) -> bool:
+        """Return whether a filter set subtree is a to-many relation with quantifiers."""
+        relation_path = LOOKUP_SEP.join(root.path)
+        return relation_path in self.filterset_class.meta_index.quantified_relation_paths
+
+    def create_quantifier_subfields(
+        self,
+        input_object_type_name: str,
+        fields: Dict[str, graphene.InputField],
+    ) -> Dict[str, graphene.InputField]:
+        """Create `some`, `every` and `none` subfields of a to-many relation subfield.
+
+        Operands of quantifiers have an input type with the fields of the relation
+        but without quantifiers, so quantifiers can not be nested in each other.
+        """
+        operand_type_name = input_object_type_name.replace(
+            'FilterInputType',
+            'QuantifierFilterInputType',
+        )
+        operand_type = self.input_object_types.get_or_create(
+            operand_type_name,
+            lambda: self.create_input_object_type(operand_type_name, dict(fields)),
+        )
+        descriptions = {
+            'some': 'Whether some related object satisfies the filter',
+            'every': 'Whether every related object satisfies the filter',
+            'none': 'Whether no related object satisfies the filter',
+        }
+        return {
+            quantifier: graphene.InputField(
+                operand_type,
+                description=f'`{to_pascal_case(quantifier)}` field. {descriptions[quantifier]}',
+            )
+            for quantifier in QUANTIFIERS
+        }
+
+    @staticmethod
     def create_input_object_type(
-        cls,
         name: str,
         fields: Dict[str, Any],
     ) -> Type[graphene.InputObjectType]:
         """Create an inheritor for the `InputObjectType` class."""
-        if name in cls.input_object_types:
-            return cls.input_object_types[name]
-        cls.input_object_types[name] = cast(
+        return cast(
             Type[graphene.InputObjectType],
             type(
                 name,
@@ -152,11 +276,23 @@ class FilterArgumentsFactory:
                 fields,
             ),
         )
-        return cls.input_object_types[name]
 
     def get_field(self, name: str, filter_field: Filter) -> graphene.InputField:
         """Return Graphene input field from a filter field.
 
+        The field is created from the artifact of the `FILTER_ARGUMENTS_ARTIFACT` setting
+        if the artifact has the current definition of the filterset class.
+        """
+        if self.field_specs is not None and name in self.field_specs:
+            return create_input_field(
+                self.field_specs[name],
+                self.get_default_description(filter_field),
+            )
+        return self.create_field(name, filter_field)
+
+    def create_field(self, name: str, filter_field: Filter) -> graphene.InputField:
+        """Create Graphene input field from a filter field.
+
         It is a partial copy of the `get_filtering_args_from_filterset` function
         from graphene-django.
         https://github.com/graphql-python/graphene-django/blob/caf954861025b9f3d9d3f9c204a7cbbc87352265/graphene_django/filter/utils.py#L11
@@ -180,39 +316,87 @@ class FilterArgumentsFactory:
             field = graphene.List(field.get_type())
         field_type = field.InputField()
         field_type.description = getattr(filter_field, 'label') or \
-            f'`{pascalcase(filter_field.lookup_expr)}` lookup'
+            self.get_default_description(filter_field)
         return field_type
 
+    @staticmethod
+    def get_default_description(filter_field: Filter) -> str:
+        """Return the description of an input field of a filter without a label."""
+        return f'`{to_pascal_case(filter_field.lookup_expr)}` lookup'
+
     @classmethod
-    def filterset_to_trees(cls, filterset_class: Type[AdvancedFilterSet]) -> List[Node]:
-        """Convert a FilterSet class to trees."""
-        trees: List[Node] = []
-        for filter_value in filterset_class.base_filters.values():
-            values = (*filter_value.field_name.split(LOOKUP_SEP), filter_value.lookup_expr)
-            if len(trees) == 0 or not any([cls.try_add_sequence(tree, values) for tree in trees]):
-                trees.append(cls.sequence_to_tree(values))
-        return trees
+    def create_input_paths(
+        cls,
+        filterset_class: Type[AdvancedFilterSet],
+        roots: List[FilterTrieNode],
+    ) -> Dict[Tuple[str, ...], FilterInputPath]:
+        """Create the map of paths of input fields to targets in the FilterSet data.
+
+        The map follows the structure of input types created from the same trees:
+        lookups are mapped to filter names, special filters to their data factories
+        and filter names of their lookups, and quantifiers of to-many relations to their keys.
+        """
+        input_paths: Dict[Tuple[str, ...], FilterInputPath] = {}
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if node.name in DATA_FACTORIES:
+                input_paths[node.path] = FilterInputPath(
+                    LOOKUP_SEP.join(node.path),
+                    data_factory=DATA_FACTORIES[node.name],
+                    lookup_data_keys={
+                        lookup: cls.get_filter_name(filterset_class, (*node.path, lookup))
+                        for lookup in node.children
+                    },
+                )
+            elif node.is_leaf:
+                input_paths[node.path] = FilterInputPath(
+                    cls.get_filter_name(filterset_class, node.path),
+                )
+            else:
+                stack.extend(node.children.values())
+                relation_path = LOOKUP_SEP.join(node.path)
+                if relation_path in filterset_class.meta_index.quantified_relation_paths:
+                    for quantifier in QUANTIFIERS:
+                        input_paths[(*node.path, quantifier)] = FilterInputPath(
+                            f'{relation_path}{LOOKUP_SEP}{quantifier}',
+                            relation_path=node.path,
+                        )
+        return input_paths
+
+    @staticmethod
+    def get_filter_name(filterset_class: Type[AdvancedFilterSet], path: Sequence[str]) -> str:
+        """Return the name of a filter from a path of its field name and its lookup expression."""
+        return filterset_class.meta_index.filter_names_by_lookup[
+            (LOOKUP_SEP.join(path[:-1]), path[-1])
+        ]
 
     @classmethod
-    def try_add_sequence(cls, root: Node, values: Sequence[str]) -> bool:
-        """Try to add a sequence to a tree.
+    def filterset_to_trees(cls, filterset_class: Type[AdvancedFilterSet]) -> List[FilterTrieNode]:
+        """Convert a FilterSet class to trees.
 
-        Return a flag indicating whether the mutation was made.
+        Children of nodes are stored in dicts, so the conversion takes
+        linear time in the number of filters.
         """
-        if root.name == values[0]:
-            for child in root.children:
-                is_mutated = cls.try_add_sequence(child, values[1:])
-                if is_mutated:
-                    return True
-            root.children = (*root.children, cls.sequence_to_tree(values[1:]))
-            return True
-        else:
-            return False
+        roots: Dict[str, FilterTrieNode] = {}
+        for filter_value in filterset_class.base_filters.values():
+            cls.add_sequence(
+                roots,
+                (*filter_value.field_name.split(LOOKUP_SEP), filter_value.lookup_expr),
+            )
+        return list(roots.values())
 
     @staticmethod
-    def sequence_to_tree(values: Sequence[str]) -> Node:
-        """Convert a sequence to a tree."""
-        node: Optional[Node] = None
-        for value in values:
-            node = Node(name=value, parent=node)
-        return node.root
+    def add_sequence(
+        roots: Dict[str, FilterTrieNode],
+        values: Sequence[str],
+    ) -> FilterTrieNode:
+        """Add a sequence to trees and return the node of its last value."""
+        children = roots
+        node: Optional[FilterTrieNode] = None
+        for index, value in enumerate(values):
+            node = children.get(value, None)
+            if node is None:
+                node = children[value] = FilterTrieNode(value, tuple(values[:index + 1]), {})
+            children = node.children
+        return node
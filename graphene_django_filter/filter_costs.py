@@ -0,0 +1,144 @@
+"""Static cost model of filter input data.
+
+The cost is estimated on the raw input data of the filter argument
+before it is converted to the FilterSet data, so filters exceeding
+limits are rejected before forms are built and queries are compiled.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Tuple, Type
+
+from django.core.exceptions import ValidationError
+from django.db.models.constants import LOOKUP_SEP
+from graphene.types.inputobjecttype import InputObjectTypeContainer
+
+from .conf import settings
+from .filter_plans import QUANTIFIERS
+from .filters import SearchQueryFilter, SearchRankFilter, TrigramFilter
+from .filterset import AdvancedFilterSet
+
+SEARCH_POSTFIXES = (SearchQueryFilter.postfix, SearchRankFilter.postfix, TrigramFilter.postfix)
+DEFAULT_FILTER_COST_WEIGHTS = {
+    'leaf': 1,
+    'branch': 1,
+    'list_item': 0.1,
+    'join': 5,
+    'search_leaf': 10,
+}
+FILTER_COST_LIMITS = (
+    ('MAX_FILTER_DEPTH', 'depth', 'depth'),
+    ('MAX_FILTER_BRANCHES', 'branches', 'number of `and`/`or` branches'),
+    ('MAX_FILTER_LEAVES', 'leaves', 'number of lookups'),
+    ('MAX_FILTER_LIST_SIZE', 'max_list_size', 'list size'),
+    ('MAX_FILTER_COST', 'cost', 'cost'),
+)
+
+
+class FilterCost(NamedTuple):
+    """Statistics and the total cost of filter input data."""
+
+    depth: int
+    branches: int
+    leaves: int
+    list_items: int
+    max_list_size: int
+    joins: int
+    search_leaves: int
+    cost: float
+
+
+def estimate_filter_cost(
+    filterset_class: Type[AdvancedFilterSet],
+    tree_input_type: InputObjectTypeContainer,
+) -> FilterCost:
+    """Estimate the cost of a tree_input_type.
+
+    The depth is the nesting level of input objects.
+    Lookups of to-many relations and quantifiers are counted as joins,
+    and full text search fields are counted as search leaves.
+    Trees are traversed iteratively, so the depth is not limited by the recursion limit.
+    """
+    quantified_relation_paths = filterset_class.meta_index.quantified_relation_paths
+    logical_keys = (settings.AND_KEY, settings.OR_KEY)
+    depth = branches = leaves = list_items = max_list_size = joins = search_leaves = 0
+    stack: List[Tuple[InputObjectTypeContainer, Tuple[str, ...], int, bool]] = [
+        (tree_input_type, (), 1, False),
+    ]
+    while stack:
+        container, path, level, is_to_many = stack.pop()
+        depth = max(depth, level)
+        for key, value in container.items():
+            if value is None:
+                continue
+            if key in logical_keys:
+                branches += len(value)
+                stack.extend((subtree, path, level + 1, is_to_many) for subtree in value)
+            elif key == settings.NOT_KEY:
+                stack.append((value, path, level + 1, is_to_many))
+            elif path and key in QUANTIFIERS:
+                joins += 1
+                stack.append((value, path, level + 1, is_to_many))
+            elif key in SEARCH_POSTFIXES:
+                leaves += 1
+                search_leaves += 1
+            elif isinstance(value, InputObjectTypeContainer):
+                subpath = (*path, key)
+                stack.append((
+                    value,
+                    subpath,
+                    level + 1,
+                    is_to_many or LOOKUP_SEP.join(subpath) in quantified_relation_paths,
+                ))
+            else:
+                leaves += 1
+                joins += is_to_many
+                if isinstance(value, (list, tuple)):
+                    list_items += len(value)
+                    max_list_size = max(max_list_size, len(value))
+    weights = get_filter_cost_weights()
+    cost = sum((
+        weights['leaf'] * leaves,
+        weights['branch'] * branches,
+        weights['list_item'] * list_items,
+        weights['join'] * joins,
+        weights['search_leaf'] * search_leaves,
+    ))
+    return FilterCost(
+        depth,
+        branches,
+        leaves,
+        list_items,
+        max_list_size,
+        joins,
+        search_leaves,
+        cost,
+    )
+
+
+def validate_filter_cost(
+    filterset_class: Type[AdvancedFilterSet],
+    tree_input_type: InputObjectTypeContainer,
+) -> None:
+    """Validate that the cost of a tree_input_type does not exceed limits from settings.
+
+    The cost is not estimated if no limits are set.
+    """
+    limits = [
+        (getattr(settings, setting_name), attribute_name, description)
+        for setting_name, attribute_name, description in FILTER_COST_LIMITS
+        if getattr(settings, setting_name) is not None
+    ]
+    if not limits:
+        return
+    filter_cost = estimate_filter_cost(filterset_class, tree_input_type)
+    for limit, attribute_name, description in limits:
+        value = getattr(filter_cost, attribute_name)
+        if value > limit:
+            raise ValidationError(
+                f'The filter {description} {value:g} exceeds the limit of {limit:g}',
+                code='filter_cost',
+            )
+
+
+def get_filter_cost_weights() -> Dict[str, Any]:
+    """Return filter cost weights from settings completed with default ones."""
+    return {**DEFAULT_FILTER_COST_WEIGHTS, **settings.FILTER_COST_WEIGHTS}
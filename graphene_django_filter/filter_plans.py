@@ -0,0 +1,560 @@
+"""Compiled filter plans.
+
+A filter plan is compiled once for a filter tree shape,
+i.e. the `and`/`or`/`not` structure with filter names but without values.
+Binding the plan to the values of a concrete filter tree produces a Q object
+without resolving and inspecting filters on every request.
+Shapes are compiled and plans are bound recursively, and so are Q objects
+compiled to SQL by Django, so normalized trees deeper than the `MAX_FILTER_PLAN_DEPTH`
+setting are rejected with a validation error instead of hitting the recursion limit.
+"""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    TYPE_CHECKING,
+    Tuple,
+    Type,
+    Union,
+)
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from django.forms import Form
+from django_filters import Filter
+from django_filters.constants import EMPTY_VALUES
+
+from .caches import LRUCache
+from .conf import settings
+
+if TYPE_CHECKING:
+    from .filterset import AdvancedFilterSet
+
+
+class FilterLeaf(NamedTuple):
+    """Leaf of a filter tree: a filter name and its cleaned value.
+
+    Leaves created during normalization are not bound to filters
+    and have a lookup applied to the value directly.
+    """
+
+    name: str
+    value: Any
+    lookup: Optional[str] = None
+
+
+class FilterNode(NamedTuple):
+    """Inner node of a filter tree: a logical operator and its operands.
+
+    Nodes of quantifiers (`some`, `every` and `none`) have a path of a to-many relation
+    and apply the conjunction of their operands to related objects.
+    """
+
+    operator: str
+    children: Tuple[Union['FilterNode', FilterLeaf], ...]
+    relation: Optional[str] = None
+
+
+class SubqueryLookup(NamedTuple):
+    """Lookup across a to-many relation rewritten as a correlated subquery.
+
+    Related objects are filtered by `back_lookup` equal to the outer reference
+    and by `inner_lookup` applied to the value.
+    """
+
+    relation_path: str
+    related_model: Type[models.Model]
+    back_lookup: str
+    outer_ref: str
+    inner_lookup: str
+
+
+FilterTree = Union[FilterNode, FilterLeaf]
+LOOKUP_OPERATOR = 'lookup'
+QUANTIFIERS = ('some', 'every', 'none')
+Builder = Callable[
+    ['AdvancedFilterSet', models.QuerySet, FilterTree],
+    Tuple[models.QuerySet, models.Q],
+]
+
+
+def create_filter_tree(form: Form) -> FilterNode:
+    """Create a filter tree from a validated tree-like form.
+
+    Only filters whose names are present in the form data become leaves.
+    """
+    children = [
+        FilterLeaf(name, value) for name, value in form.cleaned_data.items() if name in form.data
+    ]
+    if form.and_forms:
+        children.append(
+            FilterNode('and', tuple(create_filter_tree(and_form) for and_form in form.and_forms)),
+        )
+    if form.or_forms:
+        children.append(
+            FilterNode('or', tuple(create_filter_tree(or_form) for or_form in form.or_forms)),
+        )
+    if form.not_form:
+        children.append(FilterNode('not', (create_filter_tree(form.not_form),)))
+    for quantifier, relation, quantifier_form in form.quantifier_forms:
+        children.append(
+            FilterNode(quantifier, create_filter_tree(quantifier_form).children, relation),
+        )
+    return FilterNode('and', tuple(children))
+
+
+def get_tree_depth(tree: FilterTree) -> int:
+    """Return the number of nested nodes of a filter tree.
+
+    The tree is traversed iteratively, so its depth is not limited by the recursion limit.
+    """
+    depth = 0
+    stack = [(tree, 0)]
+    while stack:
+        node, node_depth = stack.pop()
+        if isinstance(node, FilterNode):
+            depth = max(depth, node_depth + 1)
+            stack.extend((child, node_depth + 1) for child in node.children)
+    return depth
+
+
+def check_tree_depth(tree: FilterTree) -> None:
+    """Raise a validation error if a filter tree is too deep to compile a plan for it."""
+    max_depth = settings.MAX_FILTER_PLAN_DEPTH
+    if max_depth is None:
+        return
+    depth = get_tree_depth(tree)
+    if depth > max_depth:
+        raise ValidationError(
+            f'The normalized filter depth {depth} exceeds the limit of {max_depth}',
+            code='max_plan_depth',
+        )
+
+
+def get_tree_shape(tree: FilterTree) -> Hashable:
+    """Return a hashable shape of a filter tree, i.e. the tree without values."""
+    if isinstance(tree, FilterLeaf):
+        return tree.name if tree.lookup is None else (LOOKUP_OPERATOR, tree.lookup)
+    children_shapes = tuple(get_tree_shape(child) for child in tree.children)
+    if tree.relation is None:
+        return tree.operator, children_shapes
+    return tree.operator, children_shapes, tree.relation
+
+
+def is_simple_filter(filter_value: Filter) -> bool:
+    """Determine whether a filter only applies its lookup to a value.
+
+    Such filters can be replaced by a Q object built directly from the lookup.
+    """
+    return type(filter_value).filter is Filter.filter and filter_value.method is None
+
+
+class FilterPlan:
+    """Compiled builder of Q objects for filter trees of the same shape."""
+
+    def __init__(self, shape: Hashable, builder: Builder) -> None:
+        self.shape = shape
+        self.builder = builder
+
+    def bind(
+        self,
+        filterset: 'AdvancedFilterSet',
+        queryset: models.QuerySet,
+        tree: FilterTree,
+    ) -> Tuple[models.QuerySet, models.Q]:
+        """Bind values of a filter tree to the plan.
+
+        Return a QuerySet with the changes made by filters (e.g. annotations) and a Q object.
+        """
+        return self.builder(filterset, queryset, tree)
+
+
+def compile_filter_plan(
+    filterset_class: Type['AdvancedFilterSet'],
+    shape: Hashable,
+    filters: Optional[Mapping[str, Filter]] = None,
+) -> FilterPlan:
+    """Compile a filter plan for a filter tree shape.
+
+    Leaves are compiled from `filters`, the filters of the filterset class by default.
+    If the `EXISTS_SUBQUERIES` setting is enabled,
+    lookups across to-many relations are compiled to `EXISTS` subqueries.
+    """
+    return FilterPlan(
+        shape,
+        compile_builder(filterset_class, shape, settings.EXISTS_SUBQUERIES, filters),
+    )
+
+
+def compile_builder(
+    filterset_class: Type['AdvancedFilterSet'],
+    shape: Hashable,
+    exists_subqueries: bool = False,
+    filters: Optional[Mapping[str, Filter]] = None,
+) -> Builder:
+    """Compile a builder for a filter tree shape."""
+    if filters is None:
+        filters = filterset_class.base_filters
+    if is_leaf_shape(shape):
+        leaf_lookup = get_leaf_lookup(filterset_class, shape, filters)
+        if leaf_lookup is None:
+            return compile_leaf_builder(shape, filters[shape])
+        lookup, distinct, exclude = leaf_lookup
+        subquery_lookup = None
+        if exists_subqueries:
+            subquery_lookup = get_subquery_lookup(filterset_class._meta.model, lookup)
+        if subquery_lookup:
+            return compile_subquery_builder(subquery_lookup, exclude)
+        return compile_lookup_builder(lookup, distinct, exclude)
+    operator, children_shapes, *relation = shape
+    if relation:
+        return compile_quantifier_builder(
+            operator,
+            get_subquery_lookup(filterset_class._meta.model, relation[0]),
+            tuple(
+                compile_builder(filterset_class, child_shape, filters=filters)
+                for child_shape in children_shapes
+            ),
+        )
+    children_builders = tuple(
+        compile_builder(filterset_class, child_shape, exists_subqueries, filters)
+        for child_shape in children_shapes
+    )
+    if operator == 'and' and exists_subqueries:
+        subquery_groups = get_subquery_groups(filterset_class, children_shapes, filters)
+        if subquery_groups:
+            return compile_and_subqueries_builder(children_builders, subquery_groups)
+    return compile_node_builder(operator, children_builders)
+
+
+def is_leaf_shape(shape: Hashable) -> bool:
+    """Return whether a shape is a shape of a filter tree leaf."""
+    return isinstance(shape, str) or shape[0] == LOOKUP_OPERATOR
+
+
+def get_leaf_lookup(
+    filterset_class: Type['AdvancedFilterSet'],
+    shape: Hashable,
+    filters: Optional[Mapping[str, Filter]] = None,
+) -> Optional[Tuple[str, bool, bool]]:
+    """Return the lookup, `distinct` and `exclude` of a leaf shape applying a lookup to its value.
+
+    Return None if the value of the leaf is applied by a filter.
+    """
+    if not isinstance(shape, str):
+        return shape[1], False, False
+    filter_value = (filterset_class.base_filters if filters is None else filters)[shape]
+    if not is_simple_filter(filter_value):
+        return None
+    return (
+        f'{filter_value.field_name}{LOOKUP_SEP}{filter_value.lookup_expr}',
+        filter_value.distinct,
+        filter_value.exclude,
+    )
+
+
+def compile_leaf_builder(name: str, filter_value: Filter) -> Builder:
+    """Compile a builder for a filter tree leaf."""
+    if not is_simple_filter(filter_value):
+        from .filterset import QuerySetProxy
+
+        def build_filter(
+            filterset: 'AdvancedFilterSet',
+            queryset: models.QuerySet,
+            leaf: FilterLeaf,
+        ) -> Tuple[models.QuerySet, models.Q]:
+            qs, q = filterset.filters[name].filter(QuerySetProxy(queryset), leaf.value)
+            return qs, q
+        return build_filter
+    return compile_lookup_builder(
+        f'{filter_value.field_name}{LOOKUP_SEP}{filter_value.lookup_expr}',
+        distinct=filter_value.distinct,
+        exclude=filter_value.exclude,
+    )
+
+
+def compile_lookup_builder(lookup: str, distinct: bool = False, exclude: bool = False) -> Builder:
+    """Compile a builder for a filter tree leaf applying a lookup to its value."""
+    def build_lookup(
+        filterset: 'AdvancedFilterSet',
+        queryset: models.QuerySet,
+        leaf: FilterLeaf,
+    ) -> Tuple[models.QuerySet, models.Q]:
+        if leaf.value in EMPTY_VALUES:
+            return queryset, models.Q()
+        q = models.Q(**{lookup: leaf.value})
+        return queryset.distinct() if distinct else queryset, ~q if exclude else q
+    return build_lookup
+
+
+def compile_subquery_builder(subquery_lookup: SubqueryLookup, exclude: bool = False) -> Builder:
+    """Compile a builder for a filter tree leaf applying a lookup in a subquery.
+
+    Unlike joins, subqueries do not duplicate rows, so `distinct` is not needed.
+    """
+    def build_subquery(
+        filterset: 'AdvancedFilterSet',
+        queryset: models.QuerySet,
+        leaf: FilterLeaf,
+    ) -> Tuple[models.QuerySet, models.Q]:
+        q = create_exists_q((subquery_lookup,), (leaf.value,))
+        return queryset, ~q if exclude else q
+    return build_subquery
+
+
+def compile_node_builder(operator: str, children_builders: Tuple[Builder, ...]) -> Builder:
+    """Compile a builder for an inner node of a filter tree."""
+    def build_node(
+        filterset: 'AdvancedFilterSet',
+        queryset: models.QuerySet,
+        node: FilterNode,
+    ) -> Tuple[models.QuerySet, models.Q]:
+        q = models.Q()
+        for builder, child in zip(children_builders, node.children):
+            queryset, child_q = builder(filterset, queryset, child)
+            q = q | child_q if operator == 'or' else q & child_q
+        return queryset, ~q if operator == 'not' else q
+    return build_node
+
+
+def compile_and_subqueries_builder(
+    children_builders: Tuple[Builder, ...],
+    subquery_groups: Tuple[Tuple[Tuple[int, ...], Tuple[SubqueryLookup, ...]], ...],
+) -> Builder:
+    """Compile a builder for an `and` node with groups of leaves applied in subqueries.
+
+    `subquery_groups` contains positions of leaves and their lookups for each relation.
+    Leaves of a group are applied in one subquery, so they refer to the same related object
+    like lookups of the same relation in a join.
+    """
+    grouped_positions = {position for positions, _ in subquery_groups for position in positions}
+
+    def build_node(
+        filterset: 'AdvancedFilterSet',
+        queryset: models.QuerySet,
+        node: FilterNode,
+    ) -> Tuple[models.QuerySet, models.Q]:
+        q = models.Q()
+        for position, (builder, child) in enumerate(zip(children_builders, node.children)):
+            if position not in grouped_positions:
+                queryset, child_q = builder(filterset, queryset, child)
+                q &= child_q
+        for positions, subquery_lookups in subquery_groups:
+            q &= create_exists_q(
+                subquery_lookups,
+                tuple(node.children[position].value for position in positions),
+            )
+        return queryset, q
+    return build_node
+
+
+def compile_quantifier_builder(
+    quantifier: str,
+    subquery_lookup: SubqueryLookup,
+    children_builders: Tuple[Builder, ...],
+) -> Builder:
+    """Compile a builder for a quantifier node applying its operands in a subquery.
+
+    `some` and `none` check whether a related object satisfying the operands exists or not,
+    and `every` checks that no related object violates them.
+    """
+    def build_quantifier(
+        filterset: 'AdvancedFilterSet',
+        queryset: models.QuerySet,
+        node: FilterNode,
+    ) -> Tuple[models.QuerySet, models.Q]:
+        q = models.Q()
+        for builder, child in zip(children_builders, node.children):
+            qs, child_q = builder(filterset, queryset, child)
+            if qs.query.annotations.keys() != queryset.query.annotations.keys():
+                raise ValidationError(
+                    'Filters with annotations can not be used in '
+                    f'the `{quantifier}` quantifier of the `{subquery_lookup.relation_path}` field',
+                )
+            q &= child_q
+        inner_q = relativize_q(q, subquery_lookup)
+        if quantifier == 'every' and not inner_q:
+            return queryset, inner_q
+        subquery = subquery_lookup.related_model._default_manager.filter(
+            **{subquery_lookup.back_lookup: models.OuterRef(subquery_lookup.outer_ref)},
+        )
+        if quantifier == 'every':
+            return queryset, ~models.Q(models.Exists(subquery.exclude(inner_q)))
+        exists_q = models.Q(models.Exists(subquery.filter(inner_q)))
+        return queryset, ~exists_q if quantifier == 'none' else exists_q
+    return build_quantifier
+
+
+def relativize_q(q: models.Q, subquery_lookup: SubqueryLookup) -> models.Q:
+    """Return a Q object with lookups across a to-many relation relative to the related model."""
+    relation_path = subquery_lookup.relation_path
+    relation_prefix = f'{relation_path}{LOOKUP_SEP}'
+    children = []
+    for child in q.children:
+        if isinstance(child, models.Q):
+            children.append(relativize_q(child, subquery_lookup))
+        elif isinstance(child, tuple) and (
+            child[0] == relation_path or child[0].startswith(relation_prefix)
+        ):
+            lookup = get_inner_lookup(
+                subquery_lookup.related_model,
+                child[0][len(relation_prefix):],
+            )
+            children.append((lookup, get_inner_value(lookup, child[1])))
+        else:
+            raise ValidationError(
+                f'Only lookups of the `{relation_path}` field can be used in its quantifiers',
+            )
+    return models.Q(*children, _connector=q.connector, _negated=q.negated)
+
+
+def get_subquery_groups(
+    filterset_class: Type['AdvancedFilterSet'],
+    children_shapes: Tuple[Hashable, ...],
+    filters: Optional[Mapping[str, Filter]] = None,
+) -> Tuple[Tuple[Tuple[int, ...], Tuple[SubqueryLookup, ...]], ...]:
+    """Group children of an `and` node applying lookups across the same to-many relation."""
+    groups: Dict[str, List[Tuple[int, SubqueryLookup]]] = {}
+    for position, child_shape in enumerate(children_shapes):
+        if not is_leaf_shape(child_shape):
+            continue
+        leaf_lookup = get_leaf_lookup(filterset_class, child_shape, filters)
+        if leaf_lookup is None or leaf_lookup[2]:
+            continue
+        subquery_lookup = get_subquery_lookup(filterset_class._meta.model, leaf_lookup[0])
+        if subquery_lookup:
+            groups.setdefault(subquery_lookup.relation_path, []).append(
+                (position, subquery_lookup),
+            )
+    return tuple(
+        (
+            tuple(position for position, _ in group),
+            tuple(subquery_lookup for _, subquery_lookup in group),
+        ) for group in groups.values()
+    )
+
+
+def create_exists_q(
+    subquery_lookups: Tuple[SubqueryLookup, ...],
+    values: Tuple[Any, ...],
+) -> models.Q:
+    """Create a Q object with an `EXISTS` subquery applying lookups of the same relation."""
+    inner_q = models.Q()
+    for subquery_lookup, value in zip(subquery_lookups, values):
+        if value not in EMPTY_VALUES:
+            inner_lookup = subquery_lookup.inner_lookup
+            inner_q &= models.Q(**{inner_lookup: get_inner_value(inner_lookup, value)})
+    if not inner_q:
+        return inner_q
+    subquery_lookup = subquery_lookups[0]
+    return models.Q(models.Exists(
+        subquery_lookup.related_model._default_manager.filter(
+            models.Q(**{subquery_lookup.back_lookup: models.OuterRef(subquery_lookup.outer_ref)}),
+            inner_q,
+        ),
+    ))
+
+
+def get_subquery_lookup(model: Type[models.Model], lookup: str) -> Optional[SubqueryLookup]:
+    """Return a lookup across a to-many relation rewritten as a correlated subquery.
+
+    Return None if the lookup does not follow to-many relations or can not be rewritten.
+    """
+    split_path = split_to_many_path(model, lookup)
+    if split_path is None:
+        return None
+    outer_path, relation, inner_lookup = split_path
+    if isinstance(relation, models.ManyToManyField):
+        back_lookup = relation.related_query_name()
+        outer_field_name = 'pk'
+    elif isinstance(relation, models.ForeignObjectRel):
+        back_lookup = relation.field.name
+        outer_field_name = 'pk' if relation.many_to_many else relation.field.target_field.name
+    else:
+        return None
+    if back_lookup.endswith('+'):
+        return None
+    related_model = relation.related_model
+    inner_lookup = get_inner_lookup(related_model, inner_lookup)
+    if inner_lookup == f'pk{LOOKUP_SEP}isnull':
+        return None
+    return SubqueryLookup(
+        relation_path=LOOKUP_SEP.join((*outer_path, relation.name)),
+        related_model=related_model,
+        back_lookup=back_lookup,
+        outer_ref=LOOKUP_SEP.join((*outer_path, outer_field_name)),
+        inner_lookup=inner_lookup,
+    )
+
+
+def get_inner_lookup(related_model: Type[models.Model], lookup: str) -> str:
+    """Return a lookup of a related model from the rest of a lookup after a relation.
+
+    Lookups of the relation itself (e.g. `in`) are applied to the primary key.
+    """
+    parts = lookup.split(LOOKUP_SEP) if lookup else []
+    if not parts or not has_field(related_model, parts[0]):
+        parts.insert(0, 'pk')
+    return LOOKUP_SEP.join(parts)
+
+
+def split_to_many_path(
+    model: Type[models.Model],
+    path: str,
+) -> Optional[Tuple[Tuple[str, ...], Any, str]]:
+    """Split a path of a model field at the first many-to-many or one-to-many relation.
+
+    Return the path to the relation, the relation and the rest of the path
+    or None if the path does not follow to-many relations.
+    """
+    opts = model._meta
+    parts = path.split(LOOKUP_SEP)
+    for i, part in enumerate(parts):
+        try:
+            field = opts.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if not field.is_relation:
+            return None
+        if field.many_to_many or field.one_to_many:
+            return tuple(parts[:i]), field, LOOKUP_SEP.join(parts[i + 1:])
+        opts = field.related_model._meta
+    return None
+
+
+def is_multi_valued_path(model: Type[models.Model], field_name: str) -> bool:
+    """Return whether a path of a model field follows many-to-many or one-to-many relations."""
+    return split_to_many_path(model, field_name) is not None
+
+
+def get_inner_value(inner_lookup: str, value: Any) -> Any:
+    """Return a value of a lookup of a related model.
+
+    Related objects given for lookups of a relation itself are replaced by primary keys.
+    """
+    if inner_lookup.split(LOOKUP_SEP, 1)[0] != 'pk':
+        return value
+    if isinstance(value, models.Model):
+        return value.pk
+    if isinstance(value, (list, tuple)):
+        return type(value)(get_inner_value(inner_lookup, v) for v in value)
+    return value
+
+
+def has_field(model: Type[models.Model], name: str) -> bool:
+    """Return whether a model has a field with a name."""
+    try:
+        model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+filter_plan_cache = LRUCache(settings.FILTER_PLAN_CACHE_SIZE)
@@ -1,6 +1,9 @@
 """Additional filters for special lookups."""
 
-from typing import Any, Callable, NamedTuple, Optional, Union
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Union
 
 from django.contrib.postgres.search import (
     SearchQuery,
@@ -14,6 +17,27 @@ from django.db.models.constants import LOOKUP_SEP
 from django_filters import Filter
 from django_filters.constants import EMPTY_VALUES
 
+from .conf import settings
+
+annotation_counter: 'ContextVar[Optional[Iterator[int]]]' = ContextVar(
+    'annotation_counter',
+    default=None,
+)
+
+
+@contextmanager
+def annotation_scope() -> Iterator[None]:
+    """Enumerate annotations of annotated filters from zero within the scope.
+
+    Names of annotations do not depend on the state of filters in the scope,
+    so the same filters give the same SQL in every request and thread.
+    """
+    token = annotation_counter.set(itertools.count())
+    try:
+        yield
+    finally:
+        annotation_counter.reset(token)
+
 
 class AnnotatedFilter(Filter):
     """Filter with a QuerySet object annotation."""
@@ -48,18 +72,33 @@ class AnnotatedFilter(Filter):
 
     @property
     def annotation_name(self) -> str:
-        """Return the name used for the annotation."""
+        """Return the name used for the annotation outside of an annotation scope."""
         return f'{self.field_name}_{self.postfix}_{self.creation_counter}_{self.filter_counter}'
 
+    def get_scoped_annotation_name(self, index: int) -> str:
+        """Return the name used for the annotation with an index of an annotation scope."""
+        return f'{self.field_name}_{self.postfix}_{index}'
+
     def filter(self, qs: models.QuerySet, value: Value) -> models.QuerySet:
-        """Filter a QuerySet using annotation."""
+        """Filter a QuerySet using annotation.
+
+        The annotation is added to the SELECT list only if the `ANNOTATE_SEARCH_VALUES`
+        setting is enabled, otherwise it is used only for filtering.
+        """
         if value in EMPTY_VALUES:
             return qs
         if self.distinct:
             qs = qs.distinct()
-        annotation_name = self.annotation_name
-        self.filter_counter += 1
-        qs = qs.annotate(**{annotation_name: value.annotation_value})
+        counter = annotation_counter.get()
+        if counter is None:
+            annotation_name = self.annotation_name
+            self.filter_counter += 1
+        else:
+            annotation_name = self.get_scoped_annotation_name(next(counter))
+        if settings.ANNOTATE_SEARCH_VALUES:
+            qs = qs.annotate(**{annotation_name: value.annotation_value})
+        else:
+            qs = qs.alias(**{annotation_name: value.annotation_value})
         lookup = f'{annotation_name}{LOOKUP_SEP}{self.lookup_expr}'
         return self.get_method(qs)(**{lookup: value.search_value})
 
@@ -5,7 +5,19 @@ Use the `AdvancedFilterSet` class from this module instead of the `FilterSet` fr
 
 import warnings
 from collections import OrderedDict
-from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union, cast
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
 
 from django.db import connection, models
 from django.db.models.constants import LOOKUP_SEP
@@ -17,6 +29,26 @@ from django_filters.filterset import BaseFilterSet, FilterSetMetaclass
 from wrapt import ObjectProxy
 
 from .conf import settings
+from .filter_plans import (
+    FilterNode,
+    FilterPlan,
+    FilterTree,
+    QUANTIFIERS,
+    check_tree_depth,
+    compile_filter_plan,
+    create_filter_tree,
+    filter_plan_cache,
+    get_subquery_lookup,
+    get_tree_shape,
+    is_multi_valued_path,
+    is_simple_filter,
+)
+from .filters import annotation_scope
+from .normalization import COMPARISON_LOOKUP_EXPRS, NONE_TREE, normalize_filter_tree
+from .result_cache import cache_result, get_path_models, track_models
+from .validation import clean_filter_tree
+
+FILTER_CACHE_ATTRIBUTES = ('_field', '_label')
 
 
 class QuerySetProxy(ObjectProxy):
@@ -86,9 +118,127 @@ def is_regular_lookup_expr(lookup_expr: str) -> bool:
     ])
 
 
-class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
+def get_mergeable_filters(
+    model: Optional[Type[models.Model]],
+    filters: Mapping[str, Filter],
+) -> Tuple[Dict[str, str], Dict[str, Tuple[str, str]]]:
+    """Return filters that normalization can merge.
+
+    The first dict maps names of exact filters to their field names,
+    and the second maps names of comparison filters to their field names and lookup expressions.
+    """
+    lookup_filters = [
+        (name, filter_value)
+        for name, filter_value in filters.items()
+        if all((
+            is_simple_filter(filter_value),
+            not filter_value.distinct,
+            not filter_value.exclude,
+        ))
+    ]
+    exact_filter_fields = {
+        name: filter_value.field_name
+        for name, filter_value in lookup_filters
+        if filter_value.lookup_expr == 'exact'
+    }
+    comparison_filters: Dict[str, Tuple[str, str]] = {}
+    if model:
+        comparison_filters = {
+            name: (filter_value.field_name, filter_value.lookup_expr)
+            for name, filter_value in lookup_filters
+            if all((
+                filter_value.lookup_expr in COMPARISON_LOOKUP_EXPRS,
+                not is_multi_valued_path(model, filter_value.field_name),
+            ))
+        }
+    return exact_filter_fields, comparison_filters
+
+
+class FilterSetMetaIndex:
+    """Class-level facts about an `AdvancedFilterSet` class.
+
+    The index is built once for each class, so requests do not derive these facts again.
+    """
+
+    def __init__(self, filterset_class: Type['AdvancedFilterSet']) -> None:
+        if filterset_class._meta.model:
+            self.fields = filterset_class._get_fields(is_regular_lookup_expr)
+            self.full_text_search_fields = filterset_class._get_fields(
+                is_full_text_search_lookup_expr,
+            )
+        else:
+            self.fields = OrderedDict()
+            self.full_text_search_fields = OrderedDict()
+        self.filter_names_by_lookup: Dict[Tuple[str, str], str] = {}
+        for name, filter_value in filterset_class.base_filters.items():
+            self.filter_names_by_lookup.setdefault(
+                (filter_value.field_name, filter_value.lookup_expr),
+                name,
+            )
+        self.filter_positions = {
+            name: position for position, name in enumerate(filterset_class.base_filters)
+        }
+        self.required_filter_names = tuple(
+            name for name, filter_value in filterset_class.base_filters.items()
+            if filter_value.extra.get('required', False)
+        )
+        self.exact_filter_fields, self.comparison_filters = get_mergeable_filters(
+            filterset_class._meta.model,
+            filterset_class.base_filters,
+        )
+        self.quantifier_keys: Dict[str, Tuple[str, str]] = {}
+        if filterset_class._meta.model:
+            for filter_value in filterset_class.base_filters.values():
+                subquery_lookup = get_subquery_lookup(
+                    filterset_class._meta.model,
+                    filter_value.field_name,
+                )
+                if subquery_lookup:
+                    for quantifier in QUANTIFIERS:
+                        relation_path = subquery_lookup.relation_path
+                        self.quantifier_keys[f'{relation_path}{LOOKUP_SEP}{quantifier}'] = (
+                            quantifier,
+                            relation_path,
+                        )
+        self.quantified_relation_paths = {
+            relation_path for _, relation_path in self.quantifier_keys.values()
+        }
+        self.result_models: Tuple[Type[models.Model], ...] = ()
+        if filterset_class._meta.model:
+            result_models = {filterset_class._meta.model}
+            for filter_value in filterset_class.base_filters.values():
+                result_models.update(
+                    get_path_models(filterset_class._meta.model, filter_value.field_name),
+                )
+            self.result_models = tuple(
+                sorted(result_models, key=lambda model: model._meta.label_lower),
+            )
+            track_models(self.result_models)
+        self.is_form_class_cacheable = not any(
+            callable(filter_value.extra.get(key, None))
+            for filter_value in filterset_class.base_filters.values()
+            for key in ('queryset', 'choices')
+        )
+        self.tree_form_class: Optional[Type[Union[Form, AdvancedFilterSet.TreeFormMixin]]] = None
+        self.input_paths: Optional[Dict[Tuple[str, ...], Any]] = None
+        self.definition_hash: Optional[str] = None
+
+
+class AdvancedFilterSetMetaclass(FilterSetMetaclass):
+    """Metaclass that builds the meta index of a filterset class."""
+
+    def __new__(cls, name: str, bases: Tuple[type, ...], attrs: Dict[str, Any]) -> type:
+        """Create a filterset class with its meta index."""
+        new_class = super().__new__(cls, name, bases, attrs)
+        new_class.meta_index = FilterSetMetaIndex(new_class)
+        return new_class
+
+
+class AdvancedFilterSet(BaseFilterSet, metaclass=AdvancedFilterSetMetaclass):
     """Allow you to use advanced filters."""
 
+    meta_index: FilterSetMetaIndex
+
     class TreeFormMixin(Form):
         """Tree-like form mixin."""
 
@@ -97,6 +247,9 @@ class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
             and_forms: Optional[List['AdvancedFilterSet.TreeFormMixin']] = None,
             or_forms: Optional[List['AdvancedFilterSet.TreeFormMixin']] = None,
             not_form: Optional['AdvancedFilterSet.TreeFormMixin'] = None,
+            quantifier_forms: Optional[
+                List[Tuple[str, str, 'AdvancedFilterSet.TreeFormMixin']]
+            ] = None,
             *args,
             **kwargs
         ) -> None:
@@ -104,6 +257,7 @@ class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
             self.and_forms = and_forms or []
             self.or_forms = or_forms or []
             self.not_form = not_form
+            self.quantifier_forms = quantifier_forms or []
 
         @property
         def errors(self) -> ErrorDict:
@@ -118,13 +272,26 @@ class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
                     self_errors.update({key: errors})
             if self.not_form and self.not_form.errors:
                 self_errors.update({'not': self.not_form.errors})
+            for quantifier, relation_path, form in self.quantifier_forms:
+                if form.errors:
+                    self_errors.update({f'{relation_path}{LOOKUP_SEP}{quantifier}': form.errors})
             return self_errors
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.initial_filter_states = self.get_filter_states()
+
     def get_form_class(self) -> Type[Union[Form, TreeFormMixin]]:
         """Return a django Form class suitable of validating the filterset data.
 
         The form must be tree-like because the data is tree-like.
+        The class is created once if fields of filters do not depend on a request
+        and filters are not changed after the filterset is initialized,
+        e.g. by setting a queryset of a filter in the `__init__` method of a subclass.
         """
+        is_unchanged = not self.has_changed_filters()
+        if is_unchanged and self.meta_index.tree_form_class:
+            return self.meta_index.tree_form_class
         form_class = super(AdvancedFilterSet, self).get_form_class()
         tree_form = cast(
             Type[Union[Form, AdvancedFilterSet.TreeFormMixin]],
@@ -135,8 +302,35 @@ class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
             ),
 
         )
+        if is_unchanged and self.meta_index.is_form_class_cacheable:
+            self.meta_index.tree_form_class = tree_form
         return tree_form
 
+    def has_changed_filters(self) -> bool:
+        """Return whether filters were changed after the filterset was initialized."""
+        return self.get_filter_states() != self.initial_filter_states
+
+    def get_filter_states(self) -> Dict[str, Tuple[Filter, Dict[str, Any]]]:
+        """Return filters with the attributes that they filter and create form fields with.
+
+        Fields and labels are cached by filters when they are first used,
+        so labels are evaluated and cached fields are skipped.
+        """
+        return {
+            name: (
+                filter_value,
+                {
+                    **{
+                        k: v for k, v in vars(filter_value).items()
+                        if k not in FILTER_CACHE_ATTRIBUTES
+                    },
+                    'extra': dict(filter_value.extra),
+                    'label': filter_value.label,
+                },
+            )
+            for name, filter_value in self.filters.items()
+        }
+
     @property
     def form(self) -> Union[Form, TreeFormMixin]:
         """Return a django Form suitable of validating the filterset data."""
@@ -154,11 +348,19 @@ class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
         data: Dict[str, Any],
     ) -> Union[Form, TreeFormMixin]:
         """Create a form from a form class and data."""
+        quantifier_keys = self.meta_index.quantifier_keys
         return form_class(
-            data={k: v for k, v in data.items() if k not in ('and', 'or', 'not')},
+            data={
+                k: v for k, v in data.items()
+                if k not in ('and', 'or', 'not') and k not in quantifier_keys
+            },
             and_forms=[self.create_form(form_class, and_data) for and_data in data.get('and', [])],
             or_forms=[self.create_form(form_class, or_data) for or_data in data.get('or', [])],
             not_form=self.create_form(form_class, data['not']) if data.get('not', None) else None,
+            quantifier_forms=[
+                (*quantifier_keys[k], self.create_form(form_class, v))
+                for k, v in data.items() if k in quantifier_keys
+            ],
         )
 
     def find_filter(self, data_key: str) -> Filter:
@@ -175,39 +377,86 @@ class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
         key = field_name if lookup_expr == django_settings.DEFAULT_LOOKUP_EXPR else data_key
         if key in self.filters:
             return self.filters[key]
-        for filter_value in self.filters.values():
-            if filter_value.field_name == field_name and filter_value.lookup_expr == lookup_expr:
-                return filter_value
+        name = self.meta_index.filter_names_by_lookup.get((field_name, lookup_expr), None)
+        if name is not None:
+            return self.filters[name]
 
-    def filter_queryset(self, queryset: models.QuerySet) -> models.QuerySet:
-        """Filter a queryset with a top level form's `cleaned_data`."""
-        qs, q = self.get_queryset_proxy_for_form(queryset, self.form)
-        return qs.filter(q)
+    def is_valid(self) -> bool:
+        """Return True if the filterset data has no errors."""
+        if settings.FORM_FREE_VALIDATION:
+            return self.is_bound and not self.errors
+        return super().is_valid()
 
-    def get_queryset_proxy_for_form(
-        self,
-        queryset: models.QuerySet,
-        form: Union[Form, TreeFormMixin],
-    ) -> QuerySetProxy:
-        """Return a `QuerySetProxy` object for a form's `cleaned_data`."""
-        qs = queryset
-        q = models.Q()
-        for name, value in form.cleaned_data.items():
-            qs, q = self.find_filter(name).filter(QuerySetProxy(qs, q), value)
-        and_q = models.Q()
-        for and_form in form.and_forms:
-            qs, new_q = self.get_queryset_proxy_for_form(qs, and_form)
-            and_q = and_q & new_q
-        or_q = models.Q()
-        for or_form in form.or_forms:
-            qs, new_q = self.get_queryset_proxy_for_form(qs, or_form)
-            or_q = or_q | new_q
-        if form.not_form:
-            qs, new_q = self.get_queryset_proxy_for_form(queryset, form.not_form)
-            not_q = ~new_q
+    @property
+    def errors(self) -> ErrorDict:
+        """Return an ErrorDict for the filterset data.
+
+        Without forms the errors have the same structure as errors of the tree-like form.
+        """
+        if settings.FORM_FREE_VALIDATION:
+            return self.clean_filter_tree()[1] if self.is_bound else ErrorDict()
+        return self.form.errors
+
+    def clean_filter_tree(self) -> Tuple[FilterNode, ErrorDict]:
+        """Clean the filterset data without forms and return a filter tree and errors."""
+        if not hasattr(self, '_cleaned_filter_tree'):
+            self._cleaned_filter_tree = clean_filter_tree(
+                self.filters,
+                self.data,
+                self.meta_index.filter_positions,
+                self.meta_index.required_filter_names,
+                self.meta_index.quantifier_keys,
+            )
+        return self._cleaned_filter_tree
+
+    def filter_queryset(self, queryset: models.QuerySet) -> models.QuerySet:
+        """Filter a queryset with a top level form's `cleaned_data`.
+
+        The filter tree is normalized, and the Q object is built
+        by a filter plan compiled for the shape of the normalized tree.
+        If the filter tree can not be satisfied, an empty queryset is returned
+        without querying the database. Trees that are too deep to compile a plan for
+        are rejected with a validation error.
+        The canonical hash of the shape is stored in the `filter_shape_hash` attribute.
+        If filters were changed after the filterset was initialized, e.g. in the `__init__`
+        method of a subclass, the tree is normalized and the plan is compiled
+        for the changed filters without caches, and the hash is None.
+        If the result cache is enabled, rows are selected by cached primary keys.
+        """
+        if settings.FORM_FREE_VALIDATION:
+            tree = self.clean_filter_tree()[0]
         else:
-            not_q = models.Q()
-        return QuerySetProxy(qs, q & and_q & or_q & not_q)
+            tree = create_filter_tree(self.form)
+        has_changed_filters = self.has_changed_filters()
+        if has_changed_filters:
+            exact_filter_fields, comparison_filters = get_mergeable_filters(
+                self._meta.model,
+                self.filters,
+            )
+        else:
+            exact_filter_fields = self.meta_index.exact_filter_fields
+            comparison_filters = self.meta_index.comparison_filters
+        tree, shape_hash = normalize_filter_tree(tree, exact_filter_fields, comparison_filters)
+        self.filter_shape_hash = None if has_changed_filters else shape_hash
+        if tree is NONE_TREE:
+            return queryset.none()
+        check_tree_depth(tree)
+        with annotation_scope():
+            qs, q = self.get_filter_plan(tree, self.filter_shape_hash).bind(self, queryset, tree)
+        return cache_result(queryset, qs.filter(q), self.meta_index.result_models)
+
+    def get_filter_plan(self, tree: FilterTree, shape_hash: Optional[str]) -> FilterPlan:
+        """Return a cached filter plan for the shape of a normalized filter tree.
+
+        Without the hash, the plan is compiled for filters of the filterset and not cached.
+        """
+        filterset_class = type(self)
+        if shape_hash is None:
+            return compile_filter_plan(filterset_class, get_tree_shape(tree), self.filters)
+        return filter_plan_cache.get_or_create(
+            (filterset_class, shape_hash, settings.EXISTS_SUBQUERIES),
+            lambda: compile_filter_plan(filterset_class, get_tree_shape(tree)),
+        )
 
     @classmethod
     def get_filters(cls) -> OrderedDict:
@@ -282,11 +531,17 @@ class AdvancedFilterSet(BaseFilterSet, metaclass=FilterSetMetaclass):
     @classmethod
     def get_fields(cls) -> OrderedDict:
         """Resolve the `Meta.fields` argument including only regular lookups."""
+        meta_index = cls.__dict__.get('meta_index', None)
+        if meta_index:
+            return meta_index.fields
         return cls._get_fields(is_regular_lookup_expr)
 
     @classmethod
     def get_full_text_search_fields(cls) -> OrderedDict:
         """Resolve the `Meta.fields` argument including only full text search lookups."""
+        meta_index = cls.__dict__.get('meta_index', None)
+        if meta_index:
+            return meta_index.full_text_search_fields
         return cls._get_fields(is_full_text_search_lookup_expr)
 
     @classmethod
@@ -1,6 +1,6 @@
 """Functions for converting tree data into data suitable for the FilterSet."""
 
-from typing import Any, Dict, List, Type, Union
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Type, Union
 
 from django.contrib.postgres.search import (
     SearchQuery,
@@ -12,7 +12,6 @@ from django.contrib.postgres.search import (
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models.constants import LOOKUP_SEP
-from django_filters.conf import settings as django_settings
 from graphene.types.inputobjecttype import InputObjectTypeContainer
 from graphene_django_filter.filters import SearchQueryFilter, SearchRankFilter, TrigramFilter
 from graphene_django_filter.input_types import (
@@ -30,50 +29,101 @@ from .conf import settings
 from .filterset import AdvancedFilterSet
 
 
+class FilterInputPath(NamedTuple):
+    """Target of a path of filter input fields in the FilterSet data.
+
+    Paths of lookups are mapped to filter names, paths of special filters
+    to data keys, data factories and filter names of their lookups, and paths of quantifiers
+    to their data keys and paths of relations, which their values are read relative to.
+    """
+
+    data_key: str
+    data_factory: Optional[Callable[..., Dict[str, Any]]] = None
+    relation_path: Optional[Tuple[str, ...]] = None
+    lookup_data_keys: Optional[Dict[str, str]] = None
+
+
 def tree_input_type_to_data(
     filterset_class: Type[AdvancedFilterSet],
     tree_input_type: InputObjectTypeContainer,
-    prefix: str = '',
 ) -> Dict[str, Any]:
-    """Convert a tree_input_type to a FilterSet data."""
+    """Convert a tree_input_type to a FilterSet data.
+
+    Paths of input fields are looked up in the map of input paths of the filterset class,
+    so keys of the data are not built from names of input fields.
+    """
+    return input_value_to_data(
+        filterset_class,
+        get_input_paths(filterset_class),
+        tree_input_type,
+        (),
+    )
+
+
+def input_value_to_data(
+    filterset_class: Type[AdvancedFilterSet],
+    input_paths: Dict[Tuple[str, ...], FilterInputPath],
+    input_value: InputObjectTypeContainer,
+    path: Tuple[str, ...],
+) -> Dict[str, Any]:
+    """Convert a value of a filter input type located at a path to a FilterSet data."""
     result: Dict[str, Any] = {}
-    for key, value in tree_input_type.items():
-        if key in ('and', 'or'):
-            result[key] = [tree_input_type_to_data(filterset_class, subtree) for subtree in value]
-        elif key == 'not':
-            result[key] = tree_input_type_to_data(filterset_class, value)
+    for key, value in input_value.items():
+        if not path and key in (settings.AND_KEY, settings.OR_KEY):
+            result['and' if key == settings.AND_KEY else 'or'] = [
+                input_value_to_data(filterset_class, input_paths, subtree, ())
+                for subtree in value
+            ]
+        elif not path and key == settings.NOT_KEY:
+            result['not'] = input_value_to_data(filterset_class, input_paths, value, ())
         else:
-            result.update(
-                create_data(
-                    (prefix + LOOKUP_SEP + key if prefix else key).replace(
-                        LOOKUP_SEP + django_settings.DEFAULT_LOOKUP_EXPR, '',
-                    ),
-                    value,
+            input_path = input_paths.get((*path, key), None)
+            if input_path is None:
+                if value is not None:
+                    result.update(
+                        input_value_to_data(filterset_class, input_paths, value, (*path, key)),
+                    )
+            elif input_path.relation_path is not None:
+                result[input_path.data_key] = input_value_to_data(
                     filterset_class,
-                ),
-            )
+                    input_paths,
+                    value,
+                    input_path.relation_path,
+                )
+            elif input_path.data_factory is not None:
+                result.update(input_path.data_factory(value, input_path, filterset_class))
+            else:
+                result[input_path.data_key] = value
     return result
 
 
-def create_data(key: str, value: Any, filterset_class: Type[AdvancedFilterSet]) -> Dict[str, Any]:
-    """Create data from a key and a value."""
-    for factory_key, factory in DATA_FACTORIES.items():
-        if factory_key in key:
-            return factory(value, key, filterset_class)
-    if isinstance(value, InputObjectTypeContainer):
-        return tree_input_type_to_data(filterset_class, value, key)
-    else:
-        return {key: value}
+def get_input_paths(
+    filterset_class: Type[AdvancedFilterSet],
+) -> Dict[Tuple[str, ...], FilterInputPath]:
+    """Return the map of input paths of a filterset class.
+
+    The map is emitted by the `FilterArgumentsFactory` class with input types
+    and is created here if the filterset class has no input types.
+    """
+    input_paths = filterset_class.meta_index.input_paths
+    if input_paths is None:
+        from .filter_arguments_factory import FilterArgumentsFactory
+        input_paths = FilterArgumentsFactory.create_input_paths(
+            filterset_class,
+            FilterArgumentsFactory.filterset_to_trees(filterset_class),
+        )
+        filterset_class.meta_index.input_paths = input_paths
+    return input_paths
 
 
 def create_search_query_data(
     input_type: SearchQueryFilterInputType,
-    key: str,
+    input_path: FilterInputPath,
     filterset_class: Type[AdvancedFilterSet],
 ) -> Dict[str, SearchQueryFilter.Value]:
     """Create a data for the `SearchQueryFilter` class."""
     return {
-        key: SearchQueryFilter.Value(
+        input_path.data_key: SearchQueryFilter.Value(
             annotation_value=create_search_vector(input_type.vector, filterset_class),
             search_value=create_search_query(input_type.query),
         ),
@@ -82,12 +132,17 @@ def create_search_query_data(
 
 def create_search_rank_data(
     input_type: Union[SearchRankFilterInputType, InputObjectTypeContainer],
-    key: str,
+    input_path: FilterInputPath,
     filterset_class: Type[AdvancedFilterSet],
 ) -> Dict[str, SearchRankFilter.Value]:
-    """Create a data for the `SearchRankFilter` class."""
+    """Create a data for the `SearchRankFilter` class.
+
+    Lookups without filters in the filterset are skipped.
+    """
     rank_data = {}
     for lookup, value in input_type.lookups.items():
+        if lookup not in input_path.lookup_data_keys:
+            continue
         search_rank_data = {
             'vector': create_search_vector(input_type.vector, filterset_class),
             'query': create_search_query(input_type.query),
@@ -99,10 +154,7 @@ def create_search_rank_data(
         normalization = input_type.get('normalization', None)
         if normalization:
             search_rank_data['normalization'] = normalization
-        k = (key + LOOKUP_SEP + lookup).replace(
-            LOOKUP_SEP + django_settings.DEFAULT_LOOKUP_EXPR, '',
-        )
-        rank_data[k] = SearchRankFilter.Value(
+        rank_data[input_path.lookup_data_keys[lookup]] = SearchRankFilter.Value(
             annotation_value=SearchRank(**search_rank_data),
             search_value=value,
         )
@@ -111,24 +163,24 @@ def create_search_rank_data(
 
 def create_trigram_data(
     input_type: TrigramFilterInputType,
-    key: str,
+    input_path: FilterInputPath,
     *args
 ) -> Dict[str, TrigramFilter.Value]:
-    """Create a data for the `TrigramFilter` class."""
+    """Create a data for the `TrigramFilter` class.
+
+    Lookups without filters in the filterset are skipped.
+    """
     trigram_data = {}
     if input_type.kind == TrigramSearchKind.SIMILARITY:
         trigram_class = TrigramSimilarity
     else:
         trigram_class = TrigramDistance
+    field_name = LOOKUP_SEP.join(input_path.data_key.split(LOOKUP_SEP)[:-1])
     for lookup, value in input_type.lookups.items():
-        k = (key + LOOKUP_SEP + lookup).replace(
-            LOOKUP_SEP + django_settings.DEFAULT_LOOKUP_EXPR, '',
-        )
-        trigram_data[k] = TrigramFilter.Value(
-            annotation_value=trigram_class(
-                LOOKUP_SEP.join(key.split(LOOKUP_SEP)[:-1]),
-                input_type.value,
-            ),
+        if lookup not in input_path.lookup_data_keys:
+            continue
+        trigram_data[input_path.lookup_data_keys[lookup]] = TrigramFilter.Value(
+            annotation_value=trigram_class(field_name, input_type.value),
             search_value=value,
         )
     return trigram_data
@@ -0,0 +1,102 @@
+"""Registries of filter input types.
+
+Filter input types are registered by name, so each type is created once
+and shared by connection fields with the same filter input type prefix.
+By default, types are registered in the registry of the process.
+A schema built within `input_type_registry_scope` registers its types
+in a registry of its own, so several schemas can be built concurrently,
+and types of a discarded schema are reclaimed with its registry.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Hashable, Iterator, Optional, Type
+
+import graphene
+
+
+class InputTypeRegistry:
+    """Thread-safe registry of input types by name."""
+
+    def __init__(self) -> None:
+        self._types: Dict[str, Type[graphene.InputObjectType]] = {}
+        self._signatures: Dict[str, Hashable] = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, name: str) -> bool:
+        """Return whether an input type with a name is registered."""
+        return name in self._types
+
+    def __getitem__(self, name: str) -> Type[graphene.InputObjectType]:
+        """Return a registered input type by name."""
+        return self._types[name]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over names of registered input types."""
+        return iter(list(self._types))
+
+    def __len__(self) -> int:
+        """Return the number of registered input types."""
+        return len(self._types)
+
+    def get_or_create(
+        self,
+        name: str,
+        create: Callable[[], Type[graphene.InputObjectType]],
+    ) -> Type[graphene.InputObjectType]:
+        """Return the input type with a name or create and register it.
+
+        Types are created under a reentrant lock, so each type is created once,
+        and creating a type can create types of its subfields.
+        """
+        input_type = self._types.get(name, None)
+        if input_type is not None:
+            return input_type
+        with self._lock:
+            if name not in self._types:
+                self._types[name] = create()
+            return self._types[name]
+
+    def reserve_name(self, name: str, signature: Hashable) -> bool:
+        """Reserve a name for input types with a structure.
+
+        Return whether the name is free or already reserved for the same structure.
+        """
+        with self._lock:
+            return self._signatures.setdefault(name, signature) == signature
+
+    def clear(self) -> None:
+        """Forget all registered input types."""
+        with self._lock:
+            self._types.clear()
+            self._signatures.clear()
+
+
+default_input_type_registry = InputTypeRegistry()
+input_type_registry: 'ContextVar[InputTypeRegistry]' = ContextVar(
+    'input_type_registry',
+    default=default_input_type_registry,
+)
+
+
+def get_input_type_registry() -> InputTypeRegistry:
+    """Return the registry of filter input types of the current scope."""
+    return input_type_registry.get()
+
+
+@contextmanager
+def input_type_registry_scope(
+    registry: Optional[InputTypeRegistry] = None,
+) -> Iterator[InputTypeRegistry]:
+    """Register filter input types created within the scope in a registry.
+
+    A new registry is used if no registry is provided.
+    """
+    if registry is None:
+        registry = InputTypeRegistry()
+    token = input_type_registry.set(registry)
+    try:
+        yield registry
+    finally:
+        input_type_registry.reset(token)
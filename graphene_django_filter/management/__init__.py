@@ -0,0 +1 @@
+"""Management of graphene-django-filter."""
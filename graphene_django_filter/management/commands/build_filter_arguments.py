@@ -0,0 +1,141 @@
+"""Command for building the artifact of filter arguments of a schema."""
+
+import os
+import time
+from typing import Dict, List, Optional, Tuple, Type
+
+import graphene
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils.module_loading import import_string
+from graphene_django.settings import graphene_settings
+
+from ...conf import settings
+from ...connection_field import AdvancedDjangoFilterConnectionField
+from ...filter_arguments_artifacts import (
+    FieldSpec,
+    create_artifact,
+    get_field_spec,
+    get_filterset_definition_hash,
+    load_artifact,
+    loaded_artifacts,
+    write_artifact,
+)
+from ...filter_arguments_factory import FilterArgumentsFactory
+from ...filterset import AdvancedFilterSet
+from ...input_type_registry import input_type_registry_scope
+
+
+def get_connection_fields(schema: graphene.Schema) -> List[AdvancedDjangoFilterConnectionField]:
+    """Return advanced filter connection fields of all object types of a schema."""
+    connection_fields = []
+    for graphql_type in schema.graphql_schema.type_map.values():
+        graphene_type = getattr(graphql_type, 'graphene_type', None)
+        fields = getattr(getattr(graphene_type, '_meta', None), 'fields', None)
+        if fields:
+            connection_fields.extend(
+                field for field in fields.values()
+                if isinstance(field, AdvancedDjangoFilterConnectionField)
+            )
+    return connection_fields
+
+
+def create_filterset_specs(
+    filterset_class: Type[AdvancedFilterSet],
+    input_type_prefix: str,
+) -> Dict[str, FieldSpec]:
+    """Create specs of lookup fields of a filterset class without the artifact."""
+    factory = FilterArgumentsFactory(filterset_class, input_type_prefix)
+    specs = {}
+    for name, filter_field in filterset_class.base_filters.items():
+        spec = get_field_spec(
+            factory.create_field(name, filter_field),
+            factory.get_default_description(filter_field),
+        )
+        if spec is not None:
+            specs[name] = spec
+    return specs
+
+
+def measure_arguments(
+    connection_fields: List[Tuple[Type[AdvancedFilterSet], str]],
+    artifact_path: Optional[str],
+) -> float:
+    """Return the time of creating filter arguments of connection fields in seconds.
+
+    Arguments are created from the artifact if its path is provided,
+    including loading the artifact and hashing definitions of filterset classes.
+    """
+    loaded_artifacts.pop(artifact_path, None)
+    for filterset_class, _ in connection_fields:
+        filterset_class.meta_index.definition_hash = None
+    start = time.perf_counter()
+    with input_type_registry_scope():
+        for filterset_class, input_type_prefix in connection_fields:
+            factory = FilterArgumentsFactory(filterset_class, input_type_prefix)
+            factory.field_specs = None
+            if artifact_path is not None:
+                filterset_specs = load_artifact(artifact_path) or {}
+                factory.field_specs = filterset_specs.get(
+                    get_filterset_definition_hash(filterset_class),
+                    None,
+                )
+            factory.arguments
+    return time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    """Build the artifact of filter arguments of a schema and report boot times."""
+
+    help = 'Build the artifact of filter arguments of a schema and report boot times.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add the schema and the output path."""
+        parser.add_argument(
+            '--schema',
+            default=graphene_settings.SCHEMA,
+            help='Import path of the schema, the `SCHEMA` setting of graphene-django by default',
+        )
+        parser.add_argument(
+            '--output',
+            default=settings.FILTER_ARGUMENTS_ARTIFACT,
+            help='Path of the artifact, the `FILTER_ARGUMENTS_ARTIFACT` setting by default',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Build the artifact and print the time of creating filter arguments."""
+        if not options['schema']:
+            raise CommandError('Provide the schema with the `--schema` option.')
+        if not options['output']:
+            raise CommandError('Provide the path of the artifact with the `--output` option.')
+        schema = options['schema']
+        if isinstance(schema, str):
+            schema = import_string(schema)
+        connection_fields = list(dict.fromkeys(
+            (field.filterset_class, field.filter_input_type_prefix)
+            for field in get_connection_fields(schema)
+        ))
+        filterset_specs = {}
+        for filterset_class, input_type_prefix in connection_fields:
+            if filterset_class not in filterset_specs:
+                filterset_specs[filterset_class] = create_filterset_specs(
+                    filterset_class,
+                    input_type_prefix,
+                )
+        artifact = create_artifact(filterset_specs.items())
+        write_artifact(options['output'], artifact)
+        number_of_filters = sum(
+            len(filterset_class.base_filters) for filterset_class in filterset_specs
+        )
+        number_of_specs = sum(len(specs) for specs in filterset_specs.values())
+        self.stdout.write(
+            f'Built {options["output"]} ({os.path.getsize(options["output"])} bytes): '
+            f'{len(artifact["filtersets"])} filterset definitions, '
+            f'{number_of_specs} of {number_of_filters} lookup fields stored.',
+        )
+        live_time = measure_arguments(connection_fields, None)
+        artifact_time = measure_arguments(connection_fields, options['output'])
+        self.stdout.write(
+            f'Filter arguments of {len(connection_fields)} connection fields: '
+            f'{live_time * 1000:.1f} ms without the artifact, '
+            f'{artifact_time * 1000:.1f} ms with the artifact.',
+        )
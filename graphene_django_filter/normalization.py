@@ -0,0 +1,340 @@
+"""Normalization of filter trees.
+
+Normalized trees produce smaller WHERE clauses,
+and trees that differ only in the order of `and`/`or` branches get the same shape.
+Quantifier nodes are normalized like `and` nodes.
+Trees that can not be satisfied are normalized to `NONE_TREE`,
+so querysets can be filtered without touching the database.
+"""
+
+import hashlib
+from datetime import date, time
+from decimal import Decimal
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from django.db.models.constants import LOOKUP_SEP
+from django_filters.constants import EMPTY_VALUES
+
+from .filter_plans import FilterLeaf, FilterNode, FilterTree
+
+EMPTY_TREE = FilterNode('and', ())
+NONE_TREE = FilterNode('none', ())
+COMPARISON_LOOKUP_EXPRS = ('exact', 'gt', 'gte', 'lt', 'lte')
+# Types whose ordering in Python is the same as in the database regardless of collations.
+ORDERED_TYPES = (int, float, Decimal, date, time)
+Bound = Tuple[Any, bool]
+
+
+def normalize_filter_tree(
+    tree: FilterTree,
+    exact_filter_fields: Mapping[str, str],
+    comparison_filters: Optional[Mapping[str, Tuple[str, str]]] = None,
+) -> Tuple[FilterTree, str]:
+    """Normalize a filter tree and return it with the canonical hash of its shape.
+
+    Nested `and`/`or` nodes are flattened, identical branches are removed,
+    double negations are cancelled and empty branches are dropped.
+    Exact filters of the same field in an `or` node are merged into an `in` lookup.
+    `exact_filter_fields` maps names of filters that can be merged to their field names.
+    Comparisons of the same field in an `and` node are merged into one constraint,
+    and `and` nodes with contradicting comparisons are replaced with `NONE_TREE`.
+    `comparison_filters` maps names of filters that can be merged
+    to their field names and lookup expressions.
+    Branches are sorted by hashes of their shapes, so the result does not depend on their order.
+    Nodes are visited iteratively, so deep trees do not hit the recursion limit.
+    """
+    nodes = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        if isinstance(node, FilterNode):
+            stack.extend(node.children)
+    if comparison_filters is None:
+        comparison_filters = {}
+    hashes: Dict[int, str] = {
+        id(EMPTY_TREE): get_node_hash('and', []),
+        id(NONE_TREE): get_node_hash('none', []),
+    }
+    normalized: Dict[int, FilterTree] = {}
+    for node in reversed(nodes):
+        if isinstance(node, FilterLeaf):
+            normalized[id(node)] = node
+            hashes[id(node)] = get_leaf_hash(node)
+        else:
+            normalized[id(node)] = normalize_node(
+                node.operator,
+                [normalized[id(child)] for child in node.children],
+                node.relation,
+                exact_filter_fields,
+                comparison_filters,
+                hashes,
+            )
+    normalized_tree = normalized[id(tree)]
+    return normalized_tree, hashes[id(normalized_tree)]
+
+
+def normalize_node(
+    operator: str,
+    children: List[FilterTree],
+    relation: Optional[str],
+    exact_filter_fields: Mapping[str, str],
+    comparison_filters: Mapping[str, Tuple[str, str]],
+    hashes: Dict[int, str],
+) -> FilterTree:
+    """Normalize a node whose children are normalized and store hashes of new trees."""
+    if relation is not None:
+        return normalize_quantifier_node(operator, children, relation, hashes)
+    if operator == 'not':
+        child = children[0]
+        if child is EMPTY_TREE or child is NONE_TREE:
+            return EMPTY_TREE
+        if isinstance(child, FilterNode) and child.operator == 'not':
+            return child.children[0]
+        tree = FilterNode('not', (child,))
+        hashes[id(tree)] = get_node_hash('not', [hashes[id(child)]])
+        return tree
+    if operator == 'and' and any(child is NONE_TREE for child in children):
+        return NONE_TREE
+    flattened: List[FilterTree] = []
+    for child in children:
+        if isinstance(child, FilterNode) and child.operator == operator:
+            flattened.extend(child.children)
+        elif child is not EMPTY_TREE and child is not NONE_TREE:
+            flattened.append(child)
+    flattened = deduplicate(flattened, hashes)
+    if operator == 'or':
+        flattened = merge_exact_filters(flattened, exact_filter_fields, hashes)
+    else:
+        merged_children = merge_comparisons(flattened, comparison_filters, hashes)
+        if merged_children is None:
+            return NONE_TREE
+        flattened = merged_children
+    if not flattened:
+        return NONE_TREE if any(child is NONE_TREE for child in children) else EMPTY_TREE
+    if len(flattened) == 1:
+        return flattened[0]
+    flattened.sort(key=lambda child: hashes[id(child)])
+    tree = FilterNode(operator, tuple(flattened))
+    hashes[id(tree)] = get_node_hash(operator, [hashes[id(child)] for child in flattened])
+    return tree
+
+
+def normalize_quantifier_node(
+    quantifier: str,
+    children: List[FilterTree],
+    relation: str,
+    hashes: Dict[int, str],
+) -> FilterTree:
+    """Normalize a quantifier node whose children are normalized and store hashes of new trees.
+
+    Operands of quantifiers are conjunctive, so nested `and` nodes are flattened.
+    """
+    if any(child is NONE_TREE for child in children):
+        if quantifier == 'some':
+            return NONE_TREE
+        if quantifier == 'none':
+            return EMPTY_TREE
+        quantifier, children = 'none', []
+    flattened: List[FilterTree] = []
+    for child in children:
+        if isinstance(child, FilterNode) and child.operator == 'and':
+            flattened.extend(child.children)
+        else:
+            flattened.append(child)
+    flattened = deduplicate(flattened, hashes)
+    if quantifier == 'every' and not flattened:
+        return EMPTY_TREE
+    flattened.sort(key=lambda child: hashes[id(child)])
+    tree = FilterNode(quantifier, tuple(flattened), relation)
+    hashes[id(tree)] = get_node_hash(
+        f'{quantifier}{LOOKUP_SEP}{relation}',
+        [hashes[id(child)] for child in flattened],
+    )
+    return tree
+
+
+def deduplicate(children: List[FilterTree], hashes: Dict[int, str]) -> List[FilterTree]:
+    """Remove identical branches.
+
+    Branches are compared only with branches of the same shape,
+    so values do not have to be hashable.
+    """
+    seen: Dict[str, List[FilterTree]] = {}
+    unique_children = []
+    for child in children:
+        same_shape_children = seen.setdefault(hashes[id(child)], [])
+        if child not in same_shape_children:
+            same_shape_children.append(child)
+            unique_children.append(child)
+    return unique_children
+
+
+def merge_exact_filters(
+    children: List[FilterTree],
+    exact_filter_fields: Mapping[str, str],
+    hashes: Dict[int, str],
+) -> List[FilterTree]:
+    """Merge exact filters of the same field of an `or` node into `in` lookups."""
+    leaves_by_field: Dict[str, List[FilterLeaf]] = {}
+    for child in children:
+        if not isinstance(child, FilterLeaf) or child.lookup is not None:
+            continue
+        if child.name in exact_filter_fields and child.value not in EMPTY_VALUES:
+            leaves_by_field.setdefault(exact_filter_fields[child.name], []).append(child)
+    merged_leaves: Dict[int, Optional[FilterLeaf]] = {}
+    for field_name, leaves in leaves_by_field.items():
+        if len(leaves) < 2:
+            continue
+        lookup = f'{field_name}{LOOKUP_SEP}in'
+        values = []
+        for leaf in leaves:
+            if leaf.value not in values:
+                values.append(leaf.value)
+        merged_leaf = FilterLeaf(lookup, values, lookup)
+        hashes[id(merged_leaf)] = get_leaf_hash(merged_leaf)
+        merged_leaves[id(leaves[0])] = merged_leaf
+        for leaf in leaves[1:]:
+            merged_leaves[id(leaf)] = None
+    merged_children = []
+    for child in children:
+        merged_child = merged_leaves.get(id(child), child)
+        if merged_child is not None:
+            merged_children.append(merged_child)
+    return merged_children
+
+
+def merge_comparisons(
+    children: List[FilterTree],
+    comparison_filters: Mapping[str, Tuple[str, str]],
+    hashes: Dict[int, str],
+) -> Optional[List[FilterTree]]:
+    """Merge comparisons of the same field of an `and` node.
+
+    Return None if the comparisons can not be satisfied together.
+    """
+    comparison_fields = {field_name for field_name, _ in comparison_filters.values()}
+    comparisons_by_field: Dict[str, List[Tuple[FilterLeaf, str]]] = {}
+    for child in children:
+        if not isinstance(child, FilterLeaf) or child.value in EMPTY_VALUES:
+            continue
+        if child.lookup is None:
+            if child.name not in comparison_filters:
+                continue
+            field_name, lookup_expr = comparison_filters[child.name]
+        else:
+            field_name, lookup_expr = child.lookup.rsplit(LOOKUP_SEP, 1)
+            if field_name not in comparison_fields:
+                continue
+        values = child.value if lookup_expr in ('in', 'range') else [child.value]
+        if all(isinstance(value, ORDERED_TYPES) for value in values):
+            comparisons_by_field.setdefault(field_name, []).append((child, lookup_expr))
+    merged_leaves: Dict[int, List[FilterLeaf]] = {}
+    for field_name, comparisons in comparisons_by_field.items():
+        if len(comparisons) < 2:
+            continue
+        try:
+            constraints = merge_constraints(
+                [(lookup_expr, leaf.value) for leaf, lookup_expr in comparisons],
+            )
+        except TypeError:
+            continue
+        if constraints is None:
+            return None
+        leaves = []
+        for lookup_expr, value in constraints:
+            lookup = f'{field_name}{LOOKUP_SEP}{lookup_expr}'
+            leaf = FilterLeaf(lookup, value, lookup)
+            hashes[id(leaf)] = get_leaf_hash(leaf)
+            leaves.append(leaf)
+        merged_leaves[id(comparisons[0][0])] = leaves
+        for leaf, _ in comparisons[1:]:
+            merged_leaves[id(leaf)] = []
+    merged_children = []
+    for child in children:
+        merged_children.extend(merged_leaves.get(id(child), (child,)))
+    return merged_children
+
+
+def merge_constraints(constraints: List[Tuple[str, Any]]) -> Optional[List[Tuple[str, Any]]]:
+    """Merge constraints of a field given as lookup expressions and values.
+
+    Return the smallest equivalent list of constraints or None if they can not be satisfied.
+    """
+    lower: Optional[Bound] = None
+    upper: Optional[Bound] = None
+    values: Optional[List[Any]] = None
+    for lookup_expr, value in constraints:
+        if lookup_expr in ('exact', 'in'):
+            new_values = [value] if lookup_expr == 'exact' else value
+            values = new_values if values is None else [v for v in values if v in new_values]
+        elif lookup_expr == 'range':
+            lower = get_lower_bound(lower, (value[0], True))
+            upper = get_upper_bound(upper, (value[1], True))
+        elif lookup_expr in ('gt', 'gte'):
+            lower = get_lower_bound(lower, (value, lookup_expr == 'gte'))
+        else:
+            upper = get_upper_bound(upper, (value, lookup_expr == 'lte'))
+    if values is not None:
+        values = [
+            value for i, value in enumerate(values)
+            if value not in values[:i] and is_within_bounds(value, lower, upper)
+        ]
+        if not values:
+            return None
+        return [('exact', values[0])] if len(values) == 1 else [('in', values)]
+    if lower and upper:
+        if lower[0] > upper[0]:
+            return None
+        if lower[0] == upper[0]:
+            return [('exact', lower[0])] if lower[1] and upper[1] else None
+        if lower[1] and upper[1]:
+            return [('range', (lower[0], upper[0]))]
+    merged_constraints = []
+    if lower:
+        merged_constraints.append(('gte' if lower[1] else 'gt', lower[0]))
+    if upper:
+        merged_constraints.append(('lte' if upper[1] else 'lt', upper[0]))
+    return merged_constraints
+
+
+def get_lower_bound(bound: Optional[Bound], other_bound: Bound) -> Bound:
+    """Return the stricter of two lower bounds given as values and inclusiveness."""
+    if bound is None or other_bound[0] > bound[0]:
+        return other_bound
+    if other_bound[0] == bound[0]:
+        return bound[0], bound[1] and other_bound[1]
+    return bound
+
+
+def get_upper_bound(bound: Optional[Bound], other_bound: Bound) -> Bound:
+    """Return the stricter of two upper bounds given as values and inclusiveness."""
+    if bound is None or other_bound[0] < bound[0]:
+        return other_bound
+    if other_bound[0] == bound[0]:
+        return bound[0], bound[1] and other_bound[1]
+    return bound
+
+
+def is_within_bounds(value: Any, lower: Optional[Bound], upper: Optional[Bound]) -> bool:
+    """Return whether a value satisfies lower and upper bounds."""
+    if lower and (value < lower[0] or value == lower[0] and not lower[1]):
+        return False
+    return not (upper and (value > upper[0] or value == upper[0] and not upper[1]))
+
+
+def get_leaf_hash(leaf: FilterLeaf) -> str:
+    """Return the hash of the shape of a leaf."""
+    if leaf.lookup is None:
+        return get_hash(f'filter:{leaf.name}')
+    return get_hash(f'lookup:{leaf.lookup}')
+
+
+def get_node_hash(operator: str, children_hashes: List[str]) -> str:
+    """Return the hash of the shape of a node from hashes of its children."""
+    return get_hash(f'{operator}({",".join(children_hashes)})')
+
+
+def get_hash(text: str) -> str:
+    """Return a hash of a text that is stable between processes."""
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
@@ -0,0 +1,309 @@
+"""Pagination of filtered querysets.
+
+With the keyset pagination, cursors encode values of the keyset ordering fields
+of an edge node, and the `after` and `before` cursors are converted to WHERE predicates,
+so the cost of a page does not depend on its position.
+With the offset pagination, querysets are counted only if the count is needed,
+optionally in the same query as rows of a page.
+"""
+
+import json
+from typing import Any, List, NamedTuple, Optional, Sequence, Set, Tuple, Type, Union
+
+import graphene
+from django.core.exceptions import ValidationError
+from django.db import connections, models
+from graphql import FieldNode, FragmentSpreadNode
+from graphql_relay import get_offset_with_default
+from graphql_relay.utils import base64, unbase64
+
+from .conf import settings
+from .query_costs import explain_queryset
+
+KEYSET_CURSOR_PREFIX = 'keyset:'
+COUNT_FREE_CONNECTION_FIELDS = ('edges', 'pageInfo', '__typename')
+WINDOW_COUNT_ALIAS = 'window_count'
+
+
+class KeysetField(NamedTuple):
+    """Model field of a keyset ordering and its direction."""
+
+    field: models.Field
+    descending: bool
+
+    @property
+    def order_by(self) -> str:
+        """Return an expression for the `order_by` method of a QuerySet."""
+        return f'-{self.field.name}' if self.descending else self.field.name
+
+
+def get_keyset_fields(
+    model: Type[models.Model],
+    keyset_ordering: Sequence[str],
+) -> Tuple[KeysetField, ...]:
+    """Return model fields of a keyset ordering, e.g. `('-created_at', 'id')`.
+
+    Nullable fields are not allowed, because comparisons with NULL do not match rows,
+    so rows with NULL values would be skipped or repeated between pages.
+    """
+    keyset_fields = tuple(
+        KeysetField(
+            model._meta.pk if name.lstrip('-') == 'pk' else model._meta.get_field(name.lstrip('-')),
+            name.startswith('-'),
+        )
+        for name in keyset_ordering
+    )
+    assert any(keyset_field.field.unique for keyset_field in keyset_fields), \
+        'The keyset ordering must contain a unique field'
+    nullable_field_names = [
+        keyset_field.field.name for keyset_field in keyset_fields if keyset_field.field.null
+    ]
+    assert not nullable_field_names, \
+        f'The keyset ordering must not contain nullable fields: {", ".join(nullable_field_names)}'
+    return keyset_fields
+
+
+def encode_keyset_cursor(keyset_fields: Sequence[KeysetField], obj: models.Model) -> str:
+    """Encode values of keyset ordering fields of an object into a cursor."""
+    values = [keyset_field.field.value_to_string(obj) for keyset_field in keyset_fields]
+    return base64(KEYSET_CURSOR_PREFIX + json.dumps(values))
+
+
+def decode_keyset_cursor(keyset_fields: Sequence[KeysetField], cursor: str) -> List[Any]:
+    """Decode values of keyset ordering fields from a cursor."""
+    try:
+        unbased_cursor = unbase64(cursor)
+        if not unbased_cursor.startswith(KEYSET_CURSOR_PREFIX):
+            raise ValueError
+        values = json.loads(unbased_cursor[len(KEYSET_CURSOR_PREFIX):])
+        if not isinstance(values, list) or len(values) != len(keyset_fields):
+            raise ValueError
+        return [
+            keyset_field.field.to_python(value)
+            for keyset_field, value in zip(keyset_fields, values)
+        ]
+    except (ValueError, ValidationError):
+        raise ValidationError(f'Invalid cursor: `{cursor}`', code='invalid_cursor')
+
+
+def create_keyset_q(
+    keyset_fields: Sequence[KeysetField],
+    values: Sequence[Any],
+    is_after: bool,
+) -> models.Q:
+    """Create a Q object selecting rows after or before keyset values.
+
+    For the `(a, b)` ordering, rows after `(x, y)` are selected by `a > x OR (a = x AND b > y)`.
+    """
+    q = models.Q()
+    for i, keyset_field in enumerate(keyset_fields):
+        lookup_expr = 'gt' if is_after != keyset_field.descending else 'lt'
+        q |= models.Q(
+            **{keyset_fields[j].field.name: values[j] for j in range(i)},
+            **{f'{keyset_field.field.name}__{lookup_expr}': values[i]},
+        )
+    return q
+
+
+class KeysetPage(NamedTuple):
+    """Page of a keyset pagination."""
+
+    nodes: List[models.Model]
+    has_previous_page: bool
+    has_next_page: bool
+
+
+def get_keyset_page(
+    queryset: models.QuerySet,
+    keyset_fields: Sequence[KeysetField],
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    first: Optional[int] = None,
+    last: Optional[int] = None,
+) -> KeysetPage:
+    """Return a page of a queryset using keyset pagination.
+
+    At most `first + 1` or `last + 1` rows are fetched to determine whether the next
+    or the previous page exists. If only `last` is given, the queryset is read
+    in the reverse order. A queryset explicitly ordered otherwise than by the keyset
+    ordering, e.g. by an ordering filter, is rejected, because its ordering would be lost.
+    """
+    keyset_order_by = tuple(keyset_field.order_by for keyset_field in keyset_fields)
+    if queryset.query.order_by and tuple(queryset.query.order_by) != keyset_order_by:
+        raise ValidationError(
+            f'The ordering `{", ".join(map(str, queryset.query.order_by))}` conflicts '
+            f'with the keyset ordering `{", ".join(keyset_order_by)}`',
+            code='keyset_ordering',
+        )
+    if first is not None and first < 0:
+        raise ValidationError("Argument 'first' must be a non-negative integer.")
+    if last is not None and last < 0:
+        raise ValidationError("Argument 'last' must be a non-negative integer.")
+    if after:
+        queryset = queryset.filter(
+            create_keyset_q(keyset_fields, decode_keyset_cursor(keyset_fields, after), True),
+        )
+    if before:
+        queryset = queryset.filter(
+            create_keyset_q(keyset_fields, decode_keyset_cursor(keyset_fields, before), False),
+        )
+    queryset = queryset.order_by(*keyset_order_by)
+    has_previous_page = has_next_page = False
+    if first is not None:
+        nodes = list(queryset[:first + 1])
+        has_next_page = len(nodes) > first
+        nodes = nodes[:first]
+        if last is not None:
+            has_previous_page = len(nodes) > last
+            nodes = nodes[-last:] if last else []
+    elif last is not None:
+        nodes = list(queryset.reverse()[:last + 1])
+        has_previous_page = len(nodes) > last
+        nodes = nodes[:last][::-1]
+    else:
+        nodes = list(queryset)
+    return KeysetPage(nodes, has_previous_page, has_next_page)
+
+
+class OffsetSlice(NamedTuple):
+    """Slice of a queryset for the offset pagination.
+
+    If the queryset is not counted, the `length` is None,
+    and the `array_length` is the end of the fetched slice.
+    """
+
+    nodes: Union[models.QuerySet, List[models.Model]]
+    slice_start: int
+    array_length: int
+    length: Optional[int]
+
+
+def get_offset_slice(
+    queryset: models.QuerySet,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    first: Optional[int] = None,
+    last: Optional[int] = None,
+    is_count_needed: bool = True,
+    is_window_count: bool = False,
+) -> OffsetSlice:
+    """Return a slice of a queryset covering a page of the offset pagination.
+
+    If the count is not needed, rows of the page and one more row are fetched,
+    so the next page is detected without counting. If the count is needed
+    and `is_window_count` is set, it is fetched with rows of the page
+    as the `COUNT(*) OVER ()` window expression.
+    The queryset is counted separately if the page can not be located without its length,
+    e.g. only `last` is given or the `after` cursor is beyond the end of the queryset,
+    if the page is empty or if the queryset is distinct or grouped.
+    """
+    slice_start = get_offset_with_default(after, -1) + 1
+    before_offset = get_offset_with_default(before, -1)
+    is_window_count = all((
+        is_window_count,
+        not queryset.query.distinct,
+        queryset.query.group_by is None,
+    ))
+    is_bounded = first is not None or last is None or before_offset >= 0
+    if is_bounded and (not is_count_needed or is_window_count):
+        slice_end: Optional[int] = None
+        if before_offset >= 0:
+            slice_end = max(before_offset, slice_start)
+        if first is not None:
+            probe_end = slice_start + first + 1
+            slice_end = probe_end if slice_end is None else min(slice_end, probe_end)
+        elif last is not None and slice_end is not None:
+            slice_start = max(slice_start, slice_end - last)
+        page_queryset = queryset
+        if is_count_needed:
+            page_queryset = queryset.annotate(**{
+                WINDOW_COUNT_ALIAS: models.Window(models.Count('*')),
+            })
+        nodes = list(page_queryset[slice_start:slice_end])
+        is_located = all((
+            len(nodes) or not slice_start,
+            first is not None or last is None or slice_start + len(nodes) == slice_end,
+        ))
+        if is_located and not is_count_needed:
+            return OffsetSlice(nodes, slice_start, slice_start + len(nodes), None)
+        if is_located and nodes:
+            length = getattr(nodes[0], WINDOW_COUNT_ALIAS)
+            return OffsetSlice(nodes, slice_start, length, length)
+        slice_start = get_offset_with_default(after, -1) + 1
+    length = count_queryset(queryset)
+    slice_start = min(slice_start, length)
+    return OffsetSlice(queryset[slice_start:], slice_start, length, length)
+
+
+def count_queryset(queryset: models.QuerySet) -> int:
+    """Count rows of a queryset without ordering, select_related and selected annotations.
+
+    Annotations are kept in the SELECT list of distinct and grouped querysets,
+    because they affect the number of rows.
+    """
+    if queryset.query.is_sliced:
+        return queryset.count()
+    queryset = queryset.order_by().select_related(None)
+    if not queryset.query.distinct and queryset.query.group_by is None:
+        queryset.query.set_annotation_mask(())
+    return queryset.count()
+
+
+def estimate_count(queryset: models.QuerySet) -> Optional[int]:
+    """Return the number of rows of a queryset estimated by the PostgreSQL planner.
+
+    The number of rows of unfiltered querysets is read from `pg_class.reltuples`,
+    and the row estimate of the query plan is used for others.
+    None is returned for other databases and never analyzed tables.
+    """
+    if not settings.IS_POSTGRESQL:
+        return None
+    query = queryset.query
+    if not any((query.where, query.distinct, query.is_sliced, query.group_by is not None)):
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return int(row[0]) if row and row[0] >= 0 else None
+    return explain_queryset(queryset.order_by()).rows
+
+
+def count_queryset_approximately(queryset: models.QuerySet) -> Tuple[int, bool]:
+    """Return the estimated or exact number of rows of a queryset and whether it is exact.
+
+    The queryset is counted exactly if the estimate is less than
+    the `APPROXIMATE_COUNT_THRESHOLD` setting or is not available.
+    """
+    estimated_count = estimate_count(queryset)
+    if estimated_count is None or estimated_count < settings.APPROXIMATE_COUNT_THRESHOLD:
+        return count_queryset(queryset), True
+    return estimated_count, False
+
+
+def get_selected_field_names(info: graphene.ResolveInfo) -> Set[str]:
+    """Return names of fields selected in a field including fields of fragments."""
+    names: Set[str] = set()
+    selection_sets = [node.selection_set for node in info.field_nodes if node.selection_set]
+    while selection_sets:
+        selection_set = selection_sets.pop()
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                names.add(selection.name.value)
+            elif isinstance(selection, FragmentSpreadNode):
+                selection_sets.append(info.fragments[selection.name.value].selection_set)
+            else:
+                selection_sets.append(selection.selection_set)
+    return names
+
+
+def is_count_selected(info: graphene.ResolveInfo) -> bool:
+    """Determine whether fields of a connection may require the count of its queryset.
+
+    Fields other than `edges` and `pageInfo`, such as `totalCount`, may use the count.
+    """
+    return any(
+        name not in COUNT_FREE_CONNECTION_FIELDS
+        for name in get_selected_field_names(info)
+    )
@@ -0,0 +1,94 @@
+"""Query cost guard based on estimates of the database planner.
+
+Filtered querysets are explained with `EXPLAIN (FORMAT JSON)` and rejected
+if the total cost or the row estimate of the plan exceeds limits from settings.
+Estimates are cached for the canonical shape of a filter and the base queryset,
+so a query is explained once for each shape of each base queryset.
+"""
+
+import json
+from typing import NamedTuple, Optional, Tuple
+
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db import models
+
+from .caches import LRUCache
+from .conf import settings
+from .filterset import AdvancedFilterSet
+
+
+class QueryCost(NamedTuple):
+    """Total cost and row estimate of a query plan."""
+
+    total_cost: float
+    rows: int
+
+
+query_cost_cache = LRUCache(settings.QUERY_COST_CACHE_SIZE)
+
+
+def explain_queryset(queryset: models.QuerySet) -> QueryCost:
+    """Return the total cost and the row estimate of a queryset plan."""
+    plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+    return QueryCost(plan['Total Cost'], plan['Plan Rows'])
+
+
+def get_queryset_key(queryset: models.QuerySet) -> Optional[Tuple[str, str]]:
+    """Return the database alias and the SQL template without parameters of a queryset.
+
+    Querysets that can not be compiled to SQL have no key.
+    """
+    try:
+        sql, _ = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    return queryset.db, sql
+
+
+def get_query_cost(filterset: AdvancedFilterSet, queryset: models.QuerySet) -> QueryCost:
+    """Return a cached query cost for the filter shape and the base queryset of a filterset.
+
+    Query costs of filtersets with filters changed after initialization are not cached.
+    """
+    queryset_key = get_queryset_key(filterset.queryset.all())
+    if filterset.filter_shape_hash is None or queryset_key is None:
+        return explain_queryset(queryset)
+    return query_cost_cache.get_or_create(
+        (
+            type(filterset),
+            filterset.filter_shape_hash,
+            queryset_key,
+            settings.EXISTS_SUBQUERIES,
+        ),
+        lambda: explain_queryset(queryset),
+    )
+
+
+def validate_query_cost(
+    filterset: AdvancedFilterSet,
+    queryset: models.QuerySet,
+) -> Optional[QueryCost]:
+    """Validate that the query cost of a filtered queryset does not exceed limits from settings.
+
+    The query is not explained if no limits are set, the database is not PostgreSQL
+    or the filter can not be satisfied.
+    """
+    max_query_cost = settings.MAX_QUERY_COST
+    max_query_rows = settings.MAX_QUERY_ROWS
+    has_limits = max_query_cost is not None or max_query_rows is not None
+    if not has_limits or not settings.IS_POSTGRESQL or queryset.query.is_empty():
+        return None
+    query_cost = get_query_cost(filterset, queryset)
+    if max_query_cost is not None and query_cost.total_cost > max_query_cost:
+        raise ValidationError(
+            f'The estimated query cost {query_cost.total_cost:g} '
+            f'exceeds the limit of {max_query_cost:g}',
+            code='query_cost',
+        )
+    if max_query_rows is not None and query_cost.rows > max_query_rows:
+        raise ValidationError(
+            f'The estimated number of rows {query_cost.rows} '
+            f'exceeds the limit of {max_query_rows}',
+            code='query_cost',
+        )
+    return query_cost
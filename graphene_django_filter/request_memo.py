@@ -0,0 +1,71 @@
+"""Request-scoped memoization of filtered querysets.
+
+A GraphQL document can request the same connection with the same filter
+several times, e.g. under aliases or in fragments. Validated filtersets
+are stored in a memo attached to the context of a request,
+so the filter argument is converted and validated once,
+and all fields share the same filtered QuerySet object.
+"""
+
+import json
+from typing import Any, Dict, Hashable, Optional, Tuple, Type, Union
+
+import graphene
+from django.core.exceptions import EmptyResultSet
+from django.db import models
+from graphene_django.utils import maybe_queryset
+from graphql import OperationType
+
+from .filterset import AdvancedFilterSet
+from .normalization import get_hash
+
+REQUEST_MEMO_KEY = 'graphene_django_filter_memo'
+
+
+def get_filter_input_hash(filter_input: Dict[str, Any]) -> str:
+    """Return a hash of a filter argument that does not depend on the order of its fields."""
+    return get_hash(json.dumps(filter_input, sort_keys=True, default=repr))
+
+
+def get_request_memo(info: graphene.ResolveInfo) -> Optional[Dict[Hashable, Any]]:
+    """Return the memo of a request attached to its context.
+
+    Return None if the context can not hold the memo, or if the operation is not a query,
+    because mutations can change the data between fields.
+    """
+    if info.operation.operation != OperationType.QUERY or info.context is None:
+        return None
+    if isinstance(info.context, dict):
+        return info.context.setdefault(REQUEST_MEMO_KEY, {})
+    memo = getattr(info.context, REQUEST_MEMO_KEY, None)
+    if memo is None:
+        memo = {}
+        try:
+            setattr(info.context, REQUEST_MEMO_KEY, memo)
+        except AttributeError:
+            return None
+    return memo
+
+
+def get_request_memo_key(
+    filterset_class: Type[AdvancedFilterSet],
+    filter_input: Dict[str, Any],
+    queryset: Union[models.QuerySet, models.Manager],
+) -> Optional[Tuple[Any, ...]]:
+    """Return a key of a filtered queryset in the memo of a request.
+
+    The key consists of the filterset class, the hash of the filter argument
+    and the SQL of the unfiltered queryset. Return None if the queryset is empty.
+    """
+    queryset = maybe_queryset(queryset)
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    return (
+        filterset_class,
+        get_filter_input_hash(filter_input),
+        queryset.db,
+        sql,
+        repr(params),
+    )
@@ -0,0 +1,185 @@
+"""Cache of primary keys of filtered querysets.
+
+Primary keys of filtered querysets are stored in a Django cache selected
+by the `RESULT_CACHE` setting, so repeated requests with the same filters
+are served by primary keys without running the filter SQL.
+Keys of entries contain versions of models that the filters touch.
+Versions are bumped by the `post_save`, `post_delete` and `m2m_changed` signals,
+so entries of changed models are not read again and expire.
+Changes that do not send these signals, such as `QuerySet.update`, `bulk_create`,
+`bulk_update` and raw SQL, do not bump versions, and a cache that is not shared
+between processes, such as the local-memory one, only sees versions bumped
+by its own process. Such changes are served stale primary keys
+for up to the `RESULT_CACHE_TIMEOUT` setting.
+"""
+
+import time
+from typing import Iterable, List, Optional, Set, Tuple, Type
+
+from django.core.cache import BaseCache, caches
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist
+from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .conf import settings
+from .normalization import get_hash
+
+RESULT_CACHE_KEY_PREFIX = 'graphene_django_filter'
+M2M_CHANGED_ACTIONS = ('post_add', 'post_remove', 'post_clear')
+UNCACHEABLE_RESULT = 'uncacheable'
+
+tracked_models: Set[Type[models.Model]] = set()
+
+
+def get_path_models(model: Type[models.Model], path: str) -> List[Type[models.Model]]:
+    """Return models that a path of a model field touches.
+
+    For example, the `user__email` path of the `Task` model touches `Task` and `User`.
+    """
+    path_models = [model]
+    for part in path.split(LOOKUP_SEP):
+        try:
+            field = path_models[-1]._meta.get_field(part)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.related_model is None:
+            break
+        path_models.append(field.related_model)
+    return path_models
+
+
+def track_models(result_models: Iterable[Type[models.Model]]) -> None:
+    """Bump versions of models in response to their changes."""
+    tracked_models.update(result_models)
+
+
+def get_result_cache() -> Optional[BaseCache]:
+    """Return the Django cache of primary keys or None if the result cache is disabled."""
+    if settings.RESULT_CACHE is None:
+        return None
+    return caches[settings.RESULT_CACHE]
+
+
+def get_version_key(model: Type[models.Model]) -> str:
+    """Return a cache key of a model version."""
+    return f'{RESULT_CACHE_KEY_PREFIX}:version:{model._meta.label_lower}'
+
+
+def get_model_versions(
+    cache: BaseCache,
+    result_models: Iterable[Type[models.Model]],
+) -> Tuple[int, ...]:
+    """Return versions of models creating missing ones.
+
+    New versions are based on the current time,
+    so they do not repeat versions of evicted entries.
+    """
+    keys = [get_version_key(model) for model in result_models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_model_version(cache: BaseCache, model: Type[models.Model]) -> None:
+    """Bump a version of a model, so cached primary keys of its querysets are not read."""
+    key = get_version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def get_result_key(
+    cache: BaseCache,
+    queryset: models.QuerySet,
+    result_models: Iterable[Type[models.Model]],
+) -> str:
+    """Return a cache key of primary keys of a filtered queryset.
+
+    The key contains the SQL of the queryset with parameters and versions of models.
+    """
+    sql, params = queryset.query.sql_with_params()
+    versions = get_model_versions(cache, result_models)
+    return f'{RESULT_CACHE_KEY_PREFIX}:result:' + get_hash(
+        f'{queryset.db}:{sql}:{params!r}:{versions!r}',
+    )
+
+
+def is_result_cacheable(queryset: models.QuerySet, filtered_queryset: models.QuerySet) -> bool:
+    """Determine whether rows of a filtered queryset can be selected by primary keys.
+
+    Filters must not change the ordering and the selected annotations of the queryset,
+    because rows are selected from the unfiltered queryset.
+    """
+    return all((
+        not filtered_queryset.query.is_sliced,
+        filtered_queryset.query.order_by == queryset.query.order_by,
+        filtered_queryset.query.annotation_select.keys() == queryset.query.annotation_select.keys(),
+    ))
+
+
+def cache_result(
+    queryset: models.QuerySet,
+    filtered_queryset: models.QuerySet,
+    result_models: Iterable[Type[models.Model]],
+) -> models.QuerySet:
+    """Return a filtered queryset selecting rows by cached primary keys.
+
+    Primary keys are fetched and cached if they are not cached.
+    If there are more of them than the `RESULT_CACHE_MAX_ROWS` setting,
+    the result is marked as uncacheable instead, so primary keys of the same
+    filtered queryset are not fetched again until the mark expires.
+    """
+    cache = get_result_cache()
+    if cache is None or not is_result_cacheable(queryset, filtered_queryset):
+        return filtered_queryset
+    try:
+        key = get_result_key(cache, filtered_queryset, result_models)
+    except EmptyResultSet:
+        return filtered_queryset
+    pks = cache.get(key)
+    if pks == UNCACHEABLE_RESULT:
+        return filtered_queryset
+    if pks is None:
+        max_rows = settings.RESULT_CACHE_MAX_ROWS
+        pks = list(filtered_queryset.values_list('pk', flat=True)[:max_rows + 1])
+        if len(pks) > max_rows:
+            cache.set(key, UNCACHEABLE_RESULT, timeout=settings.RESULT_CACHE_TIMEOUT)
+            return filtered_queryset
+        cache.set(key, pks, timeout=settings.RESULT_CACHE_TIMEOUT)
+    return queryset.filter(pk__in=pks)
+
+
+def bump_changed_model_versions(sender: Type[models.Model], **kwargs) -> None:
+    """Bump versions of tracked models in response to the `post_save` and `post_delete` signals."""
+    cache = get_result_cache()
+    if cache is not None and sender in tracked_models:
+        bump_model_version(cache, sender)
+
+
+def bump_m2m_changed_model_versions(
+    sender: Type[models.Model],
+    instance: models.Model,
+    action: str,
+    model: Type[models.Model],
+    **kwargs
+) -> None:
+    """Bump versions of tracked models in response to the `m2m_changed` signal."""
+    cache = get_result_cache()
+    if cache is None or action not in M2M_CHANGED_ACTIONS:
+        return
+    for changed_model in {sender, type(instance), model}:
+        if changed_model in tracked_models:
+            bump_model_version(cache, changed_model)
+
+
+post_save.connect(bump_changed_model_versions, dispatch_uid='graphene_django_filter_post_save')
+post_delete.connect(bump_changed_model_versions, dispatch_uid='graphene_django_filter_post_delete')
+m2m_changed.connect(
+    bump_m2m_changed_model_versions,
+    dispatch_uid='graphene_django_filter_m2m_changed',
+)
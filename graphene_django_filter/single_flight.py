@@ -0,0 +1,122 @@
+"""Single-flight coalescing of concurrent identical queries.
+
+When many requests with the same filter and pagination arrive at once,
+e.g. after a cache entry expires, only one of them runs the queries,
+and others wait for it and share its result.
+Calls are coalesced between threads of a process and between tasks of an event loop.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from django.core.exceptions import EmptyResultSet
+from django.db import models
+from graphene_django.utils import maybe_queryset
+
+from .normalization import get_hash
+
+PAGINATION_ARGS = ('first', 'last', 'after', 'before', 'offset')
+
+
+class SingleFlightCall:
+    """Call in flight that other callers wait for."""
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.exception: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one call.
+
+    The first caller of a key runs the function, and callers that arrive
+    while it is running wait for it and get the same result or exception.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, SingleFlightCall] = {}
+        self._async_calls: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of calls in flight."""
+        return len(self._calls) + len(self._async_calls)
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Call a function or wait for the call in flight with the same key in another thread."""
+        with self._lock:
+            call = self._calls.get(key, None)
+            is_leader = call is None
+            if call is None:
+                call = self._calls[key] = SingleFlightCall()
+        if not is_leader:
+            call.event.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+        try:
+            call.result = func()
+        except BaseException as exception:
+            call.exception = exception
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await a function or the call in flight with the same key in the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            future = self._async_calls.get((loop, key), None)
+            is_leader = future is None
+            if future is None:
+                future = self._async_calls[(loop, key)] = loop.create_future()
+        if not is_leader:
+            return await asyncio.shield(future)
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exception:
+            future.set_exception(exception)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._async_calls[(loop, key)]
+        return result
+
+
+query_single_flight = SingleFlight()
+
+
+def get_single_flight_key(
+    iterable: Any,
+    args: Dict[str, Any],
+    *extra: Hashable
+) -> Optional[Tuple[Hashable, ...]]:
+    """Return a key of a page of a filtered queryset.
+
+    The key consists of a hash of the SQL of the queryset, which covers the filterset,
+    the filter and the unfiltered queryset, pagination arguments and extra values
+    that affect the result. Return None if the iterable is not a queryset or is empty.
+    """
+    queryset = maybe_queryset(iterable)
+    if not isinstance(queryset, models.QuerySet):
+        return None
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    return (
+        get_hash(f'{queryset.db}:{sql}:{params!r}'),
+        tuple(args.get(name, None) for name in PAGINATION_ARGS),
+        *extra,
+    )
@@ -0,0 +1,132 @@
+"""Form-free validation of tree-like filterset data.
+
+Tree-like forms create a Django form per `and`/`or`/`not` node.
+Functions of this module clean the same data with fields of filters directly
+and return the same errors without creating any forms.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.forms.utils import ErrorDict, ErrorList
+from django_filters import Filter
+
+from .filter_plans import FilterLeaf, FilterNode, FilterTree
+
+
+class CleanedNode:
+    """Cleaning state of a data node."""
+
+    __slots__ = (
+        'data',
+        'leaves',
+        'errors',
+        'and_nodes',
+        'or_nodes',
+        'not_node',
+        'quantifier_nodes',
+        'tree',
+    )
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self.data = data
+        self.leaves: List[FilterLeaf] = []
+        self.errors = ErrorDict()
+        self.and_nodes: List[CleanedNode] = []
+        self.or_nodes: List[CleanedNode] = []
+        self.not_node: Optional[CleanedNode] = None
+        self.quantifier_nodes: List[Tuple[str, str, str, CleanedNode]] = []
+        self.tree: Optional[FilterTree] = None
+
+
+def clean_filter_tree(
+    filters: Mapping[str, Filter],
+    data: Dict[str, Any],
+    positions: Optional[Dict[str, int]] = None,
+    required: Optional[Tuple[str, ...]] = None,
+    quantifier_keys: Optional[Mapping[str, Tuple[str, str]]] = None,
+) -> Tuple[FilterNode, ErrorDict]:
+    """Clean tree-like data with fields of filters.
+
+    Return a filter tree and errors structured like errors of the tree-like form.
+    Nodes are visited iteratively, so deep trees do not hit the recursion limit.
+    Positions of filters and names of required filters are derived from filters if omitted.
+    `quantifier_keys` maps data keys of quantifiers to quantifiers and relation paths.
+    """
+    if quantifier_keys is None:
+        quantifier_keys = {}
+    if positions is None:
+        positions = {name: position for position, name in enumerate(filters)}
+    if required is None:
+        required = tuple(
+            name for name, filter_value in filters.items()
+            if filter_value.extra.get('required', False)
+        )
+    root = CleanedNode(data)
+    nodes = [root]
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        clean_leaves(node, filters, positions, required)
+        node.and_nodes = [CleanedNode(and_data) for and_data in node.data.get('and', [])]
+        node.or_nodes = [CleanedNode(or_data) for or_data in node.data.get('or', [])]
+        children = [*node.and_nodes, *node.or_nodes]
+        if node.data.get('not', None):
+            node.not_node = CleanedNode(node.data['not'])
+            children.append(node.not_node)
+        for key, quantifier_data in node.data.items():
+            if key in quantifier_keys:
+                quantifier_node = CleanedNode(quantifier_data)
+                node.quantifier_nodes.append((key, *quantifier_keys[key], quantifier_node))
+                children.append(quantifier_node)
+        nodes.extend(children)
+        stack.extend(children)
+    for node in reversed(nodes):
+        complete_node(node)
+    return root.tree, root.errors
+
+
+def clean_leaves(
+    node: CleanedNode,
+    filters: Mapping[str, Filter],
+    positions: Dict[str, int],
+    required: Tuple[str, ...],
+) -> None:
+    """Clean values of a data node in the order of filters like a form does."""
+    names = sorted(
+        {*(name for name in node.data if name in positions), *required},
+        key=positions.__getitem__,
+    )
+    for name in names:
+        field = filters[name].field
+        try:
+            value = field.clean(field.widget.value_from_datadict(node.data, {}, name))
+        except ValidationError as e:
+            node.errors[name] = ErrorList(e.error_list)
+        else:
+            if name in node.data:
+                node.leaves.append(FilterLeaf(name, value))
+
+
+def complete_node(node: CleanedNode) -> None:
+    """Create a filter tree and errors of a node whose children are completed."""
+    children: List[FilterTree] = list(node.leaves)
+    for key, child_nodes in (('and', node.and_nodes), ('or', node.or_nodes)):
+        if not child_nodes:
+            continue
+        children.append(FilterNode(key, tuple(child_node.tree for child_node in child_nodes)))
+        errors = ErrorDict()
+        for i, child_node in enumerate(child_nodes):
+            if child_node.errors:
+                errors[f'{key}_{i}'] = child_node.errors
+        if len(errors):
+            node.errors[key] = errors
+    if node.not_node:
+        children.append(FilterNode('not', (node.not_node.tree,)))
+        if node.not_node.errors:
+            node.errors['not'] = node.not_node.errors
+    for key, quantifier, relation_path, quantifier_node in node.quantifier_nodes:
+        children.append(FilterNode(quantifier, quantifier_node.tree.children, relation_path))
+        if quantifier_node.errors:
+            node.errors[key] = quantifier_node.errors
+    node.tree = FilterNode('and', tuple(children))
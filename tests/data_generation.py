@@ -118,5 +118,5 @@ def generate_task_groups(seeder: Seeder) -> None:
 
 def set_task_groups_tasks() -> None:
     """Set tasks for task groups after data generation."""
-    for i, task_group in enumerate(TaskGroup.objects.all()):
+    for i, task_group in enumerate(TaskGroup.objects.order_by('pk')):
         task_group.tasks.set(range(i * 5 + 1, i * 5 + 5 + 1))
@@ -44,4 +44,6 @@ class TaskGroupFilter(AdvancedFilterSet):
             'name': ('exact', 'contains', 'full_text_search'),
             'priority': ('exact', 'gte', 'lte'),
             'tasks': ('exact',),
+            'tasks__name': ('exact', 'contains'),
+            'tasks__user__email': ('exact',),
         }
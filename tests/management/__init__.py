@@ -0,0 +1 @@
+"""Management of the test project."""
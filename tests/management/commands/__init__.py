@@ -0,0 +1 @@
+"""Commands of the test project."""
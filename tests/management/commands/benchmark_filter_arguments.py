@@ -0,0 +1,120 @@
+"""Benchmark of creating filter arguments for wide FilterSet classes."""
+
+import time
+from typing import Any, Callable, Type
+
+import graphene
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import models
+from graphene_django_filter import AdvancedFilterSet
+from graphene_django_filter.filter_arguments_factory import FilterArgumentsFactory
+from graphene_django_filter.input_type_registry import input_type_registry_scope
+
+from ...models import User
+
+LOOKUP_EXPRS = ('exact', 'iexact', 'contains', 'icontains', 'startswith', 'in')
+
+
+def create_model(number_of_fields: int) -> Type[models.Model]:
+    """Create a synthetic model with a number of character fields and a relation to users."""
+    return type(
+        f'BenchmarkModel{number_of_fields}',
+        (models.Model,),
+        {
+            '__module__': __name__,
+            'Meta': type('Meta', (), {'app_label': 'tests'}),
+            'user': models.ForeignKey(User, on_delete=models.CASCADE),
+            **{
+                f'field_{index}': models.CharField(max_length=128)
+                for index in range(number_of_fields)
+            },
+        },
+    )
+
+
+def create_filterset_class(model: Type[models.Model]) -> Type[AdvancedFilterSet]:
+    """Create a FilterSet class with all lookups of all fields of a synthetic model."""
+    fields = {
+        field.name: LOOKUP_EXPRS
+        for field in model._meta.get_fields()
+        if isinstance(field, models.CharField)
+    }
+    fields.update({
+        f'user__{field_name}': LOOKUP_EXPRS
+        for field_name in ('email', 'first_name', 'last_name')
+    })
+    return type(
+        f'{model.__name__}Filter',
+        (AdvancedFilterSet,),
+        {'Meta': type('Meta', (), {'model': model, 'fields': fields})},
+    )
+
+
+def create_schema(filterset_class: Type[AdvancedFilterSet]) -> graphene.Schema:
+    """Create a schema with a field with filter arguments of a FilterSet class."""
+    arguments = FilterArgumentsFactory(filterset_class, 'Benchmark').arguments
+    return graphene.Schema(query=type('Query', (graphene.ObjectType,), {
+        'benchmark': graphene.Field(graphene.String, args=arguments),
+    }))
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """Return the best time of calling a function in seconds.
+
+    Each call registers input types in a new registry.
+    """
+    times = []
+    for _ in range(repeat):
+        with input_type_registry_scope():
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+    return min(times)
+
+
+class Command(BaseCommand):
+    """Measure the time of creating filter arguments for synthetic FilterSet classes."""
+
+    help = 'Measure the time of creating filter arguments for wide FilterSet classes.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add the numbers of fields of synthetic models and the number of repeats."""
+        parser.add_argument(
+            '--fields',
+            nargs='+',
+            type=int,
+            default=[100, 200, 400, 800],
+            help='Numbers of fields of synthetic models',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Number of measurements to take the best time of',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Print the time of converting FilterSet classes to trees, arguments and schemas.
+
+        Schemas are built with filter arguments, so their time includes creating the arguments.
+        """
+        self.stdout.write(
+            f'{"Filters":>10}{"Trees, ms":>14}{"Arguments, ms":>18}{"Schema, ms":>15}',
+        )
+        for number_of_fields in options['fields']:
+            filterset_class = create_filterset_class(create_model(number_of_fields))
+            trees_time = measure(
+                lambda: FilterArgumentsFactory.filterset_to_trees(filterset_class),
+                options['repeat'],
+            )
+            arguments_time = measure(
+                lambda: FilterArgumentsFactory(filterset_class, 'Benchmark').arguments,
+                options['repeat'],
+            )
+            schema_time = measure(lambda: create_schema(filterset_class), options['repeat'])
+            self.stdout.write(
+                f'{len(filterset_class.base_filters):>10}'
+                f'{trees_time * 1000:>14.1f}'
+                f'{arguments_time * 1000:>18.1f}'
+                f'{schema_time * 1000:>15.1f}',
+            )
@@ -2,6 +2,7 @@
 
 import graphene
 from graphene_django import DjangoObjectType
+from graphene_django_filter import CountableConnection
 
 from .filtersets import TaskFilter, TaskGroupFilter, UserFilter
 from .models import Task, TaskGroup, User
@@ -41,6 +42,7 @@ class TaskFilterFieldsType(DjangoObjectType):
     class Meta:
         model = Task
         interfaces = (graphene.relay.Node,)
+        connection_class = CountableConnection
         fields = '__all__'
         filter_fields = {
             'name': ('exact', 'contains', 'full_text_search'),
@@ -78,6 +80,8 @@ class TaskGroupFilterFieldsType(DjangoObjectType):
             'name': ('exact', 'contains', 'full_text_search'),
             'priority': ('exact', 'gte', 'lte'),
             'tasks': ('exact',),
+            'tasks__name': ('exact', 'contains'),
+            'tasks__user__email': ('exact',),
         }
 
 
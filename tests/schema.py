@@ -1,8 +1,10 @@
 """GraphQL schema."""
 
 import graphene
+from django.db.models import QuerySet
 from graphene_django_filter import AdvancedDjangoFilterConnectionField
 
+from .models import Task
 from .object_types import (
     TaskFilterFieldsType,
     TaskFilterSetClassType,
@@ -34,6 +36,25 @@ class Query(graphene.ObjectType):
         filter_input_type_prefix='TaskFilterSetClass',
         description='Advanced filter field with the `TaskFilterSetClassType` type',
     )
+    tasks_keyset = AdvancedDjangoFilterConnectionField(
+        TaskFilterFieldsType,
+        keyset_ordering=('-created_at', 'id'),
+        description='Advanced filter field with the keyset pagination',
+    )
+    tasks_window_count = AdvancedDjangoFilterConnectionField(
+        TaskFilterFieldsType,
+        window_count=True,
+        description='Advanced filter field with the window count',
+    )
+    tasks_approximate_count = AdvancedDjangoFilterConnectionField(
+        TaskFilterFieldsType,
+        approximate_count=True,
+        description='Advanced filter field with the approximate count',
+    )
+    tasks_async = AdvancedDjangoFilterConnectionField(
+        TaskFilterFieldsType,
+        description='Advanced filter field with an asynchronous resolver',
+    )
     task_groups_fields = AdvancedDjangoFilterConnectionField(
         TaskGroupFilterFieldsType,
         description='Advanced filter field with the `TaskGroupFilterFieldsType` type',
@@ -44,5 +65,10 @@ class Query(graphene.ObjectType):
         description='Advanced filter field with the `TaskGroupFilterSetClassType` type',
     )
 
+    @staticmethod
+    async def resolve_tasks_async(root: None, info: graphene.ResolveInfo, **kwargs) -> QuerySet:
+        """Resolve tasks asynchronously."""
+        return Task.objects.all()
+
 
 schema = graphene.Schema(query=Query)
@@ -0,0 +1,47 @@
+"""`caches` module tests."""
+
+from unittest.mock import MagicMock
+
+from django.test import TestCase
+from graphene_django_filter.caches import CacheInfo, LRUCache
+
+
+class LRUCacheTests(TestCase):
+    """The `LRUCache` class tests."""
+
+    def test_get_or_create(self) -> None:
+        """Test the `get_or_create` method."""
+        cache = LRUCache(2)
+        factory = MagicMock(return_value='value')
+        self.assertEqual('value', cache.get_or_create('key', factory))
+        self.assertEqual('value', cache.get_or_create('key', factory))
+        factory.assert_called_once_with()
+        self.assertEqual(CacheInfo(hits=1, misses=1, maxsize=2, currsize=1), cache.info())
+
+    def test_eviction(self) -> None:
+        """Test evicting the least recently used values."""
+        cache = LRUCache(2)
+        cache.put('key1', 'value1')
+        cache.put('key2', 'value2')
+        cache.get_or_create('key1', MagicMock())
+        cache.put('key3', 'value3')
+        self.assertIn('key1', cache)
+        self.assertNotIn('key2', cache)
+        self.assertIn('key3', cache)
+        self.assertEqual(2, len(cache))
+
+    def test_disabled(self) -> None:
+        """Test the cache with zero size."""
+        cache = LRUCache(0)
+        factory = MagicMock(return_value='value')
+        cache.get_or_create('key', factory)
+        cache.get_or_create('key', factory)
+        self.assertEqual(2, factory.call_count)
+        self.assertEqual(0, len(cache))
+
+    def test_clear(self) -> None:
+        """Test the `clear` method."""
+        cache = LRUCache(2)
+        cache.get_or_create('key', MagicMock())
+        cache.clear()
+        self.assertEqual(CacheInfo(hits=0, misses=0, maxsize=2, currsize=0), cache.info())
@@ -0,0 +1,107 @@
+"""`count_cache` module tests."""
+
+from concurrent.futures import wait
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase, TransactionTestCase
+from django.utils.timezone import now
+from graphene_django_filter.count_cache import (
+    get_cached_count,
+    get_count_key,
+    refresh_futures,
+)
+
+from .data_generation import generate_data
+from .models import Task, TaskGroup
+from .schema import schema
+
+
+class CountCacheTests(TestCase):
+    """Count cache tests."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `CountCacheTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def setUp(self) -> None:
+        """Clear the default cache."""
+        caches['default'].clear()
+
+    def test_get_count_key(self) -> None:
+        """Test the `get_count_key` function."""
+        queryset = Task.objects.filter(name__startswith='Important task')
+        self.assertEqual(get_count_key(queryset), get_count_key(queryset.order_by('-pk')))
+        self.assertNotEqual(
+            get_count_key(queryset),
+            get_count_key(Task.objects.filter(name__startswith='Other')),
+        )
+        self.assertIn(':tests.task:', get_count_key(queryset))
+        self.assertIn(':tests.taskgroup:', get_count_key(TaskGroup.objects.all()))
+
+    def test_get_cached_count(self) -> None:
+        """Test reading counts from the count cache."""
+        queryset = Task.objects.filter(name__startswith='Important task')
+        with self.assertNumQueries(1):
+            self.assertEqual(45, get_cached_count(queryset))
+        with patch.dict('graphene_django_filter.conf.DEFAULT_SETTINGS', {'COUNT_CACHE': 'default'}):
+            with self.assertNumQueries(1):
+                self.assertEqual(45, get_cached_count(queryset))
+            Task.objects.create(
+                name='Important task №76',
+                description='',
+                user_id=3,
+                created_at=now(),
+            )
+            with self.assertNumQueries(0):
+                self.assertEqual(45, get_cached_count(queryset))
+            with self.assertNumQueries(0):
+                self.assertEqual(0, get_cached_count(queryset.none()))
+
+    def test_schema_execution(self) -> None:
+        """Test reading the total count of a connection from the count cache."""
+        query = """
+            {
+                tasksFields(filter: {name: {contains: "Important task"}}, first: 5) {
+                    totalCount
+                    edges { node { id } }
+                }
+            }
+        """
+        with patch.dict('graphene_django_filter.conf.DEFAULT_SETTINGS', {'COUNT_CACHE': 'default'}):
+            for number_of_queries in (2, 1):
+                with self.assertNumQueries(number_of_queries):
+                    execution_result = schema.execute(query)
+                self.assertIsNone(execution_result.errors)
+                self.assertEqual(45, execution_result.data['tasksFields']['totalCount'])
+                self.assertEqual(5, len(execution_result.data['tasksFields']['edges']))
+
+
+class CountCacheRefreshTests(TransactionTestCase):
+    """Tests of refreshing stale counts in the background."""
+
+    def setUp(self) -> None:
+        """Generate data and clear the default cache."""
+        generate_data()
+        caches['default'].clear()
+
+    def test_refresh(self) -> None:
+        """Test returning stale counts while they are refreshed."""
+        queryset = Task.objects.filter(name__startswith='Important task')
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'COUNT_CACHE': 'default', 'COUNT_CACHE_TIMEOUT': 0},
+        ):
+            self.assertEqual(45, get_cached_count(queryset))
+            Task.objects.create(
+                name='Important task №76',
+                description='',
+                user_id=3,
+                created_at=now(),
+            )
+            self.assertEqual(45, get_cached_count(queryset))
+            wait(list(refresh_futures.values()))
+            self.assertEqual(46, get_cached_count(queryset))
+            wait(list(refresh_futures.values()))
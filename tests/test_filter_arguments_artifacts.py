@@ -0,0 +1,154 @@
+"""`filter_arguments_artifacts` module tests."""
+
+import json
+import os
+import tempfile
+from io import StringIO
+from typing import Dict, Tuple
+from unittest.mock import patch
+
+import django_filters
+import graphene
+from django.core.management import call_command
+from django.test import TestCase
+from graphene_django_filter import AdvancedFilterSet
+from graphene_django_filter.filter_arguments_artifacts import (
+    create_input_field,
+    get_field_spec,
+    get_filterset_definition_hash,
+    get_filterset_specs,
+    load_artifact,
+    write_artifact,
+)
+from graphene_django_filter.filter_arguments_factory import FilterArgumentsFactory
+from graphene_django_filter.input_type_registry import input_type_registry_scope
+
+from .filtersets import TaskFilter
+from .models import Task
+from .schema import Query
+
+schema_filterset_class = Query._meta.fields['tasks_filterset'].filterset_class
+
+
+class FilterArgumentsArtifactsTests(TestCase):
+    """The `filter_arguments_artifacts` module tests."""
+
+    def setUp(self) -> None:
+        """Create a temporary directory for artifacts."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, 'filter_arguments.json')
+
+    @staticmethod
+    def create_arguments() -> Dict[str, Dict[str, Tuple[str, str]]]:
+        """Create types and descriptions of lookup fields of the task filterset of the schema."""
+        with input_type_registry_scope() as registry:
+            FilterArgumentsFactory(schema_filterset_class, 'ArtifactTask').arguments
+            return {
+                name: {
+                    field_name: (str(field.type), field.description)
+                    for field_name, field in registry[name]._meta.fields.items()
+                }
+                for name in registry
+            }
+
+    def test_get_filterset_definition_hash(self) -> None:
+        """Test the `get_filterset_definition_hash` function."""
+        definition_hash = get_filterset_definition_hash(TaskFilter)
+        self.assertEqual(definition_hash, get_filterset_definition_hash(TaskFilter))
+        changed_filterset_class = type('ChangedTaskFilter', (AdvancedFilterSet,), {
+            'Meta': type('Meta', (), {
+                'model': Task,
+                'fields': {**TaskFilter._meta.fields, 'name': ('exact', 'contains')},
+            }),
+        })
+        self.assertNotEqual(definition_hash, get_filterset_definition_hash(changed_filterset_class))
+        declared_filterset_class = type('DeclaredTaskFilter', (TaskFilter,), {
+            'name': django_filters.NumberFilter(),
+        })
+        self.assertNotEqual(
+            definition_hash,
+            get_filterset_definition_hash(declared_filterset_class),
+        )
+
+    def test_field_spec(self) -> None:
+        """Test the `get_field_spec` and `create_input_field` functions."""
+        for input_field, spec in (
+            (graphene.InputField(graphene.List(graphene.ID), description='`In` lookup'),
+             ('[ID]', None)),
+            (graphene.InputField(graphene.NonNull(graphene.String), description='Name'),
+             ('String!', 'Name')),
+            (graphene.InputField(graphene.NonNull(graphene.List(graphene.NonNull(graphene.Int)))),
+             ('[Int!]!', None)),
+        ):
+            default_description = input_field.description or '`Exact` lookup'
+            self.assertEqual(spec, get_field_spec(input_field, '`In` lookup'))
+            created_input_field = create_input_field(spec, default_description)
+            self.assertEqual(str(input_field.type), str(created_input_field.type))
+            self.assertEqual(default_description, created_input_field.description)
+        custom_scalar = type('CustomScalar', (graphene.String,), {})
+        self.assertIsNone(get_field_spec(graphene.InputField(custom_scalar), '`Exact` lookup'))
+
+    def test_load_artifact(self) -> None:
+        """Test the `load_artifact` function."""
+        self.assertIsNone(load_artifact(self.path))
+        call_command(
+            'build_filter_arguments',
+            schema='tests.schema.schema',
+            output=self.path,
+            stdout=StringIO(),
+        )
+        filterset_specs = load_artifact(self.path)
+        self.assertIn(get_filterset_definition_hash(schema_filterset_class), filterset_specs)
+        self.assertIs(filterset_specs, load_artifact(self.path))
+        with open(self.path, encoding='utf-8') as artifact_file:
+            artifact = json.load(artifact_file)
+        write_artifact(self.path, {**artifact, 'graphene': '0.0.0'})
+        os.utime(self.path, (0, 0))
+        self.assertIsNone(load_artifact(self.path))
+        with open(self.path, 'w', encoding='utf-8') as artifact_file:
+            artifact_file.write('{')
+        self.assertIsNone(load_artifact(self.path))
+
+    def test_arguments(self) -> None:
+        """Test creating filter arguments from the artifact."""
+        live_arguments = self.create_arguments()
+        output = StringIO()
+        call_command(
+            'build_filter_arguments',
+            schema='tests.schema.schema',
+            output=self.path,
+            stdout=output,
+        )
+        self.assertIn('connection fields', output.getvalue())
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'FILTER_ARGUMENTS_ARTIFACT': self.path},
+        ), patch.object(FilterArgumentsFactory, 'create_field') as create_field_mock:
+            self.assertIsNotNone(get_filterset_specs(schema_filterset_class))
+            artifact_arguments = self.create_arguments()
+        create_field_mock.assert_not_called()
+        self.assertEqual(live_arguments, artifact_arguments)
+
+    def test_stale_definition(self) -> None:
+        """Test creating filter arguments of a filterset changed after building the artifact."""
+        call_command(
+            'build_filter_arguments',
+            schema='tests.schema.schema',
+            output=self.path,
+            stdout=StringIO(),
+        )
+        changed_filterset_class = type('ChangedTaskFilter', (schema_filterset_class,), {
+            'name': django_filters.CharFilter(lookup_expr='icontains'),
+        })
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'FILTER_ARGUMENTS_ARTIFACT': self.path},
+        ):
+            self.assertIsNone(get_filterset_specs(changed_filterset_class))
+            with input_type_registry_scope():
+                arguments = FilterArgumentsFactory(
+                    changed_filterset_class,
+                    'StaleArtifactTask',
+                ).arguments
+        self.assertIn('filter', arguments)
@@ -1,133 +1,143 @@
 """Tests for converting a AdvancedFilterSet class to filter arguments."""
 
+from typing import Any, Dict
 from unittest.mock import patch
 
 import graphene
-from anytree import Node
-from anytree.exporter import DictExporter
 from django.test import TestCase
-from graphene_django_filter.filter_arguments_factory import FilterArgumentsFactory
+from django.utils.timezone import now
+from graphene_django_filter import AdvancedDjangoFilterConnectionField
+from graphene_django_filter.filter_arguments_factory import (
+    FilterArgumentsFactory,
+    FilterTrieNode,
+    to_pascal_case,
+)
+from graphene_django_filter.input_type_registry import input_type_registry_scope
 from graphene_django_filter.input_types import (
     SearchQueryFilterInputType,
     SearchRankFilterInputType,
     TrigramFilterInputType,
 )
+from graphql_relay import to_global_id
 from stringcase import pascalcase
 
 from .filtersets import TaskFilter
+from .models import Task, User
+from .object_types import TaskFilterFieldsType
+
+
+def export_tree(node: FilterTrieNode) -> Dict[str, Any]:
+    """Export a tree to a dictionary."""
+    if node.is_leaf:
+        return {'name': node.name}
+    return {'name': node.name, 'children': [export_tree(child) for child in node.children.values()]}
 
 
 class FilterArgumentsFactoryTests(TestCase):
     """The `FilterArgumentsFactory` class tests."""
 
-    abstract_tree_root = Node(
-        'field1', children=(
-            Node(
-                'field2', children=(
-                    Node(
-                        'field3', children=(
-                            Node('field4'),
-                        ),
-                    ),
-                ),
-            ),
-        ),
-    )
-    task_filter_trees_roots = [
-        Node(
-            name='name', children=[
-                Node(name='exact'),
-                Node(name='contains'),
-                Node(
-                    name='trigram', children=[
-                        Node(name='exact'),
-                        Node(name='gt'),
-                        Node(name='gte'),
-                        Node(name='lt'),
-                        Node(name='lte'),
+    task_filter_trees = [
+        {
+            'name': 'name', 'children': [
+                {'name': 'exact'},
+                {'name': 'contains'},
+                {
+                    'name': 'trigram', 'children': [
+                        {'name': 'exact'},
+                        {'name': 'gt'},
+                        {'name': 'gte'},
+                        {'name': 'lt'},
+                        {'name': 'lte'},
                     ],
-                ),
+                },
             ],
-        ),
-        Node(name='created_at', children=[Node(name='gt')]),
-        Node(name='completed_at', children=[Node(name='lt')]),
-        Node(name='description', children=[Node(name='exact'), Node(name='contains')]),
-        Node(
-            name='user', children=[
-                Node(name='exact'),
-                Node(name='in'),
-                Node(
-                    name='email', children=[
-                        Node(name='exact'),
-                        Node(name='iexact'),
-                        Node(name='contains'),
-                        Node(name='icontains'),
+        },
+        {'name': 'created_at', 'children': [{'name': 'gt'}]},
+        {'name': 'completed_at', 'children': [{'name': 'lt'}]},
+        {'name': 'description', 'children': [{'name': 'exact'}, {'name': 'contains'}]},
+        {
+            'name': 'user', 'children': [
+                {'name': 'exact'},
+                {'name': 'in'},
+                {
+                    'name': 'email', 'children': [
+                        {'name': 'exact'},
+                        {'name': 'iexact'},
+                        {'name': 'contains'},
+                        {'name': 'icontains'},
                     ],
-                ),
-                Node(
-                    name='last_name', children=[
-                        Node(name='exact'),
-                        Node(name='contains'),
+                },
+                {
+                    'name': 'last_name', 'children': [
+                        {'name': 'exact'},
+                        {'name': 'contains'},
                     ],
-                ),
+                },
             ],
-        ),
-        Node(name='search_query', children=[Node(name='exact')]),
-        Node(
-            name='search_rank', children=[
-                Node(name='exact'),
-                Node(name='gt'),
-                Node(name='gte'),
-                Node(name='lt'),
-                Node(name='lte'),
+        },
+        {'name': 'search_query', 'children': [{'name': 'exact'}]},
+        {
+            'name': 'search_rank', 'children': [
+                {'name': 'exact'},
+                {'name': 'gt'},
+                {'name': 'gte'},
+                {'name': 'lt'},
+                {'name': 'lte'},
             ],
-        ),
+        },
     ]
 
-    def test_sequence_to_tree(self) -> None:
-        """Test the `sequence_to_tree` method."""
-        self.assertEqual(
-            {
-                'name': 'field1',
-                'children': [{'name': 'field2'}],
-            },
-            DictExporter().export(FilterArgumentsFactory.sequence_to_tree(('field1', 'field2'))),
-        )
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `FilterArgumentsFactoryTests` class."""
+        super().setUpClass()
+        cls.task_filter_trees_roots = FilterArgumentsFactory.filterset_to_trees(TaskFilter)
 
-    def test_possible_try_add_sequence(self) -> None:
-        """Test the `try_add_sequence` method when adding a sequence is possible."""
-        is_mutated = FilterArgumentsFactory.try_add_sequence(
-            self.abstract_tree_root, ('field1', 'field5', 'field6'),
+    def test_add_sequence(self) -> None:
+        """Test the `add_sequence` method."""
+        roots: Dict[str, FilterTrieNode] = {}
+        node = FilterArgumentsFactory.add_sequence(roots, ('field1', 'field2', 'field3', 'field4'))
+        self.assertEqual(
+            FilterTrieNode('field4', ('field1', 'field2', 'field3', 'field4'), {}),
+            node,
         )
-        self.assertTrue(is_mutated)
+        FilterArgumentsFactory.add_sequence(roots, ('field1', 'field5', 'field6'))
+        FilterArgumentsFactory.add_sequence(roots, ('field7', 'field8'))
         self.assertEqual(
-            {
-                'name': 'field1',
-                'children': [
-                    {
-                        'name': 'field2',
-                        'children': [
-                            {
-                                'name': 'field3',
-                                'children': [{'name': 'field4'}],
-                            },
-                        ],
-                    },
-                    {
-                        'name': 'field5',
-                        'children': [{'name': 'field6'}],
-                    },
-                ],
-            },
-            DictExporter().export(self.abstract_tree_root),
+            [
+                {
+                    'name': 'field1',
+                    'children': [
+                        {
+                            'name': 'field2',
+                            'children': [
+                                {
+                                    'name': 'field3',
+                                    'children': [{'name': 'field4'}],
+                                },
+                            ],
+                        },
+                        {
+                            'name': 'field5',
+                            'children': [{'name': 'field6'}],
+                        },
+                    ],
+                },
+                {
+                    'name': 'field7',
+                    'children': [{'name': 'field8'}],
+                },
+            ],
+            [export_tree(root) for root in roots.values()],
         )
+        self.assertEqual(('field1', 'field5'), roots['field1'].children['field5'].path)
+        self.assertFalse(roots['field1'].is_leaf)
 
-    def test_impossible_try_add_sequence(self) -> None:
-        """Test the `try_add_sequence` method when adding a sequence is impossible."""
-        is_mutated = FilterArgumentsFactory.try_add_sequence(
-            self.abstract_tree_root, ('field5', 'field6'),
-        )
-        self.assertFalse(is_mutated)
+    def test_to_pascal_case(self) -> None:
+        """Test the `to_pascal_case` function."""
+        self.assertEqual('LastName', to_pascal_case('last_name'))
+        self.assertEqual('LastName', to_pascal_case('last_name'))
+        self.assertGreaterEqual(to_pascal_case.cache_info().hits, 1)
 
     def test_init(self) -> None:
         """The the `__init__` method."""
@@ -139,11 +149,7 @@ class FilterArgumentsFactoryTests(TestCase):
     def test_filterset_to_trees(self) -> None:
         """Test the `filterset_to_trees` method."""
         roots = FilterArgumentsFactory.filterset_to_trees(TaskFilter)
-        exporter = DictExporter()
-        self.assertEqual(
-            [exporter.export(root) for root in self.task_filter_trees_roots],
-            [exporter.export(root) for root in roots],
-        )
+        self.assertEqual(self.task_filter_trees, [export_tree(root) for root in roots])
 
     def test_create_input_object_type(self) -> None:
         """Test the `create_input_object_type` method."""
@@ -155,19 +161,19 @@ class FilterArgumentsFactoryTests(TestCase):
         self.assertTrue(issubclass(input_object_type, graphene.InputObjectType))
         self.assertTrue(hasattr(input_object_type, 'field'))
 
-    @patch(
-        'graphene_django_filter.filter_arguments_factory.FilterArgumentsFactory.input_object_types',
-        new={},
-    )
-    def test_create_input_object_type_cache(self) -> None:
-        """Test the `create_input_object_type` method's cache usage."""
-        self.assertEqual({}, FilterArgumentsFactory.input_object_types)
-        key = 'CustomInputObjectType'
-        input_object_type = FilterArgumentsFactory.create_input_object_type(key, {})
-        self.assertTrue(
-            input_object_type == FilterArgumentsFactory.create_input_object_type(key, {}),
+    def test_input_type_registry(self) -> None:
+        """Test registering input types in the registry of the current scope."""
+        with input_type_registry_scope() as registry:
+            filter_arguments_factory = FilterArgumentsFactory(TaskFilter, 'Task')
+            self.assertIs(registry, filter_arguments_factory.input_object_types)
+            input_object_type = filter_arguments_factory.arguments['filter'].type
+            self.assertIs(input_object_type, registry['TaskFilterInputType'])
+            self.assertIs(input_object_type, filter_arguments_factory.arguments['filter'].type)
+            self.assertIn('TaskUserEmailFilterInputType', registry)
+        self.assertIsNot(
+            input_object_type,
+            FilterArgumentsFactory(TaskFilter, 'Task').arguments['filter'].type,
         )
-        self.assertEqual({key: input_object_type}, FilterArgumentsFactory.input_object_types)
 
     def test_create_filter_input_subfield_without_special(self) -> None:
         """Test the `create_filter_input_subfield` method without any special filters."""
@@ -221,10 +227,13 @@ class FilterArgumentsFactoryTests(TestCase):
 
     def test_create_filter_input_type(self) -> None:
         """Test the `create_filter_input_type` method."""
-        filter_arguments_factory = FilterArgumentsFactory(TaskFilter, 'Task')
-        input_object_type = filter_arguments_factory.create_filter_input_type(
-            self.task_filter_trees_roots,
-        )
+        with input_type_registry_scope() as registry:
+            filter_arguments_factory = FilterArgumentsFactory(TaskFilter, 'Task')
+            input_object_type = filter_arguments_factory.create_filter_input_type(
+                self.task_filter_trees_roots,
+            )
+        self.assertNotIn('TaskFilterInputType', registry)
+        registry.get_or_create('TaskFilterInputType', lambda: input_object_type)
         self.assertEqual('TaskFilterInputType', input_object_type.__name__)
         for attr in ('name', 'description', 'user', 'created_at', 'completed_at'):
             self.assertEqual(
@@ -246,3 +255,74 @@ class FilterArgumentsFactoryTests(TestCase):
         arguments = filter_arguments_factory.arguments
         self.assertEqual(('filter',), tuple(arguments.keys()))
         self.assertEqual('TaskFilterInputType', arguments['filter'].type.__name__)
+
+    def test_shared_filter_input_types(self) -> None:
+        """Test sharing filter input types with the same fields."""
+        with input_type_registry_scope() as registry:
+            with patch.dict(
+                'graphene_django_filter.conf.DEFAULT_SETTINGS',
+                {'SHARED_FILTER_INPUT_TYPES': True},
+            ):
+                filter_arguments_factory = FilterArgumentsFactory(TaskFilter, 'SharedTask')
+            self.assertTrue(filter_arguments_factory.shared_input_types)
+            input_object_type = filter_arguments_factory.arguments['filter'].type
+        self.assertEqual('SharedTaskFilterInputType', input_object_type.__name__)
+        description_type = getattr(input_object_type, 'description').type
+        self.assertEqual('StringContainsExactFilterInputType', description_type.__name__)
+        self.assertEqual({'contains', 'exact'}, set(description_type._meta.fields))
+        user_type = getattr(input_object_type, 'user').type
+        self.assertRegex(user_type.__name__, r'^Shared[0-9a-f]{12}FilterInputType$')
+        self.assertIs(description_type, getattr(user_type, 'last_name').type)
+        self.assertEqual(
+            'StringContainsExactIcontainsIexactFilterInputType',
+            getattr(user_type, 'email').type.__name__,
+        )
+        self.assertNotIn('SharedTaskUserFilterInputType', registry)
+
+    def test_shared_filter_input_type_name_conflict(self) -> None:
+        """Test naming a shared filter input type with a hash if its name is reserved."""
+        with input_type_registry_scope() as registry:
+            registry.reserve_name('StringContainsExactFilterInputType', 'signature')
+            with patch.dict(
+                'graphene_django_filter.conf.DEFAULT_SETTINGS',
+                {'SHARED_FILTER_INPUT_TYPES': True},
+            ):
+                filter_arguments_factory = FilterArgumentsFactory(TaskFilter, 'SharedTask')
+            input_object_type = filter_arguments_factory.arguments['filter'].type
+        self.assertRegex(
+            getattr(input_object_type, 'description').type.__name__,
+            r'^StringContainsExact[0-9a-f]{12}FilterInputType$',
+        )
+        self.assertNotIn('StringContainsExactFilterInputType', registry)
+
+    def test_shared_filter_input_types_execution(self) -> None:
+        """Test filtering with shared filter input types."""
+        user = User.objects.create(email='shared@example.com', first_name='Shared', last_name='')
+        task = Task.objects.create(
+            name='Shared task',
+            description='',
+            user=user,
+            created_at=now(),
+        )
+        with input_type_registry_scope(), patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'SHARED_FILTER_INPUT_TYPES': True},
+        ):
+            schema = graphene.Schema(query=type('Query', (graphene.ObjectType,), {
+                'tasks': AdvancedDjangoFilterConnectionField(
+                    TaskFilterFieldsType,
+                    filter_input_type_prefix='SharedTask',
+                ),
+            }))
+        execution_result = schema.execute("""
+            {
+                tasks(filter: {user: {email: {contains: "shared@"}}, description: {exact: ""}}) {
+                    edges { node { id } }
+                }
+            }
+        """)
+        self.assertIsNone(execution_result.errors)
+        self.assertEqual(
+            [{'node': {'id': to_global_id('TaskFilterFieldsType', task.pk)}}],
+            execution_result.data['tasks']['edges'],
+        )
@@ -0,0 +1,132 @@
+"""`filter_costs` module tests."""
+
+from typing import Any, Dict
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from graphene.types.inputobjecttype import InputObjectTypeContainer
+from graphene_django_filter.filter_costs import (
+    FilterCost,
+    estimate_filter_cost,
+    validate_filter_cost,
+)
+from graphql import coerce_input_value
+
+from .filtersets import TaskFilter, TaskGroupFilter
+from .schema import schema
+
+
+class FilterCostsTests(TestCase):
+    """Static filter cost model tests."""
+
+    task_filter_data = {
+        'or': [
+            {'user': {'in': ['1', '2', '3']}},
+            {'not': {'name': {'contains': 'Important'}}},
+            {'name': {'trigram': {'value': 'Important', 'lookups': {'gt': 0.5}}}},
+        ],
+    }
+    task_group_filter_data = {
+        'priority': {'gte': 5},
+        'tasks': {
+            'name': {'contains': 'Important'},
+            'every': {'name': {'contains': 'task'}},
+        },
+    }
+
+    @staticmethod
+    def create_input_type(type_name: str, data: Dict[str, Any]) -> InputObjectTypeContainer:
+        """Create a tree_input_type from data as the GraphQL execution does."""
+        return coerce_input_value(data, schema.graphql_schema.get_type(type_name))
+
+    def test_estimate_filter_cost(self) -> None:
+        """Test the `estimate_filter_cost` function."""
+        task_input_type = self.create_input_type(
+            'TaskFilterFieldsFilterInputType',
+            self.task_filter_data,
+        )
+        self.assertEqual(
+            FilterCost(
+                depth=4,
+                branches=3,
+                leaves=3,
+                list_items=3,
+                max_list_size=3,
+                joins=0,
+                search_leaves=1,
+                cost=16.3,
+            ),
+            estimate_filter_cost(TaskFilter, task_input_type),
+        )
+        task_group_input_type = self.create_input_type(
+            'TaskGroupFilterFieldsFilterInputType',
+            self.task_group_filter_data,
+        )
+        self.assertEqual(
+            FilterCost(
+                depth=4,
+                branches=0,
+                leaves=3,
+                list_items=0,
+                max_list_size=0,
+                joins=3,
+                search_leaves=0,
+                cost=18,
+            ),
+            estimate_filter_cost(TaskGroupFilter, task_group_input_type),
+        )
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'FILTER_COST_WEIGHTS': {'join': 1}},
+        ):
+            self.assertEqual(
+                6,
+                estimate_filter_cost(TaskGroupFilter, task_group_input_type).cost,
+            )
+
+    def test_validate_filter_cost(self) -> None:
+        """Test the `validate_filter_cost` function."""
+        task_input_type = self.create_input_type(
+            'TaskFilterFieldsFilterInputType',
+            self.task_filter_data,
+        )
+        validate_filter_cost(TaskFilter, task_input_type)
+        for setting_name, limit, message in (
+            ('MAX_FILTER_DEPTH', 3, 'The filter depth 4 exceeds the limit of 3'),
+            (
+                'MAX_FILTER_BRANCHES', 2,
+                'The filter number of `and`/`or` branches 3 exceeds the limit of 2',
+            ),
+            ('MAX_FILTER_LEAVES', 2, 'The filter number of lookups 3 exceeds the limit of 2'),
+            ('MAX_FILTER_LIST_SIZE', 2, 'The filter list size 3 exceeds the limit of 2'),
+            ('MAX_FILTER_COST', 16, 'The filter cost 16.3 exceeds the limit of 16'),
+        ):
+            with self.subTest(setting_name=setting_name), patch.dict(
+                'graphene_django_filter.conf.DEFAULT_SETTINGS',
+                {setting_name: limit},
+            ):
+                with self.assertRaisesMessage(ValidationError, message):
+                    validate_filter_cost(TaskFilter, task_input_type)
+                with patch.dict(
+                    'graphene_django_filter.conf.DEFAULT_SETTINGS',
+                    {setting_name: limit + 1},
+                ):
+                    validate_filter_cost(TaskFilter, task_input_type)
+
+    def test_deep_filter(self) -> None:
+        """Test rejecting a deep filter in the schema execution before filtering."""
+        query = '{ tasksFields(filter: %s) { edges { node { id } } } }'
+        filter_value = '{name: {exact: "Important task №1"}}'
+        for _ in range(50):
+            filter_value = '{not: %s}' % filter_value
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'MAX_FILTER_DEPTH': 20},
+        ), patch('graphene_django_filter.connection_field.tree_input_type_to_data') as mock:
+            execution_result = schema.execute(query % filter_value)
+        self.assertFalse(mock.called)
+        self.assertEqual(
+            'The filter depth 52 exceeds the limit of 20',
+            execution_result.errors[0].message,
+        )
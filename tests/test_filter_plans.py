@@ -0,0 +1,279 @@
+"""`filter_plans` module tests."""
+
+import sys
+from typing import List
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.test import TestCase
+from django_filters import CharFilter
+from graphene_django.filter.filters import ListFilter
+from graphene_django_filter.caches import LRUCache
+from graphene_django_filter.filter_plans import (
+    FilterLeaf,
+    FilterNode,
+    SubqueryLookup,
+    compile_filter_plan,
+    create_filter_tree,
+    get_subquery_lookup,
+    get_tree_depth,
+    get_tree_shape,
+    is_simple_filter,
+)
+from graphene_django_filter.filterset_factories import get_filterset_class
+
+from .data_generation import generate_data
+from .filtersets import TaskFilter, TaskGroupFilter
+from .models import Task, TaskGroup, User
+
+
+class FilterPlansTests(TestCase):
+    """Compiled filter plans tests."""
+
+    task_filter_data = {
+        'user__in': [2, 3],
+        'or': [
+            {'name__contains': 'Important'},
+            {'description__contains': 'important'},
+        ],
+        'not': {
+            'user__email__contains': 'alice',
+        },
+    }
+    task_filter_tree = FilterNode('and', (
+        FilterLeaf('user__in', [2, 3]),
+        FilterNode('or', (
+            FilterNode('and', (FilterLeaf('name__contains', 'Important'),)),
+            FilterNode('and', (FilterLeaf('description__contains', 'important'),)),
+        )),
+        FilterNode('not', (
+            FilterNode('and', (FilterLeaf('user__email__contains', 'alice'),)),
+        )),
+    ))
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `FilterPlansTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def test_create_filter_tree(self) -> None:
+        """Test the `create_filter_tree` function."""
+        task_filter = get_filterset_class(TaskFilter)(data=self.task_filter_data)
+        self.assertTrue(task_filter.form.is_valid())
+        self.assertEqual(self.task_filter_tree, create_filter_tree(task_filter.form))
+
+    def test_get_tree_shape(self) -> None:
+        """Test the `get_tree_shape` function."""
+        self.assertEqual(
+            ('and', (
+                'user__in',
+                ('or', (('and', ('name__contains',)), ('and', ('description__contains',)))),
+                ('not', (('and', ('user__email__contains',)),)),
+            )),
+            get_tree_shape(self.task_filter_tree),
+        )
+
+    def test_is_simple_filter(self) -> None:
+        """Test the `is_simple_filter` function."""
+        self.assertTrue(is_simple_filter(CharFilter(field_name='name')))
+        self.assertFalse(is_simple_filter(CharFilter(field_name='name', method='filter_name')))
+        self.assertFalse(is_simple_filter(ListFilter(field_name='user', lookup_expr='in')))
+
+    def test_bind(self) -> None:
+        """Test binding values of filter trees to a filter plan."""
+        filterset_class = get_filterset_class(TaskFilter)
+        plan = compile_filter_plan(filterset_class, get_tree_shape(self.task_filter_tree))
+        filterset = filterset_class(data=self.task_filter_data)
+        for users in ([2, 3], [1]):
+            tree = FilterNode('and', (
+                FilterLeaf('user__in', users),
+                *self.task_filter_tree.children[1:],
+            ))
+            qs, q = plan.bind(filterset, Task.objects.all(), tree)
+            or_q = models.Q(name__contains='Important') | models.Q(
+                description__contains='important',
+            )
+            expected_tasks = Task.objects.filter(
+                models.Q(user__in=users) & or_q & ~models.Q(user__email__contains='alice'),
+            )
+            self.assertEqual(list(expected_tasks), list(qs.filter(q)))
+
+    def test_filter_plan_cache(self) -> None:
+        """Test reusing cached filter plans for trees of the same shape."""
+        cache = LRUCache(8)
+        filterset_class = get_filterset_class(TaskFilter)
+        with patch('graphene_django_filter.filterset.filter_plan_cache', new=cache):
+            for user in (2, 3):
+                filterset = filterset_class(data={**self.task_filter_data, 'user__in': [user]})
+                self.assertTrue(filterset.qs.exists())
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_changed_filters(self) -> None:
+        """Test compiling plans for filters changed by a filterset instance."""
+        class ChangedTaskFilter(TaskFilter):
+            def __init__(self, *args, **kwargs) -> None:
+                changes = kwargs.pop('changes', {})
+                super().__init__(*args, **kwargs)
+                for name, value in changes.items():
+                    setattr(self.filters['name'], name, value)
+
+        def get_task_pks(q: models.Q) -> List[int]:
+            return sorted(Task.objects.filter(q).values_list('pk', flat=True))
+
+        cache = LRUCache(8)
+        names = ['important task №1', 'Important task №2', 'Important task №3']
+        or_data = {'or': [{'name': names[1]}, {'name': names[2]}]}
+        with patch('graphene_django_filter.filterset.filter_plan_cache', new=cache):
+            for data, changes, expected in (
+                ({'name': names[0]}, {}, []),
+                ({'name': names[0]}, {'lookup_expr': 'iexact'}, get_task_pks(
+                    models.Q(name__iexact=names[0]),
+                )),
+                ({'name': names[1]}, {'exclude': True}, get_task_pks(~models.Q(name=names[1]))),
+                (or_data, {}, get_task_pks(models.Q(name__in=names[1:]))),
+                (or_data, {'exclude': True}, get_task_pks(models.Q())),
+            ):
+                with self.subTest(data=data, changes=changes):
+                    filterset = ChangedTaskFilter(data=data, changes=changes)
+                    self.assertEqual(expected, sorted(task.pk for task in filterset.qs))
+                    self.assertEqual(not changes, filterset.filter_shape_hash is not None)
+        self.assertEqual((0, 2), (cache.hits, cache.misses))
+
+    def test_get_subquery_lookup(self) -> None:
+        """Test the `get_subquery_lookup` function."""
+        for model, lookup, expected in (
+            (
+                TaskGroup,
+                'tasks__name__contains',
+                SubqueryLookup('tasks', Task, 'taskgroup', 'pk', 'name__contains'),
+            ),
+            (
+                TaskGroup,
+                'tasks__in',
+                SubqueryLookup('tasks', Task, 'taskgroup', 'pk', 'pk__in'),
+            ),
+            (
+                Task,
+                'user__task__name__exact',
+                SubqueryLookup('user__task', Task, 'user', 'user__id', 'name__exact'),
+            ),
+            (Task, 'taskgroup__priority__gte', SubqueryLookup(
+                'taskgroup',
+                TaskGroup,
+                'tasks',
+                'pk',
+                'priority__gte',
+            )),
+            (TaskGroup, 'tasks__isnull', None),
+            (Task, 'user__email__exact', None),
+            (Task, 'name__exact', None),
+        ):
+            with self.subTest(model=model, lookup=lookup):
+                self.assertEqual(expected, get_subquery_lookup(model, lookup))
+
+    @patch.dict('graphene_django_filter.conf.DEFAULT_SETTINGS', {'EXISTS_SUBQUERIES': True})
+    def test_exists_subqueries(self) -> None:
+        """Test compiling lookups across to-many relations to `EXISTS` subqueries."""
+        task = Task.objects.filter(taskgroup__isnull=False).first()
+        other_task = Task.objects.exclude(user=task.user).filter(taskgroup__isnull=False).first()
+        for data, expected_q in (
+            (
+                {'tasks__name': task.name},
+                models.Q(tasks__name=task.name),
+            ),
+            (
+                {'tasks__name': task.name, 'tasks__user__email': other_task.user.email},
+                models.Q(tasks__name=task.name, tasks__user__email=other_task.user.email),
+            ),
+            (
+                {'not': {'tasks__name__contains': 'Important'}},
+                ~models.Q(tasks__name__contains='Important'),
+            ),
+            (
+                {'or': [{'tasks__name': task.name}, {'tasks__name': other_task.name}]},
+                models.Q(tasks__name__in=[task.name, other_task.name]),
+            ),
+        ):
+            with self.subTest(data=data):
+                filterset = TaskGroupFilter(data=data)
+                sql = str(filterset.qs.query)
+                self.assertIn('EXISTS', sql)
+                self.assertNotIn('JOIN', sql.split('EXISTS', 1)[0])
+                self.assertEqual(
+                    list(TaskGroup.objects.filter(expected_q).distinct().order_by('pk')),
+                    list(filterset.qs.order_by('pk')),
+                )
+
+    def test_quantifiers(self) -> None:
+        """Test filtering with quantifiers of to-many relations."""
+        name_data = {'tasks__name__contains': 'Important task №1'}
+        for form_free_validation in (False, True):
+            for data, expected in (
+                ({'tasks__some': name_data}, [7, 8, 9, 10]),
+                ({'tasks__every': name_data}, [9]),
+                ({'tasks__none': name_data}, [1, 2, 3, 4, 5, 6, 11, 12, 13, 14, 15]),
+                ({'tasks__every': {}}, list(range(1, 16))),
+                (
+                    {'tasks__every': {'tasks__user__email': User.objects.get(pk=3).email}},
+                    list(range(7, 16)),
+                ),
+                ({'priority__lte': 9, 'tasks__some': name_data}, [7, 8, 9]),
+                ({'tasks__some': {'tasks': [1, 6]}}, [1, 2]),
+                ({'not': {'tasks__some': name_data}}, [1, 2, 3, 4, 5, 6, 11, 12, 13, 14, 15]),
+            ):
+                with self.subTest(data=data, form_free_validation=form_free_validation), patch.dict(
+                    'graphene_django_filter.conf.DEFAULT_SETTINGS',
+                    {'FORM_FREE_VALIDATION': form_free_validation},
+                ):
+                    filterset = TaskGroupFilter(data=data)
+                    self.assertTrue(filterset.is_valid())
+                    self.assertEqual(
+                        expected,
+                        sorted(task_group.pk for task_group in filterset.qs),
+                    )
+                    self.assertNotIn('JOIN', str(filterset.qs.query).split('EXISTS', 1)[0])
+
+    def test_quantifier_errors(self) -> None:
+        """Test errors of quantifiers of to-many relations."""
+        for form_free_validation in (False, True):
+            with self.subTest(form_free_validation=form_free_validation), patch.dict(
+                'graphene_django_filter.conf.DEFAULT_SETTINGS',
+                {'FORM_FREE_VALIDATION': form_free_validation},
+            ):
+                filterset = TaskGroupFilter(data={'tasks__every': {'tasks': ['invalid']}})
+                self.assertFalse(filterset.is_valid())
+                self.assertEqual(['tasks__every'], list(filterset.errors))
+                self.assertIn('tasks', filterset.errors['tasks__every'])
+
+    @patch.dict('graphene_django_filter.conf.DEFAULT_SETTINGS', {'FORM_FREE_VALIDATION': True})
+    def test_deep_tree(self) -> None:
+        """Test filtering with trees deeper than the recursion limit."""
+        self.assertEqual(3, get_tree_depth(self.task_filter_tree))
+        data = {'name': 'Important task №1'}
+        for _ in range(sys.getrecursionlimit()):
+            data = {'not': {'not': data}}
+        self.assertEqual(['Important task №1'], [task.name for task in TaskFilter(data=data).qs])
+
+        def create_data(depth: int) -> dict:
+            data = {'name': 'Important task №1'}
+            for i in range(depth):
+                data = {'or' if i % 2 else 'and': [{'description': f'Description {i}'}, data]}
+            return data
+
+        self.assertEqual([], list(TaskFilter(data=create_data(99)).qs))
+        with self.assertRaisesMessage(ValidationError, 'exceeds the limit of 100'):
+            TaskFilter(data=create_data(sys.getrecursionlimit())).qs
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'MAX_FILTER_PLAN_DEPTH': 10},
+        ):
+            self.assertEqual([], list(TaskFilter(data=create_data(9)).qs))
+            with self.assertRaisesMessage(ValidationError, 'exceeds the limit of 10'):
+                TaskFilter(data=create_data(99)).qs
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'MAX_FILTER_PLAN_DEPTH': None},
+        ):
+            self.assertEqual([], list(TaskFilter(data=create_data(200)).qs))
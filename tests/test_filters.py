@@ -1,9 +1,10 @@
 """Tests for additional filters for special lookups."""
 
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
-from django.db import models
+from django.db import connection, models
 from django.db.models import functions
 from django.test import TestCase
 from django_filters import Filter
@@ -12,10 +13,12 @@ from graphene_django_filter.filters import (
     SearchQueryFilter,
     SearchRankFilter,
     TrigramFilter,
+    annotation_scope,
 )
 
 
 from .data_generation import generate_data
+from .filtersets import UserFilter
 from .models import User
 
 
@@ -34,6 +37,47 @@ class FiltersTests(TestCase):
         annotated_filter = AnnotatedFilter(field_name='id', lookup_expr='exact')
         self.assertEqual('id_annotated_0_0', annotated_filter.annotation_name)
 
+    def test_annotation_scope(self) -> None:
+        """Test naming annotations within an annotation scope."""
+        annotated_filter = AnnotatedFilter(field_name='id', lookup_expr='exact')
+        value = AnnotatedFilter.Value(annotation_value=models.F('id'), search_value=5)
+        with annotation_scope():
+            users = annotated_filter.filter(User.objects.all(), value)
+            users = annotated_filter.filter(users, value)
+        self.assertEqual(0, annotated_filter.filter_counter)
+        self.assertEqual(
+            ['id_annotated_0', 'id_annotated_1'],
+            list(users.query.annotations),
+        )
+        self.assertEqual([5], [user.id for user in users])
+
+    def test_concurrent_annotation_names(self) -> None:
+        """Test that concurrent searches give identical SQL."""
+        search_query = SearchQueryFilter.Value(
+            annotation_value=SearchVector('first_name'),
+            search_value=SearchQuery('Jane'),
+        )
+        trigram = TrigramFilter.Value(
+            annotation_value=TrigramSimilarity('first_name', 'Jane'),
+            search_value=0.5,
+        )
+        data = {
+            'search_query': search_query,
+            'or': [{'first_name__trigram__gt': trigram}, {'search_query': search_query}],
+        }
+
+        def get_sql(_: int) -> str:
+            try:
+                return str(UserFilter(data=data).qs.query)
+            finally:
+                connection.close()
+
+        expected_sql = str(UserFilter(data=data).qs.query)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            sql = set(executor.map(get_sql, range(200)))
+        self.assertEqual({expected_sql}, sql)
+        self.assertTrue(all(user.first_name == 'Jane' for user in UserFilter(data=data).qs))
+
     def test_annotated_filter(self) -> None:
         """Test the `filter` method of the `AnnotatedFilter` class."""
         annotated_filter = AnnotatedFilter(field_name='id', lookup_expr='exact')
@@ -63,21 +107,28 @@ class FiltersTests(TestCase):
         ).all()
         self.assertTrue(all('Jane' in user.first_name for user in users))
 
-    @patch.object(Filter, 'creation_counter', new=0)
     def test_search_rank_filter(self) -> None:
         """Test the `SearchQueryFilter` class."""
-        search_rank_filter = SearchRankFilter(field_name='first_name', lookup_expr='lte')
-        users = search_rank_filter.filter(
-            User.objects.all(),
-            SearchRankFilter.Value(
-                annotation_value=SearchRank(
-                    vector=SearchVector('first_name'),
-                    query=SearchQuery('Jane'),
-                ),
-                search_value=1,
+        value = SearchRankFilter.Value(
+            annotation_value=SearchRank(
+                vector=SearchVector('first_name'),
+                query=SearchQuery('Jane'),
             ),
-        ).all()
-        self.assertTrue(all(hasattr(user, 'first_name_search_rank_0_0') for user in users))
+            search_value=1,
+        )
+        for annotate_search_values in (False, True):
+            with self.subTest(annotate_search_values=annotate_search_values), patch.dict(
+                'graphene_django_filter.conf.DEFAULT_SETTINGS',
+                {'ANNOTATE_SEARCH_VALUES': annotate_search_values},
+            ):
+                search_rank_filter = SearchRankFilter(field_name='first_name', lookup_expr='lte')
+                annotation_name = search_rank_filter.annotation_name
+                users = list(search_rank_filter.filter(User.objects.all(), value))
+                self.assertTrue(len(users))
+                self.assertTrue(all(
+                    hasattr(user, annotation_name) == annotate_search_values
+                    for user in users
+                ))
 
     def test_trigram_filter(self) -> None:
         """Test the `TrigramFilter` class."""
@@ -9,7 +9,7 @@ from unittest.mock import MagicMock, patch
 from django.db import models
 from django.test import TestCase
 from django.utils.timezone import make_aware
-from django_filters import CharFilter
+from django_filters import CharFilter, ChoiceFilter, ModelChoiceFilter
 from graphene_django_filter.filters import SearchQueryFilter, SearchRankFilter, TrigramFilter
 from graphene_django_filter.filterset import (
     AdvancedFilterSet,
@@ -184,6 +184,69 @@ class AdvancedFilterSetTests(TestCase):
         self.assertIsInstance(form.or_forms[0], form_class)
         self.assertIsInstance(form.not_form, form_class)
 
+    def test_get_form_class_cache(self) -> None:
+        """Test reusing a tree form class created by the `get_form_class` method."""
+        self.assertIsNone(self.FullTextSearchFilterSet.meta_index.tree_form_class)
+        form_class = self.FullTextSearchFilterSet().get_form_class()
+        self.assertEqual(form_class, self.FullTextSearchFilterSet.meta_index.tree_form_class)
+        self.assertEqual(form_class, self.FullTextSearchFilterSet().get_form_class())
+
+    def test_get_form_class_changed_filters(self) -> None:
+        """Test creating tree form classes from filters changed by a filterset instance."""
+        class UserTaskFilter(TaskFilter):
+            user = ModelChoiceFilter(queryset=User.objects.all())
+
+            def __init__(self, *args, user_pk: int = 1, **kwargs) -> None:
+                super().__init__(*args, **kwargs)
+                self.filters['user'].queryset = User.objects.filter(pk=user_pk)
+
+        first_form_class = UserTaskFilter(user_pk=1).get_form_class()
+        second_form_class = UserTaskFilter(user_pk=2).get_form_class()
+        self.assertIsNone(UserTaskFilter.meta_index.tree_form_class)
+        self.assertEqual([1], [user.pk for user in first_form_class.base_fields['user'].queryset])
+        self.assertEqual([2], [user.pk for user in second_form_class.base_fields['user'].queryset])
+        form_class = TaskFilter().get_form_class()
+        self.assertIs(form_class, TaskFilter().get_form_class())
+        changed_filterset = TaskFilter()
+        changed_filterset.filters['name'].extra['max_length'] = 3
+        self.assertIsNot(form_class, changed_filterset.get_form_class())
+        self.assertEqual(3, changed_filterset.get_form_class().base_fields['name'].max_length)
+        self.assertIs(form_class, TaskFilter().get_form_class())
+
+    def test_get_form_class_callable_choices(self) -> None:
+        """Test creating tree form classes of filters with callable choices."""
+        def get_name_choices() -> List[tuple]:
+            return [(name, name) for name in Task.objects.values_list('name', flat=True)]
+
+        class ChoicesTaskFilter(TaskFilter):
+            name = ChoiceFilter(choices=get_name_choices)
+
+        self.assertFalse(ChoicesTaskFilter.meta_index.is_form_class_cacheable)
+        ChoicesTaskFilter().get_form_class()
+        self.assertIsNone(ChoicesTaskFilter.meta_index.tree_form_class)
+
+    def test_meta_index(self) -> None:
+        """Test the meta index built by the metaclass."""
+        meta_index = AdvancedFilterSetTests.FindFilterFilterSet.meta_index
+        self.assertEqual(
+            {
+                ('email', 'exact'): 'email',
+                ('first_name', 'iexact'): 'first_name__iexact',
+                ('last_name', 'contains'): 'in_last_name',
+            },
+            meta_index.filter_names_by_lookup,
+        )
+        self.assertEqual(
+            {'email': 0, 'first_name__iexact': 1, 'in_last_name': 2},
+            meta_index.filter_positions,
+        )
+        self.assertEqual((), meta_index.required_filter_names)
+        self.assertTrue(meta_index.is_form_class_cacheable)
+        self.assertIs(
+            self.FullTextSearchFilterSet.meta_index.full_text_search_fields,
+            self.FullTextSearchFilterSet.get_full_text_search_fields(),
+        )
+
     def test_tree_form_errors(self) -> None:
         """Test getting a tree form class errors."""
         form_class = TaskFilter().get_form_class()
@@ -17,7 +17,6 @@ from django.contrib.postgres.search import (
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.test import TestCase
-from graphene.types.inputobjecttype import InputObjectTypeContainer
 from graphene_django_filter.filters import (
     SearchQueryFilter,
     SearchRankFilter,
@@ -25,7 +24,7 @@ from graphene_django_filter.filters import (
 )
 from graphene_django_filter.filterset import AdvancedFilterSet
 from graphene_django_filter.input_data_factories import (
-    create_data,
+    FilterInputPath,
     create_search_config,
     create_search_query,
     create_search_query_data,
@@ -33,6 +32,7 @@ from graphene_django_filter.input_data_factories import (
     create_search_rank_weights,
     create_search_vector,
     create_trigram_data,
+    get_input_paths,
     tree_input_type_to_data,
     validate_search_query,
     validate_search_vector_fields,
@@ -50,6 +50,8 @@ from graphene_django_filter.input_types import (
     TrigramSearchKind,
 )
 
+from .filtersets import TaskFilter
+
 
 class InputDataFactoriesTests(TestCase):
     """Input data factories tests."""
@@ -339,7 +341,13 @@ class InputDataFactoriesTests(TestCase):
                     'lookups': FloatLookupsInputType._meta.container({'gt': 0.8, 'lt': 0.9}),
                     'value': 'value',
                 })
-                trigram_data = create_trigram_data(similarity_input_type, 'field__trigram')
+                trigram_data = create_trigram_data(
+                    similarity_input_type,
+                    FilterInputPath(
+                        'field__trigram',
+                        lookup_data_keys={'gt': 'field__trigram__gt', 'lt': 'field__trigram__lt'},
+                    ),
+                )
                 expected_trigram_data = {
                     'field__trigram__gt': TrigramFilter.Value(
                         annotation_value=trigram_class('field', 'value'),
@@ -363,7 +371,7 @@ class InputDataFactoriesTests(TestCase):
             create_sv_mock, sv_mock, create_sq_mock, sq_mock = mocks
             search_rank_data = create_search_rank_data(
                 self.search_rank_input_type,
-                'field',
+                FilterInputPath('field', lookup_data_keys={'gt': 'field__gt'}),
                 self.filterset_class_mock,
             )
             expected_search_rank = SearchRank(
@@ -379,10 +387,6 @@ class InputDataFactoriesTests(TestCase):
                         annotation_value=expected_search_rank,
                         search_value=0.8,
                     ),
-                    'field__lt': SearchRankFilter.Value(
-                        annotation_value=expected_search_rank,
-                        search_value=0.9,
-                    ),
                 }, search_rank_data,
             )
             create_sv_mock.assert_called_with(
@@ -402,7 +406,7 @@ class InputDataFactoriesTests(TestCase):
                     'vector': vector,
                     'query': query,
                 }),
-                'field',
+                FilterInputPath('field'),
                 self.filterset_class_mock,
             )
             self.assertEqual(
@@ -416,35 +420,30 @@ class InputDataFactoriesTests(TestCase):
             create_sv_mock.assert_called_once_with(vector, self.filterset_class_mock)
             create_sq_mock.assert_called_once_with(query)
 
-    def test_create_data(self) -> None:
-        """Test the `create_data` function."""
-        with patch(
-            'graphene_django_filter.input_data_factories.DATA_FACTORIES',
-            new={
-                'search_query': MagicMock(return_value=MagicMock()),
-                'search_rank': MagicMock(return_value=MagicMock()),
-                'trigram': MagicMock(return_value=MagicMock()),
-            },
-        ):
-            from graphene_django_filter.input_data_factories import DATA_FACTORIES
-            for factory_key, factory in DATA_FACTORIES.items():
-                value = MagicMock()
-                self.assertEqual(
-                    factory.return_value,
-                    create_data(factory_key, value, self.filterset_class_mock),
-                )
-                factory.assert_called_once_with(value, factory_key, self.filterset_class_mock)
-        with patch('graphene_django_filter.input_data_factories.tree_input_type_to_data') as mock:
-            key = 'field'
-            value = MagicMock(spec=InputObjectTypeContainer)
-            mock.return_value = {key: value}
-            self.assertEqual(mock.return_value, create_data(key, value, self.filterset_class_mock))
-        key = 'field'
-        value = MagicMock()
-        self.assertEqual({key: value}, create_data(key, value, self.filterset_class_mock))
-
     def test_tree_input_type_to_data(self) -> None:
         """Test the `tree_input_type_to_data` function."""
+        self.task_filterset_class_mock.meta_index.input_paths = {
+            ('name', 'exact'): FilterInputPath('name'),
+            ('name', 'trigram'): FilterInputPath(
+                'name__trigram',
+                data_factory=create_trigram_data,
+                lookup_data_keys={'gt': 'name__trigram__gt'},
+            ),
+            ('description', 'exact'): FilterInputPath('description'),
+            ('user', 'email', 'contains'): FilterInputPath('user__email__contains'),
+            ('user', 'first_name', 'exact'): FilterInputPath('user__first_name'),
+            ('completed_at', 'lt'): FilterInputPath('completed_at__lt'),
+            ('created_at', 'gt'): FilterInputPath('created_at__gt'),
+            ('search_query',): FilterInputPath(
+                'search_query',
+                data_factory=create_search_query_data,
+            ),
+            ('search_rank',): FilterInputPath(
+                'search_rank',
+                data_factory=create_search_rank_data,
+                lookup_data_keys={'gt': 'search_rank__gt'},
+            ),
+        }
         data = tree_input_type_to_data(self.task_filterset_class_mock, self.tree_input_type)
         expected_data = {
             'name': 'Important task',
@@ -476,3 +475,42 @@ class InputDataFactoriesTests(TestCase):
             ),
         }
         self.assertEqual(expected_data, data)
+
+    def test_tree_input_type_to_data_by_input_paths(self) -> None:
+        """Test that keys of the data do not depend on names of input fields."""
+        filterset_class_mock = MagicMock()
+        filterset_class_mock.meta_index.input_paths = {
+            ('exact_date', 'exact'): FilterInputPath('exact_date'),
+            ('tasks', 'some'): FilterInputPath('tasks__some', relation_path=('tasks',)),
+            ('tasks', 'trigram_name', 'exact'): FilterInputPath('tasks__trigram_name'),
+        }
+        self.assertEqual(
+            {
+                'exact_date': 'value',
+                'tasks__some': {'tasks__trigram_name': 'value'},
+                'or': [{'tasks__trigram_name': 'value'}],
+            },
+            tree_input_type_to_data(filterset_class_mock, {
+                'exact_date': {'exact': 'value'},
+                'tasks': {'some': {'trigram_name': {'exact': 'value'}}},
+                'or': [{'tasks': {'trigram_name': {'exact': 'value'}}}],
+            }),
+        )
+
+    def test_get_input_paths(self) -> None:
+        """Test creating input paths of a filterset class without input types."""
+        filterset_class = type('InputPathsTaskFilter', (TaskFilter,), {})
+        self.assertIsNone(filterset_class.meta_index.input_paths)
+        input_paths = get_input_paths(filterset_class)
+        self.assertIs(input_paths, filterset_class.meta_index.input_paths)
+        self.assertEqual(FilterInputPath('user__email'), input_paths[('user', 'email', 'exact')])
+        self.assertEqual(
+            {
+                'exact': 'name__trigram',
+                'gt': 'name__trigram__gt',
+                'gte': 'name__trigram__gte',
+                'lt': 'name__trigram__lt',
+                'lte': 'name__trigram__lte',
+            },
+            input_paths[('name', 'trigram')].lookup_data_keys,
+        )
@@ -0,0 +1,127 @@
+"""`input_type_registry` module tests."""
+
+import gc
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+from unittest.mock import Mock
+
+import graphene
+from django.test import TestCase
+from graphene_django_filter import AdvancedDjangoFilterConnectionField
+from graphene_django_filter.filter_arguments_factory import FilterArgumentsFactory
+from graphene_django_filter.input_type_registry import (
+    InputTypeRegistry,
+    default_input_type_registry,
+    get_input_type_registry,
+    input_type_registry_scope,
+)
+
+from .filtersets import TaskFilter
+from .object_types import TaskFilterFieldsType, TaskGroupFilterFieldsType
+
+
+def build_schema() -> Tuple[graphene.Schema, InputTypeRegistry]:
+    """Build a schema in a scope of a new registry."""
+    with input_type_registry_scope() as registry:
+        schema = graphene.Schema(query=type('Query', (graphene.ObjectType,), {
+            'tasks': AdvancedDjangoFilterConnectionField(
+                TaskFilterFieldsType,
+                filter_input_type_prefix='RegistryTask',
+            ),
+            'task_groups': AdvancedDjangoFilterConnectionField(
+                TaskGroupFilterFieldsType,
+                filter_input_type_prefix='RegistryTaskGroup',
+            ),
+        }))
+    return schema, registry
+
+
+class InputTypeRegistryTests(TestCase):
+    """The `InputTypeRegistry` class tests."""
+
+    def test_get_or_create(self) -> None:
+        """Test the `get_or_create` method."""
+        registry = InputTypeRegistry()
+        input_object_type = type('CustomInputObjectType', (graphene.InputObjectType,), {})
+        create = Mock(return_value=input_object_type)
+        self.assertIs(input_object_type, registry.get_or_create('CustomInputObjectType', create))
+        self.assertIs(input_object_type, registry.get_or_create('CustomInputObjectType', create))
+        create.assert_called_once_with()
+        self.assertIn('CustomInputObjectType', registry)
+        self.assertIs(input_object_type, registry['CustomInputObjectType'])
+        self.assertEqual(['CustomInputObjectType'], list(registry))
+        registry.clear()
+        self.assertEqual(0, len(registry))
+
+    def test_reserve_name(self) -> None:
+        """Test the `reserve_name` method."""
+        registry = InputTypeRegistry()
+        self.assertTrue(registry.reserve_name('CustomInputObjectType', ('exact',)))
+        self.assertTrue(registry.reserve_name('CustomInputObjectType', ('exact',)))
+        self.assertFalse(registry.reserve_name('CustomInputObjectType', ('contains',)))
+        registry.clear()
+        self.assertTrue(registry.reserve_name('CustomInputObjectType', ('contains',)))
+
+    def test_concurrent_get_or_create(self) -> None:
+        """Test creating an input type once in concurrent threads."""
+        registry = InputTypeRegistry()
+        number_of_calls = 0
+        lock = threading.Lock()
+
+        def create() -> type:
+            nonlocal number_of_calls
+            with lock:
+                number_of_calls += 1
+            time.sleep(0.05)
+            return type('CustomInputObjectType', (graphene.InputObjectType,), {})
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            input_object_types = list(executor.map(
+                lambda _: registry.get_or_create('CustomInputObjectType', create),
+                range(8),
+            ))
+        self.assertEqual(1, number_of_calls)
+        self.assertEqual(1, len(set(map(id, input_object_types))))
+
+    def test_input_type_registry_scope(self) -> None:
+        """Test the `input_type_registry_scope` function."""
+        self.assertIs(default_input_type_registry, get_input_type_registry())
+        registry = InputTypeRegistry()
+        with input_type_registry_scope(registry) as scope_registry:
+            self.assertIs(registry, scope_registry)
+            self.assertIs(registry, get_input_type_registry())
+            with input_type_registry_scope() as nested_registry:
+                self.assertIsNot(registry, nested_registry)
+                self.assertIs(nested_registry, get_input_type_registry())
+            self.assertIs(registry, get_input_type_registry())
+        self.assertIs(default_input_type_registry, get_input_type_registry())
+
+    def test_concurrent_schemas(self) -> None:
+        """Test building schemas with their own registries in concurrent threads."""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            (first_schema, first_registry), (second_schema, second_registry) = executor.map(
+                lambda _: build_schema(),
+                range(2),
+            )
+        self.assertEqual(str(first_schema), str(second_schema))
+        self.assertIn('RegistryTaskUserEmailFilterInputType', first_registry)
+        self.assertEqual(list(first_registry), list(second_registry))
+        self.assertIsNot(
+            first_registry['RegistryTaskFilterInputType'],
+            second_registry['RegistryTaskFilterInputType'],
+        )
+        self.assertNotIn('RegistryTaskFilterInputType', default_input_type_registry)
+
+    def test_discard(self) -> None:
+        """Test reclaiming a discarded registry with its input types."""
+        with input_type_registry_scope() as registry:
+            FilterArgumentsFactory(TaskFilter, 'DiscardedTask').arguments
+        registry_reference = weakref.ref(registry)
+        input_type_reference = weakref.ref(registry['DiscardedTaskFilterInputType'])
+        del registry
+        gc.collect()
+        self.assertIsNone(registry_reference())
+        self.assertIsNone(input_type_reference())
@@ -0,0 +1,277 @@
+"""`normalization` module tests."""
+
+import sys
+
+from django.db import models
+from django.test import TestCase
+from graphene_django_filter.filter_plans import FilterLeaf, FilterNode
+from graphene_django_filter.normalization import (
+    EMPTY_TREE,
+    NONE_TREE,
+    merge_constraints,
+    normalize_filter_tree,
+)
+
+from .data_generation import generate_data
+from .filtersets import TaskFilter, TaskGroupFilter
+from .models import Task, TaskGroup
+
+
+class NormalizationTests(TestCase):
+    """Filter tree normalization tests."""
+
+    exact_filter_fields = TaskFilter.meta_index.exact_filter_fields
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `NormalizationTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def normalize(self, tree: FilterNode) -> FilterNode:
+        """Return a normalized filter tree."""
+        return normalize_filter_tree(tree, self.exact_filter_fields)[0]
+
+    def test_exact_filter_fields(self) -> None:
+        """Test names of filters that can be merged into `in` lookups."""
+        self.assertEqual(
+            {
+                'name': 'name',
+                'description': 'description',
+                'user__email': 'user__email',
+                'user__last_name': 'user__last_name',
+            },
+            self.exact_filter_fields,
+        )
+
+    def test_flatten(self) -> None:
+        """Test flattening nested nodes and removing empty and single child nodes."""
+        name = FilterLeaf('name__contains', 'Important')
+        description = FilterLeaf('description__contains', 'important')
+        tree = FilterNode('and', (
+            FilterNode('and', (name, FilterNode('and', (description,)))),
+            FilterNode('or', ()),
+            FilterNode('not', (FilterNode('and', ()),)),
+        ))
+        normalized_tree = self.normalize(tree)
+        self.assertEqual('and', normalized_tree.operator)
+        self.assertCountEqual((name, description), normalized_tree.children)
+        self.assertEqual(EMPTY_TREE, self.normalize(FilterNode('and', (FilterNode('or', ()),))))
+
+    def test_deduplicate(self) -> None:
+        """Test removing identical branches."""
+        tree = FilterNode('or', (
+            FilterNode('and', (FilterLeaf('user__in', [1, 2]),)),
+            FilterLeaf('user__in', [1, 2]),
+            FilterLeaf('user__in', [3]),
+        ))
+        self.assertEqual(
+            FilterNode('or', (FilterLeaf('user__in', [1, 2]), FilterLeaf('user__in', [3]))),
+            self.normalize(tree),
+        )
+
+    def test_double_negation(self) -> None:
+        """Test cancelling double negations."""
+        leaf = FilterLeaf('name__contains', 'Important')
+        tree = FilterNode('not', (FilterNode('and', (FilterNode('not', (leaf,)),)),))
+        self.assertEqual(leaf, self.normalize(tree))
+        self.assertEqual(
+            FilterNode('not', (leaf,)),
+            self.normalize(FilterNode('not', (tree,))),
+        )
+
+    def test_merge_exact_filters(self) -> None:
+        """Test merging exact filters of the same field into `in` lookups."""
+        tree = FilterNode('or', (
+            FilterLeaf('name', 'Task №1'),
+            FilterLeaf('name', 'Task №2'),
+            FilterLeaf('name', ''),
+            FilterLeaf('description', 'Description'),
+            FilterNode('and', (FilterLeaf('name', 'Task №3'), FilterLeaf('user', 1))),
+        ))
+        normalized_tree = self.normalize(tree)
+        self.assertEqual('or', normalized_tree.operator)
+        self.assertCountEqual(
+            (
+                FilterLeaf('name__in', ['Task №1', 'Task №2'], 'name__in'),
+                FilterLeaf('name', ''),
+                FilterLeaf('description', 'Description'),
+                self.normalize(tree.children[-1]),
+            ),
+            normalized_tree.children,
+        )
+        and_tree = FilterNode('and', tree.children[:2])
+        self.assertEqual(and_tree, self.normalize(and_tree))
+
+    def test_canonical_hash(self) -> None:
+        """Test that hashes depend only on shapes of normalized trees."""
+        name = FilterLeaf('name__contains', 'Important')
+        description = FilterLeaf('description__contains', 'important')
+        tree, shape_hash = normalize_filter_tree(
+            FilterNode('or', (name, FilterNode('not', (description,)))),
+            self.exact_filter_fields,
+        )
+        other_tree, other_shape_hash = normalize_filter_tree(
+            FilterNode('or', (
+                FilterNode('not', (FilterLeaf('description__contains', 'other'),)),
+                FilterNode('or', (FilterLeaf('name__contains', 'other'),)),
+            )),
+            self.exact_filter_fields,
+        )
+        self.assertEqual(shape_hash, other_shape_hash)
+        self.assertEqual(
+            [type(child) for child in tree.children],
+            [type(child) for child in other_tree.children],
+        )
+        _, and_shape_hash = normalize_filter_tree(
+            FilterNode('and', (name, FilterNode('not', (description,)))),
+            self.exact_filter_fields,
+        )
+        self.assertNotEqual(shape_hash, and_shape_hash)
+
+    def test_deep_tree(self) -> None:
+        """Test normalizing a tree deeper than the recursion limit."""
+        leaf = FilterLeaf('name', 'Important')
+        tree = leaf
+        for _ in range(sys.getrecursionlimit()):
+            tree = FilterNode('not', (FilterNode('not', (tree,)),))
+        self.assertEqual(leaf, self.normalize(tree))
+
+    def test_filterset(self) -> None:
+        """Test that normalization does not change filtering results."""
+        names = ['Important task №1', 'Important task №2', 'Important task №3']
+        data = {
+            'or': [
+                {'name': names[0]},
+                {'name': names[1]},
+                {'or': [{'name': names[2]}]},
+                {'not': {'not': {'user__last_name': 'Stone'}}},
+                {},
+            ],
+        }
+        filterset = TaskFilter(data=data)
+        tasks = list(filterset.qs.order_by('pk'))
+        expected_tasks = Task.objects.filter(
+            models.Q(name__in=names) | models.Q(user__last_name='Stone'),
+        ).order_by('pk')
+        self.assertTrue(len(tasks))
+        self.assertEqual(list(expected_tasks), tasks)
+        self.assertEqual(
+            normalize_filter_tree(
+                FilterNode('or', (
+                    FilterLeaf('user__last_name', 'Stone'),
+                    FilterLeaf('name__in', names, 'name__in'),
+                )),
+                self.exact_filter_fields,
+            )[1],
+            filterset.filter_shape_hash,
+        )
+
+    def test_comparison_filters(self) -> None:
+        """Test names of filters that can be merged into one constraint."""
+        self.assertEqual(
+            {
+                'name': ('name', 'exact'),
+                'priority': ('priority', 'exact'),
+                'priority__gte': ('priority', 'gte'),
+                'priority__lte': ('priority', 'lte'),
+            },
+            TaskGroupFilter.meta_index.comparison_filters,
+        )
+
+    def test_merge_constraints(self) -> None:
+        """Test the `merge_constraints` function."""
+        for constraints, expected in (
+            ([('gte', 5), ('gt', 7), ('lt', 9)], [('gt', 7), ('lt', 9)]),
+            ([('gte', 5), ('lte', 9), ('lte', 10)], [('range', (5, 9))]),
+            ([('gte', 5), ('lte', 5)], [('exact', 5)]),
+            ([('gt', 5), ('lte', 5)], None),
+            ([('gte', 5), ('lte', 3)], None),
+            ([('in', [1, 5, 7, 5]), ('gt', 1), ('exact', 5)], [('exact', 5)]),
+            ([('in', [1, 5, 7]), ('lt', 6)], [('in', [1, 5])]),
+            ([('exact', 1), ('exact', 2)], None),
+            ([('range', (1, 5)), ('range', (3, 8))], [('range', (3, 5))]),
+        ):
+            with self.subTest(constraints=constraints):
+                self.assertEqual(expected, merge_constraints(constraints))
+
+    def test_merge_comparisons(self) -> None:
+        """Test merging comparisons of the same field in `and` nodes."""
+        exact_filter_fields = TaskGroupFilter.meta_index.exact_filter_fields
+        comparison_filters = TaskGroupFilter.meta_index.comparison_filters
+        name = FilterLeaf('name', 'Task group №1')
+        tree = FilterNode('and', (
+            FilterLeaf('priority__gte', 5),
+            FilterLeaf('priority__lte', 8),
+            FilterLeaf('priority__lte', 10),
+            name,
+        ))
+        normalized_tree = normalize_filter_tree(tree, exact_filter_fields, comparison_filters)[0]
+        self.assertCountEqual(
+            (FilterLeaf('priority__range', (5, 8), 'priority__range'), name),
+            normalized_tree.children,
+        )
+        none_tree = FilterNode('and', (
+            FilterLeaf('priority__gte', 5),
+            FilterLeaf('priority__lte', 3),
+        ))
+        for tree, expected in (
+            (none_tree, NONE_TREE),
+            (FilterNode('and', (name, none_tree)), NONE_TREE),
+            (FilterNode('or', (name, none_tree)), name),
+            (FilterNode('or', (none_tree, FilterNode('and', ()))), NONE_TREE),
+            (FilterNode('not', (none_tree,)), EMPTY_TREE),
+        ):
+            with self.subTest(tree=tree):
+                self.assertIs(
+                    expected,
+                    normalize_filter_tree(tree, exact_filter_fields, comparison_filters)[0],
+                )
+
+    def test_unsatisfiable_filterset(self) -> None:
+        """Test filtering with contradicting comparisons without querying the database."""
+        filterset = TaskGroupFilter(data={
+            'or': [
+                {'and': [{'priority__gte': 5}, {'priority__lte': 3}]},
+                {'priority': 7, 'priority__gte': 8},
+            ],
+        })
+        with self.assertNumQueries(0):
+            self.assertEqual(0, filterset.qs.count())
+            self.assertEqual([], list(filterset.qs))
+        filterset = TaskGroupFilter(data={'priority__gte': 5, 'priority__lte': 5})
+        self.assertEqual(
+            list(TaskGroup.objects.filter(priority=5)),
+            list(filterset.qs),
+        )
+
+    def test_quantifiers(self) -> None:
+        """Test normalizing quantifier nodes."""
+        name = FilterLeaf('tasks__name__contains', 'Important')
+        none_tree = FilterNode('and', (
+            FilterLeaf('priority__gte', 5),
+            FilterLeaf('priority__lte', 3),
+        ))
+        for tree, expected in (
+            (
+                FilterNode('some', (FilterNode('and', (name, name)),), 'tasks'),
+                FilterNode('some', (name,), 'tasks'),
+            ),
+            (FilterNode('every', (), 'tasks'), EMPTY_TREE),
+            (FilterNode('some', (), 'tasks'), FilterNode('some', (), 'tasks')),
+            (FilterNode('some', (name, none_tree), 'tasks'), NONE_TREE),
+            (FilterNode('none', (name, none_tree), 'tasks'), EMPTY_TREE),
+            (FilterNode('every', (name, none_tree), 'tasks'), FilterNode('none', (), 'tasks')),
+        ):
+            with self.subTest(tree=tree):
+                self.assertEqual(
+                    expected,
+                    normalize_filter_tree(
+                        tree,
+                        TaskGroupFilter.meta_index.exact_filter_fields,
+                        TaskGroupFilter.meta_index.comparison_filters,
+                    )[0],
+                )
+        some_hash = normalize_filter_tree(FilterNode('some', (name,), 'tasks'), {})[1]
+        every_hash = normalize_filter_tree(FilterNode('every', (name,), 'tasks'), {})[1]
+        self.assertNotEqual(some_hash, every_hash)
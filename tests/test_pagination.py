@@ -0,0 +1,223 @@
+"""`pagination` module tests."""
+
+from itertools import product
+from unittest.mock import patch
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.core.exceptions import ValidationError
+from django.db import connection, models
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from graphene_django_filter.pagination import (
+    KeysetPage,
+    count_queryset,
+    count_queryset_approximately,
+    create_keyset_q,
+    decode_keyset_cursor,
+    encode_keyset_cursor,
+    estimate_count,
+    get_keyset_fields,
+    get_keyset_page,
+    get_offset_slice,
+)
+from graphql_relay import (
+    connection_from_array_slice,
+    cursor_to_offset,
+    get_offset_with_default,
+    offset_to_cursor,
+)
+
+from .data_generation import generate_data
+from .models import Task
+
+
+class PaginationTests(TestCase):
+    """Keyset pagination tests."""
+
+    keyset_fields = get_keyset_fields(Task, ('-created_at', 'pk'))
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `PaginationTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def test_get_keyset_fields(self) -> None:
+        """Test the `get_keyset_fields` function."""
+        self.assertEqual(
+            ['-created_at', 'id'],
+            [keyset_field.order_by for keyset_field in self.keyset_fields],
+        )
+        with self.assertRaisesMessage(
+            AssertionError,
+            'The keyset ordering must contain a unique field',
+        ):
+            get_keyset_fields(Task, ('created_at',))
+        with self.assertRaisesMessage(
+            AssertionError,
+            'The keyset ordering must not contain nullable fields: completed_at',
+        ):
+            get_keyset_fields(Task, ('completed_at', 'pk'))
+
+    def test_keyset_cursor(self) -> None:
+        """Test encoding and decoding keyset cursors."""
+        task = Task.objects.get(pk=5)
+        cursor = encode_keyset_cursor(self.keyset_fields, task)
+        self.assertEqual(
+            [task.created_at, task.pk],
+            decode_keyset_cursor(self.keyset_fields, cursor),
+        )
+        for invalid_cursor in ('invalid', encode_keyset_cursor(self.keyset_fields[:1], task)):
+            with self.subTest(cursor=invalid_cursor), self.assertRaisesMessage(
+                ValidationError,
+                f'Invalid cursor: `{invalid_cursor}`',
+            ):
+                decode_keyset_cursor(self.keyset_fields, invalid_cursor)
+
+    def test_create_keyset_q(self) -> None:
+        """Test the `create_keyset_q` function."""
+        self.assertEqual(
+            models.Q(created_at__lt=1) | models.Q(created_at=1, id__gt=2),
+            create_keyset_q(self.keyset_fields, [1, 2], True),
+        )
+        self.assertEqual(
+            models.Q(created_at__gt=1) | models.Q(created_at=1, id__lt=2),
+            create_keyset_q(self.keyset_fields, [1, 2], False),
+        )
+
+    def test_get_keyset_page(self) -> None:
+        """Test the `get_keyset_page` function."""
+        queryset = Task.objects.all()
+        tasks = list(queryset.order_by('-created_at', 'id'))
+        after = encode_keyset_cursor(self.keyset_fields, tasks[9])
+        before = encode_keyset_cursor(self.keyset_fields, tasks[20])
+        for kwargs, expected in (
+            ({'first': 5}, KeysetPage(tasks[:5], False, True)),
+            ({'first': 5, 'after': after}, KeysetPage(tasks[10:15], False, True)),
+            ({'last': 5, 'before': before}, KeysetPage(tasks[15:20], True, False)),
+            ({'after': after, 'before': before}, KeysetPage(tasks[10:20], False, False)),
+            ({'first': 8, 'last': 3, 'after': after}, KeysetPage(tasks[15:18], True, True)),
+            ({'last': 100}, KeysetPage(tasks, False, False)),
+        ):
+            with self.subTest(kwargs=kwargs), self.assertNumQueries(1):
+                self.assertEqual(expected, get_keyset_page(queryset, self.keyset_fields, **kwargs))
+        self.assertEqual(
+            KeysetPage(tasks[:5], False, True),
+            get_keyset_page(queryset.order_by('-created_at', 'id'), self.keyset_fields, first=5),
+        )
+        with self.assertRaisesMessage(
+            ValidationError,
+            'The ordering `name` conflicts with the keyset ordering `-created_at, id`',
+        ):
+            get_keyset_page(queryset.order_by('name'), self.keyset_fields, first=5)
+
+    def test_get_offset_slice(self) -> None:
+        """Test that offset slices give the same pages as slicing counted querysets."""
+        queryset = Task.objects.order_by('pk')
+        tasks = list(queryset)
+        cursors = (None, offset_to_cursor(9), offset_to_cursor(70), offset_to_cursor(100))
+        for after, before, first, last in product(cursors, cursors, (None, 0, 5), (None, 3)):
+            if after and before and cursor_to_offset(after) >= cursor_to_offset(before):
+                continue
+            args = {'after': after, 'before': before, 'first': first, 'last': last}
+            slice_start = min(get_offset_with_default(after, -1) + 1, len(tasks))
+            expected = connection_from_array_slice(
+                tasks[slice_start:],
+                args,
+                slice_start=slice_start,
+                array_length=len(tasks),
+                array_slice_length=len(tasks) - slice_start,
+            )
+            for is_count_needed, is_window_count in product((False, True), (False, True)):
+                with self.subTest(
+                    args=args,
+                    is_count_needed=is_count_needed,
+                    is_window_count=is_window_count,
+                ):
+                    offset_slice = get_offset_slice(
+                        queryset,
+                        is_count_needed=is_count_needed,
+                        is_window_count=is_window_count,
+                        **args,
+                    )
+                    if is_count_needed:
+                        self.assertEqual(len(tasks), offset_slice.length)
+                    elif first is not None and after != cursors[-1]:
+                        self.assertIsNone(offset_slice.length)
+                    self.assertEqual(
+                        expected,
+                        connection_from_array_slice(
+                            offset_slice.nodes,
+                            args,
+                            slice_start=offset_slice.slice_start,
+                            array_length=offset_slice.array_length,
+                            array_slice_length=offset_slice.array_length - offset_slice.slice_start,
+                        ),
+                    )
+
+    def test_window_count(self) -> None:
+        """Test fetching the count with rows of a page."""
+        queryset = Task.objects.filter(name__startswith='Important task').order_by('pk')
+        with self.assertNumQueries(1):
+            offset_slice = get_offset_slice(
+                queryset,
+                after=offset_to_cursor(9),
+                first=5,
+                is_window_count=True,
+            )
+        self.assertEqual(45, offset_slice.length)
+        self.assertEqual(list(queryset[10:16]), offset_slice.nodes)
+        for kwargs, number_of_queries in (
+            ({'after': offset_to_cursor(50), 'first': 5}, 2),
+            ({'last': 5}, 1),
+        ):
+            with self.subTest(kwargs=kwargs):
+                with self.assertNumQueries(number_of_queries):
+                    offset_slice = get_offset_slice(queryset, is_window_count=True, **kwargs)
+                self.assertEqual(45, offset_slice.length)
+        with CaptureQueriesContext(connection) as context:
+            get_offset_slice(queryset.distinct(), first=5, is_window_count=True)
+        self.assertEqual(1, len(context.captured_queries))
+        self.assertNotIn('OVER', context.captured_queries[0]['sql'])
+
+    def test_count_queryset(self) -> None:
+        """Test counting querysets without ordering and selected annotations."""
+        queryset = Task.objects.annotate(
+            rank=SearchRank(SearchVector('name'), SearchQuery('Important')),
+        ).filter(name__startswith='Important task', rank__gt=0).select_related('user').order_by(
+            '-rank',
+        )
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(45, count_queryset(queryset))
+        sql = context.captured_queries[0]['sql']
+        self.assertNotIn('ORDER BY', sql)
+        self.assertNotIn('JOIN', sql)
+        self.assertEqual(1, sql.count('ts_rank'))
+        self.assertEqual(45, count_queryset(queryset.distinct()))
+        self.assertEqual(5, count_queryset(queryset[:5]))
+
+    def test_estimate_count(self) -> None:
+        """Test estimating the number of rows of querysets."""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE tests_task')
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(75, estimate_count(Task.objects.order_by('pk')))
+        self.assertIn('reltuples', context.captured_queries[0]['sql'])
+        with CaptureQueriesContext(connection) as context:
+            self.assertGreater(estimate_count(Task.objects.filter(user=3)), 0)
+        self.assertIn('EXPLAIN', context.captured_queries[0]['sql'])
+
+    def test_count_queryset_approximately(self) -> None:
+        """Test the `count_queryset_approximately` function."""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE tests_task')
+        queryset = Task.objects.filter(user=3)
+        self.assertEqual((45, True), count_queryset_approximately(queryset))
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'APPROXIMATE_COUNT_THRESHOLD': 0},
+        ):
+            self.assertEqual(
+                (estimate_count(queryset), False),
+                count_queryset_approximately(queryset),
+            )
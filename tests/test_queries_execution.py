@@ -1,14 +1,19 @@
 """Queries execution tests."""
 
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Tuple
+from unittest.mock import patch
 
+from django.db import connection
+from django.db.models import Q
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import make_aware
 from graphql.execution import ExecutionResult
 from graphql_relay import from_global_id
 
 from .data_generation import generate_data
+from .models import Task
 from .schema import schema
 
 
@@ -288,3 +293,194 @@ class FullTextSearchTests(QueriesExecutionTests):
         expected = list(range(31, 76))
         self.assert_query_execution(expected, self.trigram_fields_query, 'usersFields')
         self.assert_query_execution(expected, self.trigram_filterset_query, 'usersFilterset')
+
+
+class QuantifiersTests(QueriesExecutionTests):
+    """Tests for executing queries with quantifiers of to-many relations."""
+
+    task_groups_query = """
+        {
+            %s(
+                filter: {
+                    tasks: {
+                        %s: {
+                            name: {contains: "Important task №1"}
+                        }
+                    }
+                }
+            ) {
+                edges {
+                    node {
+                        id
+                    }
+                }
+            }
+        }
+    """
+
+    def test_task_groups_execution(self) -> None:
+        """Test the schema execution by querying task groups with quantifiers."""
+        for quantifier, expected in (
+            ('some', [7, 8, 9, 10]),
+            ('every', [9]),
+            ('none', [1, 2, 3, 4, 5, 6, 11, 12, 13, 14, 15]),
+        ):
+            for key in ('taskGroupsFields', 'taskGroupsFilterset'):
+                with self.subTest(quantifier=quantifier, key=key):
+                    self.assert_query_execution(
+                        expected,
+                        self.task_groups_query % (key, quantifier),
+                        key,
+                    )
+
+    def test_nested_quantifiers(self) -> None:
+        """Test that the schema does not accept quantifiers of quantifier operands."""
+        query = self.task_groups_query.replace(
+            'name: {contains: "Important task №1"}',
+            'some: {name: {contains: "Important task №1"}}',
+        )
+        for key in ('taskGroupsFields', 'taskGroupsFilterset'):
+            with self.subTest(key=key):
+                execution_result = schema.execute(query % (key, 'some'))
+                self.assertIsNone(execution_result.data)
+                self.assertIn("Field 'some' is not defined", execution_result.errors[0].message)
+
+
+class KeysetPaginationTests(QueriesExecutionTests):
+    """Tests for executing queries with the keyset pagination."""
+
+    tasks_query = """
+        {
+            tasksKeyset(
+                filter: {
+                    or: [{name: {contains: "Important"}}, {description: {contains: "important"}}]
+                }
+                %s
+            ) {
+                edges {
+                    cursor
+                    node {
+                        id
+                    }
+                }
+                pageInfo {
+                    hasPreviousPage
+                    hasNextPage
+                }
+            }
+        }
+    """
+
+    def get_page(self, arguments: str) -> Tuple[List[int], List[str], Dict[str, bool]]:
+        """Return identifiers, cursors and page info of a page."""
+        execution_result = schema.execute(self.tasks_query % arguments)
+        self.assertIsNone(execution_result.errors)
+        connection = execution_result.data['tasksKeyset']
+        return (
+            [int(from_global_id(edge['node']['id'])[1]) for edge in connection['edges']],
+            [edge['cursor'] for edge in connection['edges']],
+            connection['pageInfo'],
+        )
+
+    def test_forward_pagination(self) -> None:
+        """Test paginating forward with the `first` and `after` arguments."""
+        expected = list(
+            Task.objects.filter(
+                Q(name__contains='Important') | Q(description__contains='important'),
+            ).order_by('-created_at', 'id').values_list('id', flat=True),
+        )
+        ids: List[int] = []
+        arguments = 'first: 7'
+        while True:
+            page_ids, cursors, page_info = self.get_page(arguments)
+            ids.extend(page_ids)
+            if not page_info['hasNextPage']:
+                break
+            arguments = f'first: 7, after: "{cursors[-1]}"'
+        self.assertEqual(expected, ids)
+
+    def test_backward_pagination(self) -> None:
+        """Test paginating backward with the `last` and `before` arguments."""
+        ids, cursors, page_info = self.get_page('first: 20')
+        page_ids, _, page_info = self.get_page(f'last: 5, before: "{cursors[-1]}"')
+        self.assertEqual(ids[-6:-1], page_ids)
+        self.assertEqual({'hasPreviousPage': True, 'hasNextPage': False}, page_info)
+        page_ids, _, page_info = self.get_page(f'last: 5, before: "{cursors[3]}"')
+        self.assertEqual(ids[:3], page_ids)
+        self.assertFalse(page_info['hasPreviousPage'])
+
+    def test_invalid_arguments(self) -> None:
+        """Test executing queries with invalid cursors and the `offset` argument."""
+        for arguments, message in (
+            ('first: 5, after: "invalid"', 'Invalid cursor: `invalid`'),
+            ('first: 5, offset: 5', 'Use cursors instead of the `offset` value'),
+        ):
+            with self.subTest(arguments=arguments):
+                execution_result = schema.execute(self.tasks_query % arguments)
+                self.assertIn(message, execution_result.errors[0].message)
+
+
+class CountTests(QueriesExecutionTests):
+    """Tests for counting querysets of connections."""
+
+    tasks_query = """
+        {
+            %s(filter: {name: {contains: "Important task"}}, first: 5) {
+                %s
+                edges {
+                    node {
+                        id
+                    }
+                }
+                pageInfo {
+                    hasNextPage
+                }
+            }
+        }
+    """
+
+    def test_count(self) -> None:
+        """Test counting querysets only if the count is selected."""
+        for key in ('tasksFields', 'tasksKeyset'):
+            with self.subTest(key=key):
+                with CaptureQueriesContext(connection) as context:
+                    execution_result = schema.execute(self.tasks_query % (key, ''))
+                self.assertEqual(1, len(context.captured_queries))
+                self.assertTrue(execution_result.data[key]['pageInfo']['hasNextPage'])
+                self.assertEqual(5, len(execution_result.data[key]['edges']))
+                with CaptureQueriesContext(connection) as context:
+                    execution_result = schema.execute(self.tasks_query % (key, 'totalCount'))
+                self.assertEqual(2, len(context.captured_queries))
+                self.assertEqual(45, execution_result.data[key]['totalCount'])
+                count_sql = next(
+                    query['sql'] for query in context.captured_queries if 'COUNT' in query['sql']
+                )
+                self.assertNotIn('ORDER BY', count_sql)
+
+    def test_window_count(self) -> None:
+        """Test fetching the count and the page in one query."""
+        with CaptureQueriesContext(connection) as context:
+            execution_result = schema.execute(
+                self.tasks_query % ('tasksWindowCount', 'totalCount'),
+            )
+        self.assertEqual(1, len(context.captured_queries))
+        self.assertIn('COUNT(*) OVER ()', context.captured_queries[0]['sql'])
+        self.assertEqual(45, execution_result.data['tasksWindowCount']['totalCount'])
+        self.assertEqual(5, len(execution_result.data['tasksWindowCount']['edges']))
+
+    def test_approximate_count(self) -> None:
+        """Test estimating the count of large querysets."""
+        query = self.tasks_query % ('tasksApproximateCount', 'totalCount isTotalCountExact')
+        execution_result = schema.execute(query)
+        self.assertEqual(45, execution_result.data['tasksApproximateCount']['totalCount'])
+        self.assertTrue(execution_result.data['tasksApproximateCount']['isTotalCountExact'])
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'APPROXIMATE_COUNT_THRESHOLD': 0},
+        ), CaptureQueriesContext(connection) as context:
+            execution_result = schema.execute(query)
+        self.assertFalse(execution_result.data['tasksApproximateCount']['isTotalCountExact'])
+        self.assertTrue(any('EXPLAIN' in query['sql'] for query in context.captured_queries))
+        self.assertFalse(any('COUNT' in query['sql'] for query in context.captured_queries))
+        execution_result = schema.execute(self.tasks_query % ('tasksFields', 'isTotalCountExact'))
+        self.assertTrue(execution_result.data['tasksFields']['isTotalCountExact'])
@@ -0,0 +1,103 @@
+"""`query_costs` module tests."""
+
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from graphene_django_filter.query_costs import (
+    QueryCost,
+    explain_queryset,
+    query_cost_cache,
+    validate_query_cost,
+)
+
+from .data_generation import generate_data
+from .filtersets import TaskFilter, TaskGroupFilter
+from .models import Task
+from .schema import schema
+
+
+class QueryCostsTests(TestCase):
+    """Query cost guard tests."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `QueryCostsTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def setUp(self) -> None:
+        """Clear the query cost cache."""
+        query_cost_cache.clear()
+
+    def test_explain_queryset(self) -> None:
+        """Test the `explain_queryset` function."""
+        query_cost = explain_queryset(Task.objects.filter(name__contains='Important'))
+        self.assertIsInstance(query_cost, QueryCost)
+        self.assertGreater(query_cost.total_cost, 0)
+        self.assertGreaterEqual(query_cost.rows, 0)
+
+    def test_validate_query_cost(self) -> None:
+        """Test the `validate_query_cost` function."""
+        filterset = TaskFilter(data={'name__contains': 'Important'})
+        with self.assertNumQueries(0):
+            self.assertIsNone(validate_query_cost(filterset, filterset.qs))
+        with patch.dict('graphene_django_filter.conf.DEFAULT_SETTINGS', {'MAX_QUERY_COST': 0}):
+            with self.assertNumQueries(1), self.assertRaisesMessage(
+                ValidationError,
+                'The estimated query cost',
+            ):
+                validate_query_cost(filterset, filterset.qs)
+            other_filterset = TaskFilter(data={'name__contains': 'Other'})
+            with self.assertNumQueries(0), self.assertRaises(ValidationError):
+                validate_query_cost(other_filterset, other_filterset.qs)
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'MAX_QUERY_ROWS': 0},
+        ), self.assertNumQueries(0), self.assertRaisesMessage(
+            ValidationError,
+            'The estimated number of rows',
+        ):
+            validate_query_cost(filterset, filterset.qs)
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'MAX_QUERY_COST': 10 ** 9, 'MAX_QUERY_ROWS': 10 ** 9},
+        ):
+            self.assertIsInstance(validate_query_cost(filterset, filterset.qs), QueryCost)
+        self.assertEqual(1, query_cost_cache.info().misses)
+
+    def test_scoped_querysets(self) -> None:
+        """Test caching query costs of differently scoped querysets with the same filter shape."""
+        data = {'name__contains': 'Important'}
+        filtersets = (
+            TaskFilter(data=data, queryset=Task.objects.all()),
+            TaskFilter(data=data, queryset=Task.objects.filter(pk__lte=10)),
+            TaskFilter(data=data, queryset=Task.objects.filter(pk__lte=20)),
+        )
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'MAX_QUERY_ROWS': 10 ** 9},
+        ):
+            query_costs = [
+                validate_query_cost(filterset, filterset.qs) for filterset in filtersets
+            ]
+        self.assertEqual(explain_queryset(filtersets[1].qs), query_costs[1])
+        self.assertNotEqual(query_costs[0], query_costs[1])
+        self.assertEqual((1, 2), query_cost_cache.info()[:2])
+
+    def test_unsatisfiable_filter(self) -> None:
+        """Test that unsatisfiable filters are not explained."""
+        filterset = TaskGroupFilter(data={'priority__gte': 5, 'priority__lte': 3})
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'MAX_QUERY_COST': 0},
+        ), self.assertNumQueries(0):
+            self.assertIsNone(validate_query_cost(filterset, filterset.qs))
+
+    def test_schema_execution(self) -> None:
+        """Test rejecting an expensive query in the schema execution."""
+        query = '{ tasksFields(filter: {name: {contains: "Important"}}) { edges { node { id } } } }'
+        with patch.dict('graphene_django_filter.conf.DEFAULT_SETTINGS', {'MAX_QUERY_COST': 0}):
+            execution_result = schema.execute(query)
+        self.assertIsNone(execution_result.data['tasksFields'])
+        self.assertIn('The estimated query cost', execution_result.errors[0].message)
@@ -0,0 +1,102 @@
+"""`request_memo` module tests."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import TestCase
+from graphene_django_filter.input_data_factories import tree_input_type_to_data
+from graphene_django_filter.request_memo import (
+    REQUEST_MEMO_KEY,
+    get_filter_input_hash,
+    get_request_memo,
+    get_request_memo_key,
+)
+from graphql import OperationType
+
+from .data_generation import generate_data
+from .filtersets import TaskFilter
+from .models import Task
+from .schema import schema
+
+
+class RequestMemoTests(TestCase):
+    """Request memo tests."""
+
+    query = """
+        {
+            first: tasksFields(filter: {name: {contains: "Important task"}}, first: 5) {
+                edges { node { id } }
+            }
+            second: tasksFields(filter: {name: {contains: "Important task"}}, last: 5) {
+                edges { node { id } }
+            }
+            other: tasksFields(filter: {name: {contains: "task"}}, first: 5) {
+                edges { node { id } }
+            }
+        }
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `RequestMemoTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def test_get_filter_input_hash(self) -> None:
+        """Test the `get_filter_input_hash` function."""
+        self.assertEqual(
+            get_filter_input_hash({'name': {'exact': 'a'}, 'or': [{'id': {'exact': 1}}]}),
+            get_filter_input_hash({'or': [{'id': {'exact': 1}}], 'name': {'exact': 'a'}}),
+        )
+        self.assertNotEqual(
+            get_filter_input_hash({'name': {'exact': 'a'}}),
+            get_filter_input_hash({'name': {'exact': 'b'}}),
+        )
+
+    def test_get_request_memo(self) -> None:
+        """Test the `get_request_memo` function."""
+        query_operation = SimpleNamespace(operation=OperationType.QUERY)
+        context = SimpleNamespace()
+        memo = get_request_memo(SimpleNamespace(operation=query_operation, context=context))
+        self.assertEqual({}, memo)
+        self.assertIs(memo, getattr(context, REQUEST_MEMO_KEY))
+        context = {}
+        memo = get_request_memo(SimpleNamespace(operation=query_operation, context=context))
+        self.assertIs(memo, context[REQUEST_MEMO_KEY])
+        self.assertIsNone(
+            get_request_memo(SimpleNamespace(operation=query_operation, context=None)),
+        )
+        self.assertIsNone(get_request_memo(SimpleNamespace(
+            operation=SimpleNamespace(operation=OperationType.MUTATION),
+            context=context,
+        )))
+
+    def test_get_request_memo_key(self) -> None:
+        """Test the `get_request_memo_key` function."""
+        filter_input = {'name': {'exact': 'a'}}
+        self.assertEqual(
+            get_request_memo_key(TaskFilter, filter_input, Task.objects.all()),
+            get_request_memo_key(TaskFilter, filter_input, Task.objects.all()),
+        )
+        self.assertNotEqual(
+            get_request_memo_key(TaskFilter, filter_input, Task.objects.all()),
+            get_request_memo_key(TaskFilter, filter_input, Task.objects.filter(user=1)),
+        )
+        self.assertIsNone(get_request_memo_key(TaskFilter, filter_input, Task.objects.none()))
+
+    def test_schema_execution(self) -> None:
+        """Test validating the same filter once in a request."""
+        for context, number_of_conversions in ((None, 3), (SimpleNamespace(), 2)):
+            with self.subTest(context=context), patch(
+                'graphene_django_filter.connection_field.tree_input_type_to_data',
+                wraps=tree_input_type_to_data,
+            ) as tree_input_type_to_data_mock:
+                execution_result = schema.execute(self.query, context_value=context)
+                self.assertIsNone(execution_result.errors)
+                self.assertEqual(number_of_conversions, tree_input_type_to_data_mock.call_count)
+                self.assertEqual(5, len(execution_result.data['first']['edges']))
+                self.assertEqual(5, len(execution_result.data['second']['edges']))
+                self.assertNotEqual(
+                    execution_result.data['first']['edges'],
+                    execution_result.data['second']['edges'],
+                )
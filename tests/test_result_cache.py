@@ -0,0 +1,143 @@
+"""`result_cache` module tests."""
+
+import tempfile
+from typing import List
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from graphene_django_filter.result_cache import get_path_models
+
+from .data_generation import generate_data
+from .filtersets import TaskFilter, TaskGroupFilter
+from .models import Task, TaskGroup, User
+
+
+def get_pks(queryset: QuerySet) -> List[int]:
+    """Return sorted primary keys of objects of a queryset."""
+    return sorted(obj.pk for obj in queryset)
+
+
+def get_user_task_group_pks() -> List[int]:
+    """Return sorted primary keys of task groups with tasks of the first user."""
+    return get_pks(TaskGroup.objects.filter(tasks__user_id=1).distinct())
+
+
+class ResultCacheTests(TestCase):
+    """Result cache tests."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `ResultCacheTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def setUp(self) -> None:
+        """Clear the default cache."""
+        caches['default'].clear()
+
+    def test_get_path_models(self) -> None:
+        """Test the `get_path_models` function."""
+        self.assertEqual([Task], get_path_models(Task, 'name'))
+        self.assertEqual([Task, User], get_path_models(Task, 'user__email'))
+        self.assertEqual(
+            [TaskGroup, Task, User],
+            get_path_models(TaskGroup, 'tasks__user__email'),
+        )
+
+    def test_result_models(self) -> None:
+        """Test models of the meta index."""
+        self.assertEqual((Task, User), TaskFilter.meta_index.result_models)
+        self.assertEqual((Task, TaskGroup, User), TaskGroupFilter.meta_index.result_models)
+
+    def test_disabled(self) -> None:
+        """Test that querysets are not cached by default."""
+        data = {'description': 'This task is very important'}
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertEqual(15, len(TaskFilter(data=data).qs))
+
+    def test_cache_result(self) -> None:
+        """Test serving repeated requests by cached primary keys."""
+        data = {'description': 'This task is very important'}
+        expected = list(Task.objects.filter(description='This task is very important'))
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'RESULT_CACHE': 'default'},
+        ):
+            with self.assertNumQueries(2):
+                self.assertEqual(expected, list(TaskFilter(data=data).qs))
+            with self.assertNumQueries(1):
+                qs = TaskFilter(data=data).qs
+                self.assertEqual(expected, list(qs))
+            self.assertNotIn('LIKE', str(qs.query))
+            other_expected = list(Task.objects.filter(name='Important task №1'))
+            with self.assertNumQueries(2):
+                self.assertEqual(
+                    other_expected,
+                    list(TaskFilter(data={'name': 'Important task №1'}).qs),
+                )
+
+    def test_invalidation(self) -> None:
+        """Test invalidating cached primary keys by changes of models of filter paths."""
+        data = {'tasks__user__email': 'user@mail.ru'}
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'RESULT_CACHE': 'default'},
+        ):
+            self.assertEqual([], list(TaskGroupFilter(data=data).qs))
+            User.objects.filter(pk=1).update(email='user@mail.ru')
+            with self.assertNumQueries(0):
+                self.assertEqual([], list(TaskGroupFilter(data=data).qs))
+            User.objects.get(pk=1).save()
+            expected = get_user_task_group_pks()
+            with self.assertNumQueries(2):
+                self.assertEqual(expected, get_pks(TaskGroupFilter(data=data).qs))
+            TaskGroup.objects.exclude(tasks__user_id=1).first().tasks.add(Task.objects.get(pk=1))
+            expected = get_user_task_group_pks()
+            with self.assertNumQueries(2):
+                self.assertEqual(expected, get_pks(TaskGroupFilter(data=data).qs))
+            Task.objects.filter(pk=20).update(user_id=1)
+            with self.assertNumQueries(1):
+                list(TaskGroupFilter(data=data).qs)
+            Task.objects.get(pk=20).save()
+            expected = get_user_task_group_pks()
+            with self.assertNumQueries(2):
+                self.assertEqual(expected, get_pks(TaskGroupFilter(data=data).qs))
+            with self.assertNumQueries(1):
+                self.assertEqual(expected, get_pks(TaskGroupFilter(data=data).qs))
+
+    def test_max_rows(self) -> None:
+        """Test that querysets with many rows are marked as uncacheable."""
+        data = {'name__contains': 'Important task'}
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'RESULT_CACHE': 'default', 'RESULT_CACHE_MAX_ROWS': 10},
+        ):
+            with self.assertNumQueries(2):
+                self.assertEqual(45, len(TaskFilter(data=data).qs))
+            for _ in range(2):
+                with self.assertNumQueries(1):
+                    self.assertEqual(45, len(TaskFilter(data=data).qs))
+            Task.objects.get(pk=31).delete()
+            with self.assertNumQueries(2):
+                self.assertEqual(44, len(TaskFilter(data=data).qs))
+
+    def test_file_based_cache(self) -> None:
+        """Test the result cache with the file-based cache."""
+        data = {'description': 'This task is very important'}
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'files': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            },
+        }), patch.dict('graphene_django_filter.conf.DEFAULT_SETTINGS', {'RESULT_CACHE': 'files'}):
+            with self.assertNumQueries(2):
+                self.assertEqual(15, len(TaskFilter(data=data).qs))
+            with self.assertNumQueries(1):
+                self.assertEqual(15, len(TaskFilter(data=data).qs))
+            Task.objects.get(pk=16).delete()
+            with self.assertNumQueries(2):
+                self.assertEqual(14, len(TaskFilter(data=data).qs))
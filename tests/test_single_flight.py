@@ -0,0 +1,187 @@
+"""`single_flight` module tests."""
+
+import asyncio
+import threading
+import time
+from typing import Any, List
+from unittest.mock import MagicMock, patch
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from graphene_django_filter import AdvancedDjangoFilterConnectionField
+from graphene_django_filter.single_flight import SingleFlight, get_single_flight_key
+
+from .data_generation import generate_data
+from .models import Task
+from .schema import schema
+
+
+class SingleFlightTests(TestCase):
+    """The `SingleFlight` class tests."""
+
+    def test_do(self) -> None:
+        """Test coalescing calls of threads."""
+        single_flight = SingleFlight()
+        release = threading.Event()
+        func = MagicMock(side_effect=lambda: release.wait() and 'value')
+        results: List[Any] = []
+
+        def call() -> None:
+            results.append(single_flight.do('key', func))
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        threads[0].start()
+        while not len(single_flight):
+            time.sleep(0.001)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+        func.assert_called_once_with()
+        self.assertEqual(['value'] * 5, results)
+        self.assertEqual(0, len(single_flight))
+        self.assertEqual('other', single_flight.do('key', lambda: 'other'))
+
+    def test_do_exception(self) -> None:
+        """Test sharing an exception of a call between threads."""
+        single_flight = SingleFlight()
+        release = threading.Event()
+        exceptions: List[BaseException] = []
+
+        def func() -> None:
+            release.wait()
+            raise ValueError('error')
+
+        def call() -> None:
+            try:
+                single_flight.do('key', func)
+            except ValueError as exception:
+                exceptions.append(exception)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        threads[0].start()
+        while not len(single_flight):
+            time.sleep(0.001)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(3, len(exceptions))
+        self.assertEqual(1, len({id(exception) for exception in exceptions}))
+
+    def test_do_async(self) -> None:
+        """Test coalescing calls of tasks of an event loop."""
+        single_flight = SingleFlight()
+        calls: List[str] = []
+
+        async def func() -> str:
+            calls.append('key')
+            await asyncio.sleep(0.01)
+            return 'value'
+
+        async def gather() -> List[str]:
+            return await asyncio.gather(*(single_flight.do_async('key', func) for _ in range(5)))
+
+        self.assertEqual(['value'] * 5, asyncio.run(gather()))
+        self.assertEqual(['key'], calls)
+        self.assertEqual(0, len(single_flight))
+
+    def test_do_async_exception(self) -> None:
+        """Test sharing an exception of a call between tasks of an event loop."""
+        single_flight = SingleFlight()
+
+        async def func() -> None:
+            await asyncio.sleep(0.01)
+            raise ValueError('error')
+
+        async def gather() -> List[Any]:
+            return await asyncio.gather(
+                *(single_flight.do_async('key', func) for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        exceptions = asyncio.run(gather())
+        self.assertTrue(all(isinstance(exception, ValueError) for exception in exceptions))
+        self.assertEqual(0, len(single_flight))
+
+    def test_get_single_flight_key(self) -> None:
+        """Test the `get_single_flight_key` function."""
+        queryset = Task.objects.filter(name__contains='Important')
+        other_queryset = Task.objects.filter(name__contains='Other')
+        self.assertEqual(
+            get_single_flight_key(queryset, {'first': 5}, 'extra'),
+            get_single_flight_key(queryset.all(), {'first': 5}, 'extra'),
+        )
+        for other_key in (
+            get_single_flight_key(queryset, {'first': 6}, 'extra'),
+            get_single_flight_key(queryset, {'first': 5}, 'other'),
+            get_single_flight_key(other_queryset, {'first': 5}, 'extra'),
+        ):
+            self.assertNotEqual(get_single_flight_key(queryset, {'first': 5}, 'extra'), other_key)
+        self.assertIsNone(get_single_flight_key(queryset.none(), {}))
+        self.assertIsNone(get_single_flight_key([], {}))
+
+
+class SingleFlightExecutionTests(TransactionTestCase):
+    """Tests of coalescing queries of connections."""
+
+    query = """
+        {
+            tasksAsync(filter: {name: {contains: "Important task"}}, first: 5) {
+                edges { node { name } }
+            }
+        }
+    """
+
+    def setUp(self) -> None:
+        """Generate data."""
+        generate_data()
+
+    def test_sync_execution(self) -> None:
+        """Test coalescing queries in the synchronous execution."""
+        query = self.query.replace('tasksAsync', 'tasksFields')
+        with patch.dict(
+            'graphene_django_filter.conf.DEFAULT_SETTINGS',
+            {'SINGLE_FLIGHT_QUERIES': True},
+        ), patch(
+            'graphene_django_filter.connection_field.query_single_flight.do',
+            wraps=SingleFlight().do,
+        ) as do_mock:
+            execution_result = schema.execute(query)
+        self.assertIsNone(execution_result.errors)
+        self.assertEqual(5, len(execution_result.data['tasksFields']['edges']))
+        do_mock.assert_called_once()
+
+    def test_async_execution(self) -> None:
+        """Test coalescing queries of tasks of an event loop."""
+
+        async def execute() -> List[Any]:
+            execution_results = await asyncio.gather(
+                *(schema.execute_async(self.query) for _ in range(3)),
+            )
+            await sync_to_async(connections.close_all)()
+            return execution_results
+
+        for single_flight_queries, number_of_calls in ((False, 3), (True, 1)):
+            with self.subTest(single_flight_queries=single_flight_queries), patch.dict(
+                'graphene_django_filter.conf.DEFAULT_SETTINGS',
+                {'SINGLE_FLIGHT_QUERIES': single_flight_queries},
+            ), patch.object(
+                AdvancedDjangoFilterConnectionField,
+                'resolve_offset_connection',
+                wraps=AdvancedDjangoFilterConnectionField.resolve_offset_connection,
+            ) as resolve_offset_connection_mock:
+                execution_results = asyncio.run(execute())
+                self.assertEqual(number_of_calls, resolve_offset_connection_mock.call_count)
+            for execution_result in execution_results:
+                self.assertIsNone(execution_result.errors)
+                self.assertEqual(
+                    execution_results[0].data['tasksAsync'],
+                    execution_result.data['tasksAsync'],
+                )
+                self.assertEqual(5, len(execution_result.data['tasksAsync']['edges']))
@@ -0,0 +1,87 @@
+"""`validation` module tests."""
+
+import json
+import sys
+from unittest.mock import patch
+
+from django.test import TestCase
+from graphene_django_filter.filter_plans import create_filter_tree
+from graphene_django_filter.validation import clean_filter_tree
+
+from .data_generation import generate_data
+from .filtersets import TaskFilter
+
+
+class ValidationTests(TestCase):
+    """Form-free validation tests."""
+
+    valid_data = {
+        'user__in': '2,3',
+        'and': [
+            {'created_at__gt': '2019-12-31T00:00:00+00:00'},
+            {'completed_at__lt': '2021-02-02T00:00:00+00:00'},
+        ],
+        'or': [
+            {'name__contains': 'Important'},
+            {'description__contains': 'important'},
+        ],
+        'not': {
+            'user': 2,
+        },
+    }
+    invalid_data = {
+        'created_at__gt': 'invalid',
+        'and': [
+            {'name': 'Important'},
+            {'completed_at__lt': 'invalid'},
+        ],
+        'or': [
+            {'created_at__gt': 'invalid'},
+        ],
+        'not': {
+            'completed_at__lt': 'invalid',
+            'not': {'created_at__gt': 'invalid'},
+        },
+    }
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up `ValidationTests` class."""
+        super().setUpClass()
+        generate_data()
+
+    def test_clean_filter_tree(self) -> None:
+        """Test that the `clean_filter_tree` function gives the same result as forms."""
+        for data in (self.valid_data, self.invalid_data):
+            with self.subTest(data=data):
+                filterset = TaskFilter(data=data)
+                tree, errors = clean_filter_tree(filterset.filters, data)
+                self.assertEqual(
+                    json.loads(filterset.form.errors.as_json()),
+                    json.loads(errors.as_json()),
+                )
+                self.assertEqual(create_filter_tree(filterset.form), tree)
+
+    def test_deep_tree(self) -> None:
+        """Test cleaning a tree deeper than the recursion limit."""
+        data = {'name': 'Important'}
+        for _ in range(sys.getrecursionlimit()):
+            data = {'not': {'not': data}}
+        filterset = TaskFilter(data=data)
+        tree, errors = clean_filter_tree(filterset.filters, data)
+        self.assertEqual(0, len(errors))
+        self.assertEqual('and', tree.operator)
+
+    @patch.dict('graphene_django_filter.conf.DEFAULT_SETTINGS', {'FORM_FREE_VALIDATION': True})
+    def test_form_free_filterset(self) -> None:
+        """Test filtering without forms."""
+        with patch.object(TaskFilter, 'get_form_class') as get_form_class_mock:
+            invalid_filterset = TaskFilter(data=self.invalid_data)
+            self.assertFalse(invalid_filterset.is_valid())
+            self.assertIn('created_at__gt', invalid_filterset.errors)
+            valid_filterset = TaskFilter(data=self.valid_data)
+            self.assertTrue(valid_filterset.is_valid())
+            tasks = list(valid_filterset.qs)
+            get_form_class_mock.assert_not_called()
+        self.assertTrue(len(tasks))
+        self.assertEqual(list(TaskFilter(data=self.valid_data).qs), tasks)